@@ -0,0 +1,23 @@
+# backend/audio_payload.py
+import base64
+import json
+import numpy as np
+
+def float_to_pcm16(audio):
+    # CONVERT NUMPY FLOAT32 -> PCM INT16 BYTES
+    # Clip first: resampled full-scale audio rings past +-1.0, and int16
+    # wraps those samples to the opposite sign (audible clicks)
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+def stream_audio_payload(pcm_bytes, sample_rate=16000):
+    """
+    Wraps raw PCM16 bytes in the mod_audio_stream 'streamAudio' message.
+    """
+    return json.dumps({
+        "type": "streamAudio",
+        "data": {
+            "audioDataType": "raw",
+            "sampleRate": sample_rate,
+            "audioData": base64.b64encode(pcm_bytes).decode('utf-8')
+        }
+    })
@@ -1,33 +1,43 @@
 import asyncio
 import websockets
 import json
-from .call_pipeline import CallPipeline
-from backend.call_context import CallContext
-from db.call_repo import start_call
+from backend.call_pipeline import LEG_SAMPLE_RATE
+from backend.call_registry import registry
+from backend.ingest import AudioIngest
 
 async def audio_handler(websocket, stt, tts):
     pipeline = None
+    ingest = None
+    uuid = None
     try:
         async for message in websocket:
             if isinstance(message, str):
                 data = json.loads(message)
                 uuid, phone = data.get("uuid"), data.get("caller", "unknown")
                 if uuid:
-                    
-                    #doing the context
-                    ctx = CallContext(uuid, phone)
-                    ctx.call_id, ctx.caller_id = start_call(uuid, phone)
-
-                    pipeline = CallPipeline(ctx, websocket, stt, tts)
+                    # Context, session and VAD were prefetched on CHANNEL_ANSWER (call_registry)
+                    pipeline = await registry.attach(uuid, phone, websocket, stt, tts)
+                    if pipeline is None:
+                        break
                     print(f"✅ Stream Attached: {uuid}")
-            elif isinstance(message, bytes) and pipeline:
-                await pipeline.handle_audio(message)
+                    pipeline.hold_if_overloaded()
+                    # VAD runs off the reader: a slow call queues (bounded) instead of stalling the socket
+                    if ingest: ingest.close()
+                    ingest = AudioIngest(pipeline.handle_audio, name=uuid, sample_rate=LEG_SAMPLE_RATE)
+                    registry.track(uuid, ingest.start())
+            elif isinstance(message, bytes) and ingest:
+                ingest.put(message)
     except websockets.exceptions.ConnectionClosed:
         pass
     finally:
+        if ingest:
+            ingest.close()
+            print(f"[{uuid}] 📥 Ingest: {ingest.counts}")
         if pipeline: await pipeline.cleanup()
+        if uuid: registry.detach(uuid)
 
-async def start_audio_server(stt, tts):
+async def start_audio_server(stt, tts, port=5001, reuse_port=False):
     # Pass shared engines into the handler
-    async with websockets.serve(lambda ws: audio_handler(ws, stt, tts), "0.0.0.0", 5001):
+    # reuse_port lets several front-end processes share the one listener (Linux SO_REUSEPORT)
+    async with websockets.serve(lambda ws: audio_handler(ws, stt, tts), "0.0.0.0", port, reuse_port=reuse_port):
         await asyncio.Future() # Run forever
\ No newline at end of file
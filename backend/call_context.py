@@ -5,3 +5,4 @@ class CallContext:
         self.phone = phone
         self.call_id = None
         self.caller_id = None
+        self.snapshot_parts = None  # db.snapshot_repo.prefetch_snapshot, filled on answer
@@ -1,51 +1,115 @@
 import asyncio
-import base64
-import json
 import logging
+from backend.audio_payload import stream_audio_payload
+from backend.turns import TurnManager
 from backend.vad_stream import VADStreamer
-from llm.brain import handle_llm
+from llm.brain import handle_llm, release_session
+from llm.overload import HOLD_MESSAGE_ML, controller as overload
 from db.call_repo import log_message,end_call
+from db.client import background
+
+LEG_SAMPLE_RATE = 8000   # FreeSWITCH stream (see uuid_audio_stream in esl_client)
+HOLD_REPEAT_SECONDS = 20
 
 class CallPipeline:
-    def __init__(self, ctx, websocket, stt, tts):
+    def __init__(self, ctx, websocket, stt, tts, vad=None, registry=None):
         self.ws = websocket
+        self.ctx = ctx
         self.phone = self.ctx.phone
         self.uuid = self.ctx.uuid
-        self.ctx = ctx
         self.stt = stt
         self.tts = tts
 
-        # Initialize VAD with 8000Hz as per FreeSWITCH stream
-        self.vad = VADStreamer(sample_rate=8000, min_energy=400)
-        self.current_task = None
-        self.is_responding = False
+        # Initialize VAD with 8000Hz as per FreeSWITCH stream (pre-built on answer by the call registry)
+        self.vad = vad or VADStreamer(sample_rate=LEG_SAMPLE_RATE, min_energy=400)
+        self.registry = registry
+        self.turns = TurnManager(
+            self.respond, name=self.uuid,
+            track=(lambda task: registry.track(self.uuid, task)) if registry else None,
+        )
+        self.partial = None   # (utterance_id, audio_len, transcribe task) from the last "PAUSE"
+        self.closed = False
+        self.hold_task = None
+
+    def hold_if_overloaded(self):
+        """New call at the top overload tier: hold message until the controller backs off."""
+        if overload.tier.hold_new_calls:
+            self.hold_task = asyncio.create_task(self._hold())
+
+    async def _hold(self):
+        print(f"[{self.uuid}] ⏸️ Overloaded: caller on hold")
+        try:
+            while overload.tier.hold_new_calls and not self.closed:
+                # Pre-synthesized at startup, so holding costs no TTS time
+                audio = await asyncio.to_thread(self.tts.tell_pcm, HOLD_MESSAGE_ML, LEG_SAMPLE_RATE)
+                await self.ws.send(stream_audio_payload(audio, sample_rate=LEG_SAMPLE_RATE))
+                for _ in range(HOLD_REPEAT_SECONDS):
+                    await asyncio.sleep(1)
+                    if not overload.tier.hold_new_calls:
+                        break
+        except Exception as e:
+            logging.error(f"Hold message failed: {e}")
+        print(f"[{self.uuid}] ▶️ Off hold")
 
     async def handle_audio(self, chunk):
+        if self.hold_task and not self.hold_task.done():
+            return  # nothing to answer with yet; the caller hears the hold message
         result = self.vad.process_chunk(chunk)
 
         if result == "BARGE_IN":
-            if self.is_responding and self.current_task:
-                print(f"[{self.uuid}] 🛑 Barge-in: Cancelling AI response")
-                self.current_task.cancel()
+            self.partial = None
+            # Mid-reply: barge-in. Still thinking: the caller wasn't done, fold into the next turn
+            self.turns.speech_started()
+            return
+
+        if result == "PAUSE":
+            # Adaptive endpointing: transcribe what we have, so a complete-looking
+            # sentence can end the turn early and its text is ready when it does
+            audio = self.vad.pending_audio()
+            utterance_id = self.vad.utterance_id
+            task = self.turns.watch(asyncio.create_task(
+                self.stt.transcribe(audio, sample_rate=LEG_SAMPLE_RATE, light=overload.tier.light_stt)
+            ))
+            task.add_done_callback(lambda t: self._on_partial(utterance_id, t))
+            self.partial = (utterance_id, len(audio), task)
             return
 
         if isinstance(result, bytes):
-            # Run the AI turn in a task we can cancel if interrupted
-            self.current_task = asyncio.create_task(self.run_ai_turn(result))
+            # Reuse the partial transcript when the caller said nothing after it
+            text_task = None
+            if self.partial and self.partial[:2] == (self.vad.utterance_id, len(result)):
+                text_task = self.partial[2]
+            self.partial = None
 
-    async def run_ai_turn(self, audio_bytes):
-        self.is_responding = True
-        try:
-            # 1. STT (Wait for shared GPU slot)
-            # Pass 8000Hz so it knows to resample for Whisper
-            text_ml = await self.stt.transcribe(audio_bytes, sample_rate=8000)
-            if not text_ml or len(text_ml) < 2: return
+            # Transcription starts now; the turn manager decides which reply goes out
+            self.turns.utterance(asyncio.create_task(self.transcribe(result, text_task)))
+
+    def _on_partial(self, utterance_id, task):
+        if task.cancelled() or task.exception():
+            return
+        self.vad.set_partial(utterance_id, task.result())
 
-            log_message(
+    async def transcribe(self, audio_bytes, text_task=None):
+        # Pass 8000Hz so it knows to resample for Whisper
+        if text_task:
+            try:
+                return await asyncio.shield(text_task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Partial STT failed, transcribing again: {e}")
+        return await self.stt.transcribe(
+            audio_bytes, sample_rate=LEG_SAMPLE_RATE, light=overload.tier.light_stt,
+        )
+
+    async def respond(self, text_ml, turn):
+        # Runs inside the TurnManager's turn task: cancelled by a barge-in or a newer turn
+        try:
+            background(log_message(
                 call_id=self.ctx.call_id,
                 speaker="user",
                 raw_text=text_ml
-            )
+            ))
 
             
             # 2. THE BRAIN (Delegated to your LLM module)
@@ -54,36 +118,32 @@ class CallPipeline:
                 self.ctx.call_id,
                 self.ctx.caller_id,
                 self.ctx.phone,
-                text_ml
+                text_ml,
+                snapshot_parts=self.ctx.snapshot_parts,
             )
 
 
             print(f"[{self.uuid}] 🤖 {reply_ml}")
 
-            # 3. TTS
-            audio_data_np = await asyncio.to_thread(self.tts.tell, reply_ml, play=False)
-
-            # CONVERT NUMPY FLOAT32 -> PCM INT16 BYTES
-            audio_bytes = (audio_data_np * 32767).astype(np.int16).tobytes()
+            # 3. TTS -> PCM INT16 BYTES at the 8k call leg rate (cached for recurring phrases)
+            audio_bytes = await asyncio.to_thread(self.tts.tell_pcm, reply_ml, LEG_SAMPLE_RATE)
 
-            # 4. SEND
-            payload = {
-                "type": "streamAudio",
-                "data": {
-                    "audioDataType": "raw", 
-                    "sampleRate": 16000,
-                    "audioData": base64.b64encode(audio_bytes).decode('utf-8') # Now this works
-                }
-            }
-            await self.ws.send(json.dumps(payload))
+            # 4. SEND (only the newest turn's reply)
+            if not self.turns.claim_reply(turn):
+                return
+            await self.ws.send(stream_audio_payload(audio_bytes, sample_rate=LEG_SAMPLE_RATE))
 
         except asyncio.CancelledError:
-            pass # Task was killed by a barge-in
+            raise # Task was killed by a barge-in or a newer turn
         except Exception as e:
             logging.error(f"Pipeline Error: {e}")
-        finally:
-            self.is_responding = False
 
     async def cleanup(self):
-        if self.current_task: self.current_task.cancel()
-        end_call(self.ctx.call_id)
+        # Runs from ESL hangup and from the websocket closing; only the first counts
+        if self.closed: return
+        self.closed = True
+        self.turns.cancel()
+        if self.hold_task: self.hold_task.cancel()
+        print(f"[{self.uuid}] 🔁 Turns: {self.turns.counts}")
+        release_session(self.phone)
+        await end_call(self.ctx.call_id)
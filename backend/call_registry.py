@@ -0,0 +1,157 @@
+# backend/call_registry.py
+# Per-call state shared by the ESL client and the audio server.
+#
+# CHANNEL_ANSWER starts the per-call setup (caller profile + call row,
+# session history, snapshot data, VAD model) while mod_audio_stream is still
+# connecting, so the first utterance does not wait for it.
+# CHANNEL_HANGUP_COMPLETE tears the call down and cancels whatever is still
+# running for it.
+#
+# In multi-process mode ESL runs in the parent and audio in the front-ends,
+# so the front-end registry never sees the answer event: attach() then does
+# the same setup itself (still in parallel), and hangup arrives as the
+# websocket closing. The parent's ESL client gets a NullRegistry, so the
+# setup and teardown run once, in the process that owns the stream.
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from backend.call_context import CallContext
+from backend.call_pipeline import CallPipeline, LEG_SAMPLE_RATE
+from backend.vad_stream import VADStreamer
+from db.call_repo import end_call, start_call
+from db.client import background
+from db.snapshot_repo import prefetch_snapshot
+from llm import brain
+
+class CallEntry:
+    def __init__(self, uuid, phone):
+        self.ctx = CallContext(uuid, phone)
+        self.vad = None
+        self.pipeline = None
+        self.prefetch = None       # asyncio.Task
+        self.tasks = set()         # in-flight work tied to this call
+        self.answered_at = time.monotonic()
+
+
+class CallRegistry:
+    def __init__(self, max_ended=1000):
+        self.calls = {}            # uuid -> CallEntry
+        self.ended = OrderedDict() # recently hung-up uuids, so a late websocket is refused
+        self.max_ended = max_ended
+
+    # ---------------------------------------------------------
+    # ESL events
+    # ---------------------------------------------------------
+
+    def on_answer(self, uuid, phone):
+        entry = self.calls.get(uuid)
+        if entry is None:
+            entry = self.calls[uuid] = CallEntry(uuid, phone)
+            entry.prefetch = asyncio.create_task(self._prefetch(entry))
+        return entry
+
+    async def on_hangup(self, uuid):
+        self._mark_ended(uuid)
+        entry = self.calls.pop(uuid, None)
+        if entry is None:
+            return
+
+        for task in [entry.prefetch, *entry.tasks]:
+            if task and not task.done():
+                task.cancel()
+
+        if entry.pipeline:
+            await entry.pipeline.cleanup()
+            await entry.pipeline.ws.close()
+        elif entry.ctx.call_id:
+            # Answered but the media stream never attached
+            await end_call(entry.ctx.call_id)
+        logging.info(f"🧹 Call {uuid} torn down after {time.monotonic() - entry.answered_at:.1f}s")
+
+    # ---------------------------------------------------------
+    # Audio server
+    # ---------------------------------------------------------
+
+    async def attach(self, uuid, phone, websocket, stt, tts):
+        """Waits for the prefetch (started now if ESL has not) and builds the pipeline."""
+        if uuid in self.ended:
+            logging.warning(f"Stream for ended call {uuid} refused")
+            return None
+
+        entry = self.on_answer(uuid, phone)
+        try:
+            await entry.prefetch
+        except asyncio.CancelledError:
+            if entry.prefetch.cancelled() and uuid in self.ended:
+                return None  # hung up while we were still setting up
+            raise
+        entry.pipeline = CallPipeline(entry.ctx, websocket, stt, tts, vad=entry.vad, registry=self)
+        return entry.pipeline
+
+    def detach(self, uuid):
+        # Websocket closed (the front-end's hangup); the pipeline has cleaned itself up
+        entry = self.calls.pop(uuid, None)
+        if entry is not None:
+            for task in list(entry.tasks):
+                task.cancel()
+
+    def track(self, uuid, task):
+        """Ties a task to the call so hangup cancels it."""
+        entry = self.calls.get(uuid)
+        if entry is not None:
+            entry.tasks.add(task)
+            task.add_done_callback(entry.tasks.discard)
+        return task
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+
+    async def _prefetch(self, entry):
+        ctx = entry.ctx
+        started = time.perf_counter()
+
+        async def call_and_snapshot():
+            # Shielded, so it runs on even if a hangup cancels us: whichever side sees
+            # the other's write closes the call row (end_call twice is harmless)
+            ctx.call_id, ctx.caller_id = await start_call(ctx.uuid, ctx.phone)
+            if ctx.uuid in self.ended:
+                await end_call(ctx.call_id)
+                return
+            ctx.snapshot_parts = await prefetch_snapshot(ctx.caller_id)
+
+        async def session():
+            if brain.session_store:
+                await brain.session_store.fetch_session(ctx.phone)
+
+        async def vad():
+            entry.vad = await asyncio.to_thread(VADStreamer, sample_rate=LEG_SAMPLE_RATE, min_energy=400)
+
+        try:
+            call_row = background(call_and_snapshot(), f"Call {ctx.uuid} setup")
+            await asyncio.gather(asyncio.shield(call_row), session(), vad())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Call {ctx.uuid} prefetch failed: {e}")
+            raise
+        logging.info(f"⚡ Call {ctx.uuid} prefetched in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _mark_ended(self, uuid):
+        self.ended[uuid] = None
+        while len(self.ended) > self.max_ended:
+            self.ended.popitem(last=False)
+
+
+class NullRegistry:
+    """For an ESL client whose calls are set up elsewhere (multi-process parent)."""
+    def on_answer(self, uuid, phone):
+        return None
+
+    async def on_hangup(self, uuid):
+        pass
+
+
+# Shared by esl_client and audio_server (one per process)
+registry = CallRegistry()
@@ -0,0 +1,121 @@
+# backend/endpointing.py
+# Adaptive end-of-turn detection for VADStreamer. Instead of one fixed 500ms
+# hangover for everybody, each call learns how long this caller pauses
+# mid-sentence and waits just past that; the speech-probability trend and
+# (optionally) a partial transcript stretch or shorten the wait per silence.
+import os
+import re
+from collections import deque
+import numpy as np
+
+ENDPOINTING = os.getenv("ZENTRY_ENDPOINTING", "fixed")   # fixed | adaptive
+
+# Malayalam finite endings / question clitic, and words a sentence doesn't end on
+_COMPLETE_ML = re.compile(r"(ോ|ണ്|ണ്ട്|ല്ല|ാം|ണം)$")
+_DANGLING = {
+    "പിന്നെ", "അതായത്", "എന്നാൽ", "അല്ലെങ്കിൽ", "പക്ഷേ", "ഉം", "ആ", "ഈ",
+    "and", "but", "or", "so", "the", "a", "of", "for", "to", "with", "um", "uh", "like",
+}
+
+def looks_complete(text):
+    """
+    True when a partial transcript reads like a finished question or
+    statement, False when it ends mid-phrase, None when it can't tell.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    if text[-1] in "?.!।":
+        return True
+    last = text.split()[-1].strip(",").lower()
+    if last in _DANGLING or last.endswith(","):
+        return False
+    if _COMPLETE_ML.search(last):
+        return True
+    return None
+
+
+class Endpointer:
+    """
+    Per-call hangover, in milliseconds of trailing non-speech:
+
+        base      = p95 of this caller's mid-turn pauses + margin (default until 3 seen)
+        x 1.3       while speech probability hovers under the threshold
+                    (breath, "umm", trailing syllable) instead of dropping off
+        = min_ms    when the partial transcript looks complete
+
+    A turn cut that the caller talks straight through (speech again within
+    resume_ms) is counted as a pause of that length, so cut-offs push the
+    hangover up for the rest of the call.
+    """
+    def __init__(self, frame_ms=32, default_ms=512, min_ms=224, max_ms=800,
+                 margin_ms=96, resume_ms=600, history=20):
+        self.frame_ms = frame_ms
+        self.default_ms = default_ms
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.margin_ms = margin_ms
+        self.resume_ms = resume_ms
+
+        self.pauses = deque(maxlen=history)
+        self.silence_probs = []
+        self.complete = None       # looks_complete() of the partial for this silence
+        self.frame_no = 0
+        self.ended_at = None       # frame_no of the last endpoint
+        self.ended_silence_ms = 0
+        self.suspected_cutoffs = 0
+
+    def _clip(self, ms):
+        return float(min(self.max_ms, max(self.min_ms, ms)))
+
+    def base_ms(self):
+        if len(self.pauses) < 3:
+            return self.default_ms
+        return self._clip(np.percentile(self.pauses, 95) + self.margin_ms)
+
+    def hangover_ms(self):
+        if self.complete:
+            return self.min_ms
+        ms = self.base_ms()
+        if self.silence_probs and np.mean(self.silence_probs) > 0.3:
+            ms *= 1.3
+        return self._clip(ms)
+
+    # ---------------------------------------------------------
+    # Hooks called by VADStreamer
+    # ---------------------------------------------------------
+
+    def tick(self):
+        self.frame_no += 1
+
+    def speech_started(self):
+        if self.ended_at is not None:
+            gap_ms = (self.frame_no - self.ended_at) * self.frame_ms
+            if gap_ms < self.resume_ms:
+                # Caller kept talking right after we cut: that was a pause, not the end
+                self.pauses.append(self.ended_silence_ms + gap_ms)
+                self.suspected_cutoffs += 1
+        self.ended_at = None
+        self._reset_silence()
+
+    def speech_resumed(self, silence_frames):
+        if silence_frames >= 2:  # ignore single-frame dips in the VAD
+            self.pauses.append(silence_frames * self.frame_ms)
+        self._reset_silence()
+
+    def silence(self, prob, silence_frames):
+        """Returns True when this silence has lasted long enough to end the turn."""
+        self.silence_probs.append(float(prob))
+        return silence_frames * self.frame_ms >= self.hangover_ms()
+
+    def partial(self, text):
+        self.complete = looks_complete(text)
+
+    def turn_ended(self, silence_frames):
+        self.ended_at = self.frame_no
+        self.ended_silence_ms = silence_frames * self.frame_ms
+        self._reset_silence()
+
+    def _reset_silence(self):
+        self.silence_probs = []
+        self.complete = None
@@ -0,0 +1,247 @@
+# backend/esl.py
+# FreeSWITCH event socket (inbound) connection.
+#
+# One reader task owns the socket and sorts every message:
+#   command/reply, api/response -> next waiting command (replies come in order)
+#   text/event-plain            -> BACKGROUND_JOB resolves its bgapi future by
+#                                  Job-UUID, everything else goes to on_event
+# Commands go out as bgapi, so a slow uuid_audio_stream never holds up the
+# event stream. Jobs carry our own Job-UUID, which lets a reconnect resend
+# whatever had not been accepted yet.
+import asyncio
+import logging
+import uuid as uuidlib
+from collections import deque
+from urllib.parse import unquote
+
+class ESLError(Exception):
+    pass
+
+
+class ESLConnectionLost(ESLError):
+    pass
+
+
+class ESLEvent:
+    """Event headers (URL-decoded once) plus the optional event body."""
+    __slots__ = ("headers", "body")
+
+    def __init__(self, headers, body=""):
+        self.headers = headers
+        self.body = body
+
+    @property
+    def name(self):
+        return self.headers.get("Event-Name")
+
+    def get(self, key, default=None):
+        return self.headers.get(key, default)
+
+
+def parse_headers(block: bytes, decode=False):
+    headers = {}
+    for line in block.decode("utf-8", "replace").split("\n"):
+        key, sep, value = line.partition(": ")
+        if sep:
+            headers[key] = unquote(value) if decode else value
+    return headers
+
+
+def parse_event(body: bytes) -> ESLEvent:
+    # text/event-plain: URL-encoded headers, blank line, optional Content-Length body
+    head, _, rest = body.partition(b"\n\n")
+    headers = parse_headers(head, decode=True)
+    length = int(headers.get("Content-Length", 0))
+    return ESLEvent(headers, rest[:length].decode("utf-8", "replace") if length else "")
+
+
+async def read_message(reader):
+    """One ESL message: (outer headers, body bytes)."""
+    head = await reader.readuntil(b"\n\n")
+    headers = parse_headers(head)
+    length = int(headers.get("Content-Length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return headers, body
+
+
+class _Job:
+    __slots__ = ("cmd", "future", "accepted", "resend")
+
+    def __init__(self, cmd, future, resend):
+        self.cmd = cmd
+        self.future = future
+        self.accepted = False
+        self.resend = resend
+
+
+class ESLConnection:
+    def __init__(self, host, port, password, events=(), on_event=None, reconnect_delay=5):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.events = ("BACKGROUND_JOB", *events)
+        self.on_event = on_event
+        self.reconnect_delay = reconnect_delay
+
+        self.reader = None
+        self.writer = None
+        self.connected = asyncio.Event()
+        self._replies = deque()   # futures for command/reply + api/response, in send order
+        self._jobs = {}           # Job-UUID -> _Job
+
+    # ---------------------------------------------------------
+    # Commands
+    # ---------------------------------------------------------
+
+    async def _send(self, cmd, headers=None):
+        lines = [cmd] + [f"{k}: {v}" for k, v in (headers or {}).items()]
+        reply = asyncio.get_running_loop().create_future()
+        self._replies.append(reply)
+        self.writer.write(("\n".join(lines) + "\n\n").encode())
+        await self.writer.drain()
+        return reply
+
+    async def command(self, cmd):
+        """Plain command; returns the reply headers."""
+        await self.connected.wait()
+        return await (await self._send(cmd))
+
+    async def api(self, cmd):
+        """Blocking api on the FreeSWITCH side; prefer bgapi for anything slow."""
+        headers, body = await self.command(f"api {cmd}")
+        return body
+
+    async def bgapi(self, cmd, resend=False):
+        """
+        Returns a future for the job result text. resend: the command is
+        safe to run twice, so it is resent if the connection drops after
+        FreeSWITCH accepted it but before its result arrived (commands not
+        yet accepted are always resent).
+        """
+        job_uuid = str(uuidlib.uuid4())
+        job = self._jobs[job_uuid] = _Job(cmd, asyncio.get_running_loop().create_future(), resend)
+        if self.connected.is_set():
+            await self._submit(job_uuid, job)
+        return job.future
+
+    async def _submit(self, job_uuid, job):
+        reply = await self._send(f"bgapi {job.cmd}", {"Job-UUID": job_uuid})
+        reply.add_done_callback(lambda f: self._on_job_reply(job_uuid, f))
+
+    def _on_job_reply(self, job_uuid, reply):
+        if reply.cancelled() or reply.exception():
+            return  # connection dropped; the reconnect decides
+        job = self._jobs.get(job_uuid)
+        if job is None:
+            return
+        headers, _ = reply.result()
+        text = headers.get("Reply-Text", "")
+        if text.startswith("-ERR"):
+            self._jobs.pop(job_uuid, None)
+            if not job.future.done():
+                job.future.set_exception(ESLError(f"{job.cmd}: {text}"))
+        else:
+            job.accepted = True
+
+    # ---------------------------------------------------------
+    # Connection
+    # ---------------------------------------------------------
+
+    async def run(self, on_connect=None):
+        """Connects, authenticates, subscribes and reads until cancelled; reconnects on errors."""
+        while True:
+            reader_task = None
+            try:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                await self._handshake()
+                logging.info("✅ ESL Connected to FreeSWITCH")
+                # Jobs queued while we were down; anything bgapi() sends from here on is new
+                pending = list(self._jobs.items())
+                self.connected.set()
+                reader_task = asyncio.create_task(self._read_loop())
+                await self._resend_jobs(pending)
+                if on_connect:
+                    await on_connect()
+                await reader_task
+            except asyncio.CancelledError:
+                self._drop(ESLConnectionLost("ESL client stopped"), final=True)
+                raise
+            except Exception as e:
+                logging.error(f"⚠️ ESL Connection Failed: {e}. Retrying in {self.reconnect_delay}s...")
+            finally:
+                if reader_task:
+                    reader_task.cancel()
+            self._drop(ESLConnectionLost("ESL connection lost"))
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _handshake(self):
+        headers, _ = await read_message(self.reader)
+        if headers.get("Content-Type") != "auth/request":
+            raise ESLError(f"Unexpected greeting: {headers}")
+        self.writer.write(f"auth {self.password}\n\n".encode())
+        await self.writer.drain()
+        headers, _ = await read_message(self.reader)
+        if not headers.get("Reply-Text", "").startswith("+OK"):
+            raise ESLError(f"Auth failed: {headers.get('Reply-Text')}")
+        self.writer.write(f"event plain {' '.join(self.events)}\n\n".encode())
+        await self.writer.drain()
+        await read_message(self.reader)
+
+    async def _resend_jobs(self, pending):
+        for job_uuid, job in pending:
+            if not job.accepted or job.resend:
+                job.accepted = False
+                await self._submit(job_uuid, job)
+            else:
+                # Ran (or is running) on FreeSWITCH; its result went to the dead socket
+                self._jobs.pop(job_uuid, None)
+                if not job.future.done():
+                    job.future.set_exception(ESLConnectionLost(f"{job.cmd}: result lost on reconnect"))
+
+    def _drop(self, error, final=False):
+        self.connected.clear()
+        while self._replies:
+            reply = self._replies.popleft()
+            if not reply.done():
+                reply.set_exception(error)
+        if final:
+            for job in self._jobs.values():
+                if not job.future.done():
+                    job.future.set_exception(error)
+            self._jobs.clear()
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    async def _read_loop(self):
+        while True:
+            try:
+                headers, body = await read_message(self.reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+
+            ctype = headers.get("Content-Type")
+            if ctype in ("command/reply", "api/response"):
+                if self._replies:
+                    reply = self._replies.popleft()
+                    if not reply.done():
+                        reply.set_result((headers, body.decode("utf-8", "replace")))
+            elif ctype == "text/event-plain":
+                self._dispatch(parse_event(body))
+            elif ctype == "text/disconnect-notice":
+                return
+
+    def _dispatch(self, event):
+        if event.name == "BACKGROUND_JOB":
+            job = self._jobs.pop(event.get("Job-UUID"), None)
+            if job and not job.future.done():
+                if event.body.startswith("-ERR"):
+                    job.future.set_exception(ESLError(f"{job.cmd}: {event.body.strip()}"))
+                else:
+                    job.future.set_result(event.body)
+            return
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logging.error(f"ESL event handler failed on {event.name}: {e}")
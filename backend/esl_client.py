@@ -1,80 +1,78 @@
-import asyncio
+import json
 import logging
+import os
+from backend.call_registry import registry as call_registry
+from backend.esl import ESLConnection, ESLConnectionLost
+from db.client import background
+from session.affinity import NodeRing, affinity_key, node_id_from_env
+
+# FreeSWITCH event socket; a node without its own FreeSWITCH points this at the switch
+ESL_HOST = os.getenv("ZENTRY_ESL_HOST", "127.0.0.1")
+ESL_PORT = int(os.getenv("ZENTRY_ESL_PORT", "8021"))
+ESL_PASSWORD = os.getenv("ZENTRY_ESL_PASSWORD", "ClueCon")
 
 class ESLClient:
-    def __init__(self, host, port, password):
-        self.host = host
-        self.port = port
-        self.password = password
-        self.reader = None
-        self.writer = None
+    def __init__(self, host, port, password, ring=None, node_id=None, ready=None, registry=None):
+        # Socket, bgapi jobs and reconnects live in backend/esl.py
+        self.conn = ESLConnection(
+            host, port, password,
+            events=("CHANNEL_ANSWER", "CHANNEL_HANGUP_COMPLETE"),
+            on_event=self.on_event,
+        )
+        # Multi-node: which box owns a call (ZENTRY_NODES / ZENTRY_NODE_ID)
+        self.ring = ring or NodeRing.from_env()
+        self.node_id = node_id or node_id_from_env()
+        # Startup gate: don't take calls until every model reports ready
+        self.ready = ready
+        # Per-call prefetch/teardown (backend/call_registry.py)
+        self.registry = registry or call_registry
 
     async def connect(self):
-        while True:
-            try:
-                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
-                logging.info("✅ ESL Connected to FreeSWITCH")
-                
-                # Authenticate
-                await self.send_cmd(f"auth {self.password}")
-                await self.read_response()
-                
-                # Subscribe to events
-                await self.send_cmd("event plain CHANNEL_ANSWER CHANNEL_HANGUP_COMPLETE")
-                
-                # Event Loop
-                await self.listen()
-            except Exception as e:
-                logging.error(f"⚠️ ESL Connection Failed: {e}. Retrying in 5s...")
-                await asyncio.sleep(5)
-
-    async def send_cmd(self, cmd):
-        self.writer.write((cmd + "\n\n").encode())
-        await self.writer.drain()
+        if self.ready and not self.ready.is_set():
+            logging.info("⏳ ESL waiting for models before answering calls...")
+            await self.ready.wait()
+        await self.conn.run()
 
-    async def read_response(self):
-        data = await self.reader.readuntil(b"\n\n")
-        return data.decode().strip()
+    def on_event(self, event):
+        # Called from the reader; anything slow goes into its own task, kept
+        # referenced by background() so it can't be collected mid-flight
+        uuid = event.get("Unique-ID")
 
-    async def listen(self):
-        while True:
-            # Read header
-            try:
-                line = await self.reader.readuntil(b"\n\n")
-            except asyncio.IncompleteReadError:
-                break
-                
-            headers = self.parse_headers(line.decode())
-            
-            # Read body if Content-Length exists
-            if "Content-Length" in headers:
-                length = int(headers["Content-Length"])
-                body = await self.reader.readexactly(length)
-                # You can parse body logic here if needed
+        if event.name == "CHANNEL_ANSWER":
+            phone = event.get("Caller-Caller-ID-Number", "unknown")
+            key = affinity_key(uuid, phone)
+            # Every node sees every event; only the call's owner starts its stream
+            if not self.ring.should_handle(key, self.node_id):
+                return
 
-            # Handle Events
-            event_name = headers.get("Event-Name")
-            uuid = headers.get("Unique-ID")
-            
-            if event_name == "CHANNEL_ANSWER":
-                logging.info(f"📞 Call Answered: {uuid} -> Starting Audio Stream")
-                # Trigger mod_audio_stream to connect to OUR Python Audio Server
-                # We pass the UUID in the URL so audio_server knows who it is
-                # [MODIFIED] Use 127.0.0.1 and 8000Hz as per 'light.py' success
-                cmd = f"api uuid_audio_stream {uuid} start ws://127.0.0.1:5001 mono 8000 {{uuid={uuid}}}"
-                await self.send_cmd(cmd)
+            # Profile, session, snapshot and VAD load while the stream connects
+            self.registry.on_answer(uuid, phone)
+            background(self.start_stream(uuid, phone, self.ring.url_for(key)), f"Audio stream start for {uuid}")
 
-            elif event_name == "CHANNEL_HANGUP_COMPLETE":
-                logging.info(f"❌ Call Ended: {uuid}")
+        elif event.name == "CHANNEL_HANGUP_COMPLETE":
+            logging.info(f"❌ Call Ended: {uuid}")
+            background(self.registry.on_hangup(uuid), f"Hangup teardown for {uuid}")
 
-    def parse_headers(self, data):
-        headers = {}
-        for line in data.splitlines():
-            if ": " in line:
-                k, v = line.split(": ", 1)
-                headers[k] = v
-        return headers
+    async def start_stream(self, uuid, phone, ws_url):
+        logging.info(f"📞 Call Answered: {uuid} -> Starting Audio Stream on {ws_url}")
+        # Trigger mod_audio_stream to connect to the owning node's Audio Server
+        # The metadata becomes the first text frame audio_server parses as JSON
+        # [MODIFIED] Use 8000Hz as per 'light.py' success
+        metadata = json.dumps({"uuid": uuid, "caller": phone}, separators=(",", ":"))
+        # Not resent once accepted: starting the same stream twice is not safe
+        job = await self.conn.bgapi(f"uuid_audio_stream {uuid} start {ws_url} mono 8000 {metadata}")
+        try:
+            result = await job
+            logging.info(f"🎧 Audio stream for {uuid}: {result.strip()}")
+            return "ok"
+        except ESLConnectionLost as e:
+            # FreeSWITCH took the command; only its result was lost with the socket
+            logging.warning(f"⚠️ Audio stream for {uuid}: {e}")
+            return "unknown"
+        except Exception as e:
+            logging.error(f"❌ Audio stream for {uuid} failed: {e}")
+            return "failed"
 
-async def run_esl_client(host, port, password):
-    client = ESLClient(host, port, password)
-    await client.connect()
\ No newline at end of file
+async def run_esl_client(host=ESL_HOST, port=ESL_PORT, password=ESL_PASSWORD, ready=None, registry=None, node_id=None):
+    client = ESLClient(host, port, password, node_id=node_id, ready=ready, registry=registry)
+    await client.connect()
@@ -0,0 +1,144 @@
+# backend/ingest.py
+# Per-call audio ingest queue between the websocket reader and the VAD.
+# The reader only enqueues; one consumer task per call feeds the pipeline.
+# The queue is bounded in milliseconds of audio, so a call whose VAD falls
+# behind stays bounded too, and its lag (age of the oldest audio not yet
+# through the VAD) is visible in metrics instead of hiding in socket buffers.
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from telemetry.metrics import metrics
+
+INGEST_POLICY = os.getenv("ZENTRY_INGEST_POLICY", "coalesce")          # coalesce | drop
+INGEST_MAX_MS = float(os.getenv("ZENTRY_INGEST_MAX_MS", "400"))         # queued audio per call
+INGEST_COALESCE_MAX_MS = float(os.getenv("ZENTRY_INGEST_COALESCE_MAX_MS", "2000"))
+LAG_WARN_MS = float(os.getenv("ZENTRY_INGEST_LAG_WARN_MS", "200"))
+LAG_TOP_N = 5
+
+_active = {}   # name -> AudioIngest, for report_lag()
+
+class AudioIngest:
+    """
+    put(chunk) from the socket reader; handle(chunk) is awaited in order.
+
+    When the queue holds more than max_ms of audio:
+        drop      the oldest chunks go (counted), the freshest audio is kept
+        coalesce  queued chunks merge into one item, so nothing is lost while
+                  the consumer catches up; past coalesce_max_ms the oldest
+                  audio of the merged item is dropped after all
+    """
+    def __init__(self, handle, name="", sample_rate=8000, max_ms=INGEST_MAX_MS,
+                 policy=INGEST_POLICY, coalesce_max_ms=INGEST_COALESCE_MAX_MS):
+        if policy not in ("coalesce", "drop"):
+            raise ValueError(f"Unknown ingest policy {policy!r} (coalesce, drop)")
+        self.handle = handle
+        self.name = name
+        self.policy = policy
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self.max_bytes = int(max_ms * self.bytes_per_ms)
+        self.coalesce_max_bytes = int(coalesce_max_ms * self.bytes_per_ms)
+
+        self.queue = deque()          # (arrival monotonic, bytes)
+        self.queued_bytes = 0
+        self.slice_bytes = None       # size of a socket message; merged items are fed back at this size
+        self.inflight_since = None    # arrival time of the item being processed
+        self.ready = asyncio.Event()
+        self.task = None
+        self.counts = {"chunks": 0, "dropped": 0, "dropped_ms": 0.0, "coalesced": 0, "max_lag_ms": 0.0}
+
+    def start(self):
+        _active[self.name] = self
+        self.task = asyncio.create_task(self._run())
+        return self.task
+
+    def close(self):
+        _active.pop(self.name, None)
+        if self.task:
+            self.task.cancel()
+
+    def lag_ms(self):
+        """How far behind real time this call's audio processing is right now."""
+        oldest = [t for t in (self.inflight_since, self.queue[0][0] if self.queue else None) if t is not None]
+        return (time.monotonic() - min(oldest)) * 1000 if oldest else 0.0
+
+    def put(self, chunk):
+        if self.slice_bytes is None:
+            self.slice_bytes = len(chunk)
+        self.counts["chunks"] += 1
+        if self.queue and self.queued_bytes + len(chunk) > self.max_bytes:
+            self._overflow(len(chunk))
+        self.queue.append((time.monotonic(), chunk))
+        self.queued_bytes += len(chunk)
+        self.ready.set()
+
+    def _overflow(self, incoming):
+        if self.policy == "drop":
+            while self.queue and self.queued_bytes + incoming > self.max_bytes:
+                _, old = self.queue.popleft()
+                self.queued_bytes -= len(old)
+                self._dropped(len(old))
+            return
+
+        # coalesce: one item, keyed by its oldest arrival, so lag stays honest
+        arrived = self.queue[0][0]
+        merged = b"".join(c for _, c in self.queue)
+        excess = len(merged) + incoming - self.coalesce_max_bytes
+        if excess > 0:
+            excess += excess % 2  # stay on a sample boundary
+            merged = merged[excess:]
+            self._dropped(excess)
+        self.counts["coalesced"] += len(self.queue) - 1
+        metrics.inc("ingest_coalesced_chunks_total", len(self.queue) - 1)
+        self.queue.clear()
+        self.queue.append((arrived, merged))
+        self.queued_bytes = len(merged)
+
+    def _dropped(self, nbytes):
+        ms = nbytes / self.bytes_per_ms
+        self.counts["dropped"] += 1
+        self.counts["dropped_ms"] += ms
+        metrics.inc("ingest_dropped_chunks_total")
+        metrics.inc("ingest_dropped_ms_total", round(ms, 1))
+
+    async def _run(self):
+        while True:
+            if not self.queue:
+                self.ready.clear()
+                await self.ready.wait()
+                continue
+            arrived, chunk = self.queue.popleft()
+            self.queued_bytes -= len(chunk)
+            self.inflight_since = arrived
+            lag = (time.monotonic() - arrived) * 1000
+            metrics.observe("ingest_lag_ms", lag)
+            self.counts["max_lag_ms"] = max(self.counts["max_lag_ms"], lag)
+            try:
+                # A merged item goes through in socket-message slices: the VAD
+                # reports one event per call, and a long slice could hide one
+                step = self.slice_bytes or len(chunk)
+                for i in range(0, len(chunk), step):
+                    await self.handle(chunk[i:i + step])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"[{self.name}] Audio handling failed: {e}")
+            finally:
+                self.inflight_since = None
+            # VAD is CPU work on the loop: let the reader enqueue (and the policy apply) between items
+            await asyncio.sleep(0)
+
+
+async def report_lag(interval=1.0, top=LAG_TOP_N):
+    """Publishes the worst-lagging calls as ingest_call_lag_ms{call} (top N only, to bound labels)."""
+    while True:
+        await asyncio.sleep(interval)
+        lags = sorted(((i.lag_ms(), name) for name, i in _active.items()), reverse=True)
+        metrics.clear("ingest_call_lag_ms")
+        for lag, name in lags[:top]:
+            metrics.set("ingest_call_lag_ms", round(lag, 1), call=name)
+        metrics.set("ingest_calls", len(lags))
+        metrics.set("ingest_calls_lagging", sum(1 for lag, _ in lags if lag > LAG_WARN_MS))
+        if lags and lags[0][0] > LAG_WARN_MS:
+            logging.warning(f"🐢 Call {lags[0][1]} audio is {lags[0][0]:.0f}ms behind real time")
@@ -1,14 +1,15 @@
+import argparse
 import asyncio
 import logging
+import multiprocessing as mp
+import os
 import signal
-from backend.audio_server import start_audio_server
+import time
 from backend.esl_client import run_esl_client
-from backend.stt_worker import MalayalamSTT
-from llm import brain
-from session.session_store import SessionStore
-from tts.tts_module import TTSModule
 
 # Global Shared Resources (Load Once)
+# NOTE: models load lazily (llm/lazy.py); backend/startup.py loads them all in
+# parallel. Multi-process mode must set its env vars before that happens.
 logging.basicConfig(level=logging.INFO)
 
 async def shutdown(loop, signal=None):
@@ -24,39 +25,180 @@ def handle_exception(loop, context):
     msg = context.get("exception", context["message"])
     logging.error(f"Caught exception: {msg}")
 
-if __name__ == "__main__":
-    # 1. Initialize Shared AI Models (Pass these to your servers)
-    print("⏳ Loading AI Models (this may take 30s)...")
-    stt = MalayalamSTT("models/ct2-whisper-medium")
-    tts = TTSModule("models/mms-tts-mal.onnx")
-    
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+async def run_voice_server(port=5001, reuse_port=False, esl=True, up=None):
+    from backend import startup
+    from backend.audio_server import start_audio_server
+    from backend.ingest import report_lag
+    from llm import brain
+    from llm.overload import controller as overload
+    from llm.rag.retriever import watch_index
+    from session.backends import backend_from_env
+    from session.session_store import SessionStore
 
-    # Initialize Memory
+    # Initialize Memory (needs the running loop for its sync worker)
+    # Shared backend (ZENTRY_SESSION_BACKEND=supabase|redis) lets several nodes/front-ends
+    # see the same history; memory is private to this process
     print("🧠 Initializing Memory...")
-    sessions = SessionStore(url="SUPABASE_URL", key="SUPABASE_KEY")
+    sessions = SessionStore(url="SUPABASE_URL", key="SUPABASE_KEY", backend=backend_from_env())
     brain.init_globals(sessions)
-    
-    # 2. Define the tasks
-    # Task A: WebSocket Server for Audio (Listens on 5001)
-    audio_task = start_audio_server(stt, tts, port=5001)
-    
-    # Task B: ESL Client for Control (Connects to FS:8021)
-    esl_task = run_esl_client(host="127.0.0.1", port=8021, password="ClueCon")
-
-    # 3. Signals for graceful exit
+
+    # Task A: Initialize Shared AI Models in parallel, warm them, then open the gate
+    print("⏳ Loading AI Models...")
+    ready = asyncio.Event()
+    tasks = [startup.start_models(ready)]
+
+    # Task B: WebSocket Server for Audio (Listens on 5001)
+    tasks.append(start_audio_server(startup.stt, startup.tts, port=port, reuse_port=reuse_port))
+
+    # Task C: Pick up newly published RAG index versions without a restart
+    tasks.append(watch_index(brain.rag))
+
+    # Task D: Degrade gracefully when the GPU queues fall behind the SLO
+    tasks.append(overload.run())
+    # ...and publish which calls' audio is furthest behind real time
+    tasks.append(report_lag())
+    if os.getenv("ZENTRY_METRICS_PORT"):
+        from telemetry.metrics import serve_metrics
+        # Per process; with several front-ends each scrape lands on one of them
+        tasks.append(serve_metrics(int(os.getenv("ZENTRY_METRICS_PORT")), reuse_port=reuse_port))
+
+    # Task E: ESL Client for Control (Connects to FreeSWITCH, ZENTRY_ESL_HOST, once models are ready)
+    if esl:
+        tasks.append(run_esl_client(ready=ready))
+    # Front-end: tell the parent's ESL client once our models are warm
+    if up is not None:
+        async def report_ready():
+            await ready.wait()
+            up.set()
+        tasks.append(report_ready())
+
+    print("🚀 Zentry AI System Started. Waiting for calls...")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # Write out whatever the last flush interval had not reached yet
+        await sessions.flush_all()
+        from db.client import close_db
+        await close_db()
+
+def run_loop(main_coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    # Signals for graceful exit
     signals = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT)
     for s in signals:
         loop.add_signal_handler(s, lambda s=s: asyncio.create_task(shutdown(loop, s)))
     loop.set_exception_handler(handle_exception)
 
-    print("🚀 Zentry AI System Started. Waiting for calls...")
-
     try:
-        loop.run_until_complete(asyncio.gather(audio_task, esl_task))
-    except asyncio.CancelledError:
-        pass
+        loop.run_until_complete(main_coro)
+    except (asyncio.CancelledError, RuntimeError):
+        pass # loop.stop() from shutdown()
     finally:
         loop.close()
-        print("🛑 System Shutdown Complete.")
\ No newline at end of file
+
+def run_single(args):
+    run_loop(run_voice_server(port=args.port, esl=not args.no_esl))
+    print("🛑 System Shutdown Complete.")
+
+def run_esl_only(args):
+    # Controller outside the ring: no models, no audio. Sends every call's stream
+    # to its ZENTRY_NODES owner, which sets the call up when the websocket arrives.
+    from backend.call_registry import NullRegistry
+    print("🚦 ESL-only controller: routing calls to ZENTRY_NODES")
+    # Not a ring member, so should_handle() routes every call (even with an audio node on this box)
+    run_loop(run_esl_client(registry=NullRegistry(), node_id="esl-controller"))
+    print("🛑 System Shutdown Complete.")
+
+def run_frontend(port, up):
+    # Child process: models resolve to workers/ipc.py proxies (env set by start_workers)
+    run_loop(run_voice_server(port=port, reuse_port=True, esl=False, up=up))
+
+def wait_frontends(frontends, timeout=600):
+    """Blocks until every front-end has set its ready event; fails fast if one dies."""
+    deadline = time.monotonic() + timeout
+    for p, up in frontends:
+        while not up.wait(0.5):
+            if not p.is_alive():
+                raise RuntimeError(f"{p.name} exited during startup (code {p.exitcode})")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{p.name} not ready after {timeout}s")
+
+async def run_esl_parent(frontends, esl=True):
+    # Same gate as single-process mode: no CHANNEL_ANSWER handling until the
+    # workers (started before this) and every front-end are warm
+    ready = asyncio.Event()
+
+    async def gate():
+        try:
+            await asyncio.to_thread(wait_frontends, frontends)
+        except Exception as e:
+            logging.error(f"❌ Front-ends failed to start, not taking calls: {e}")
+            raise
+        print("✅ All front-ends ready")
+        ready.set()
+
+    # The front-end that receives a call's websocket does its setup and teardown
+    from backend.call_registry import NullRegistry
+    if not esl:
+        # Audio-only node: calls are routed here by an ESL client elsewhere
+        await gate()
+        await asyncio.Future()
+    await asyncio.gather(gate(), run_esl_client(ready=ready, registry=NullRegistry()))
+
+def run_multiprocess(args):
+    from session.backends import backend_kind
+    from workers.model_server import start_workers
+
+    # Calls spread over the front-ends by SO_REUSEPORT, so a caller's sessions must be shared
+    if backend_kind() == "memory":
+        raise SystemExit(
+            "❌ --frontends needs a shared session backend (ZENTRY_SESSION_BACKEND=supabase or redis); "
+            "the memory backend would give every front-end its own history"
+        )
+
+    # 1. One process per model, shared by every front-end (blocks until they're loaded)
+    workers = start_workers()
+
+    # 2. Audio front-ends share port 5001 via SO_REUSEPORT
+    ctx = mp.get_context("spawn")
+    frontends = []
+    for i in range(args.frontends):
+        up = ctx.Event()
+        frontends.append((ctx.Process(target=run_frontend, args=(args.port, up), name=f"frontend-{i}", daemon=True), up))
+    for p, _ in frontends:
+        p.start()
+    print(f"🚀 {args.frontends} audio front-ends starting on :{args.port}")
+
+    # 3. This process only drives FreeSWITCH over ESL, once the front-ends are ready
+    try:
+        run_loop(run_esl_parent(frontends, esl=not args.no_esl))
+    finally:
+        procs = [p for p, _ in frontends] + workers
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join(timeout=10)
+        print("🛑 System Shutdown Complete.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zentry voice backend")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument(
+        "--frontends", type=int, default=0,
+        help="run N audio front-end processes with models in shared worker processes (0 = single process)"
+    )
+    # Multi-node: FreeSWITCH events reach the ring either through every node's own ESL
+    # client (ZENTRY_ESL_HOST pointing at the switch) or through one --esl-only controller
+    # plus --no-esl audio nodes
+    parser.add_argument("--no-esl", action="store_true", help="audio node only; another process drives FreeSWITCH")
+    parser.add_argument("--esl-only", action="store_true", help="only route calls to ZENTRY_NODES over ESL (no models)")
+    args = parser.parse_args()
+
+    if args.esl_only:
+        run_esl_only(args)
+    elif args.frontends > 0:
+        run_multiprocess(args)
+    else:
+        run_single(args)
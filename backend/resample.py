@@ -0,0 +1,144 @@
+# backend/resample.py
+# Rational-ratio polyphase resampling (8k <-> 16k and friends).
+#
+# The anti-aliasing filter for each rate pair is designed once and cached.
+# Each output phase is a short FIR applied as whole-array strided
+# multiply-adds, so the Python loop runs per tap, never per sample.
+from functools import lru_cache
+from math import ceil, gcd
+import numpy as np
+
+ZERO_CROSSINGS = 8   # filter half-width, in input/output samples
+ROLLOFF = 0.94       # cutoff as a fraction of the lower Nyquist
+KAISER_BETA = 8.0
+MAX_TAP_PHASES = 8   # above this many phases, gather windows instead
+
+def _ratio(src_rate, dst_rate):
+    g = gcd(int(src_rate), int(dst_rate))
+    return int(dst_rate) // g, int(src_rate) // g  # (up L, down M)
+
+
+@lru_cache(maxsize=None)
+def polyphase_filter(up, down):
+    """
+    Returns (H, delay): H[p, k] = h[p + k*up] of the windowed-sinc prototype,
+    delay = group delay in upsampled samples. Cached per rate pair.
+    """
+    n_taps = 2 * ZERO_CROSSINGS * max(up, down) + 1
+    cutoff = ROLLOFF / max(up, down)
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    h = up * cutoff * np.sinc(cutoff * n) * np.kaiser(n_taps, KAISER_BETA)
+
+    per_phase = ceil(n_taps / up)
+    h = np.pad(h, (0, per_phase * up - n_taps))
+    H = np.ascontiguousarray(h.reshape(per_phase, up).T, dtype=np.float32)
+    H.setflags(write=False)
+    return H, (n_taps - 1) // 2
+
+
+def _polyphase(buf, offset, m0, m1, up, down, H, delay):
+    """
+    Output samples [m0, m1) from buf, where buf[0] is absolute input index
+    `offset` and holds every input sample those outputs depend on.
+    """
+    out = np.empty(m1 - m0, dtype=np.float32)
+    if m1 <= m0:
+        return out
+    K = H.shape[1]
+
+    if up <= MAX_TAP_PHASES:
+        # All outputs m = r (mod up) share a phase, and their input index
+        # advances by exactly `down`: per residue, K strided multiply-adds
+        n = len(range(m0, m1, up))
+        acc, tmp = np.empty(n, dtype=np.float32), np.empty(n, dtype=np.float32)
+        for r in range(min(up, m1 - m0)):
+            t0 = (m0 + r) * down + delay
+            taps = H[t0 % up]
+            count = len(range(m0 + r, m1, up))
+            start = t0 // up - offset
+            stop = start + (count - 1) * down + 1
+            a, b = acc[:count], tmp[:count]
+            np.multiply(buf[start:stop:down], taps[0], out=a)
+            for k in range(1, K):
+                np.multiply(buf[start - k:stop - k:down], taps[k], out=b)
+                a += b
+            out[r::up] = a
+    else:
+        t = np.arange(m0, m1) * down + delay
+        windows = np.lib.stride_tricks.sliding_window_view(buf, K)
+        taps = H[:, ::-1][t % up]
+        out[:] = np.einsum("ij,ij->i", windows[t // up - offset - (K - 1)], taps)
+    return out
+
+
+def resample(audio, src_rate, dst_rate):
+    """Resamples a whole float array; output length is ceil(n * dst / src)."""
+    audio = np.asarray(audio, dtype=np.float32)
+    up, down = _ratio(src_rate, dst_rate)
+    if up == down:
+        return audio
+    H, delay = polyphase_filter(up, down)
+    K = H.shape[1]
+
+    n_out = ceil(len(audio) * up / down)
+    # K-1 zeros of history in front, enough zeros behind for the filter delay
+    tail = delay // up + K
+    buf = np.concatenate([np.zeros(K - 1, np.float32), audio, np.zeros(tail, np.float32)])
+    return _polyphase(buf, -(K - 1), 0, n_out, up, down, H, delay)
+
+
+def pcm16_to_float(pcm_bytes):
+    return np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class StreamingResampler:
+    """
+    Chunk-by-chunk resampling with filter state carried across calls.
+    Concatenating every process() output plus flush() equals resample() on
+    the joined input.
+    """
+    def __init__(self, src_rate, dst_rate):
+        self.up, self.down = _ratio(src_rate, dst_rate)
+        self.H, self.delay = polyphase_filter(self.up, self.down)
+        self.K = self.H.shape[1]
+        self.reset()
+
+    def reset(self):
+        self._buf = np.zeros(self.K - 1, dtype=np.float32)
+        self._offset = -(self.K - 1)  # absolute input index of _buf[0]
+        self._n_in = 0
+        self._m = 0                   # next output index
+
+    def _base(self, m):
+        return (m * self.down + self.delay) // self.up
+
+    def process(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if self.up == self.down:
+            return chunk
+        self._buf = np.concatenate([self._buf, chunk])
+        self._n_in += len(chunk)
+
+        # Emit every output whose newest input sample has arrived
+        # (m * down + delay) // up <= n_in - 1
+        m_end = max(self._m, (self._n_in * self.up - self.delay - 1) // self.down + 1)
+        out = _polyphase(self._buf, self._offset, self._m, m_end, self.up, self.down, self.H, self.delay)
+        self._m = m_end
+
+        # Keep only the history the next output still needs
+        keep_from = self._base(self._m) - (self.K - 1)
+        drop = min(max(0, keep_from - self._offset), len(self._buf))
+        if drop:
+            self._buf = self._buf[drop:]
+            self._offset += drop
+        return out
+
+    def flush(self):
+        """Emits the outputs still waiting on the filter delay, then resets."""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        n_out = ceil(self._n_in * self.up / self.down)
+        buf = np.concatenate([self._buf, np.zeros(self.delay // self.up + self.K, np.float32)])
+        out = _polyphase(buf, self._offset, self._m, n_out, self.up, self.down, self.H, self.delay)
+        self.reset()
+        return out
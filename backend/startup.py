@@ -0,0 +1,119 @@
+# backend/startup.py
+# Loads every model in parallel, warms each one up with a real inference,
+# and flips the readiness gate the ESL client waits on before taking calls.
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from llm.lazy import LazyModel, MODELS
+from workers.ipc import RemoteSTT, RemoteTTS, workers_enabled
+from workers.model_server import TTS_PATH, WHISPER_PATH
+
+def _load_stt():
+    if workers_enabled():
+        return RemoteSTT()
+    from backend.stt_worker import MalayalamSTT
+    return MalayalamSTT(WHISPER_PATH)
+
+def _load_tts():
+    if workers_enabled():
+        return RemoteTTS()
+    from tts.tts_module import TTSModule
+    return TTSModule(TTS_PATH)
+
+# Shared engines handed to the audio server
+stt = LazyModel(
+    "whisper", _load_stt,
+    warmup=lambda s: s._sync_transcribe(np.zeros(16000, dtype=np.int16).tobytes(), 16000),
+)
+tts = LazyModel("tts", _load_tts, warmup=lambda t: t.tell("നമസ്കാരം", play=False))
+
+last_report = {}
+
+def load_models(names=None, warmup=True):
+    """
+    Loads (and warms) the registered models concurrently. Models that depend
+    on another one (intent -> MiniLM, rag -> MiniLM) simply wait on its load.
+    Returns {name: {"load_s", "warmup_s"}} plus a "_total" entry.
+    """
+    import llm.brain  # registers phi / rag and pulls in intent, minilm, indictrans
+
+    selected = [MODELS[n] for n in (names or MODELS)]
+    started = time.perf_counter()
+    errors = {}
+
+    def run(model):
+        try:
+            model.warmup() if warmup else model.get()
+        except Exception as e:
+            errors[model._name] = e
+            logging.error(f"❌ {model._name} failed to load: {e}")
+
+    with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+        list(pool.map(run, selected))
+
+    wall = time.perf_counter() - started
+    report = {
+        m._name: {"load_s": m.load_seconds, "warmup_s": m.warmup_seconds}
+        for m in selected
+    }
+    report["_total"] = {
+        "wall_s": wall,
+        # Dependent models (intent, rag) include their wait on MiniLM here
+        "sum_s": sum((r["load_s"] or 0) + (r["warmup_s"] or 0) for r in report.values()),
+    }
+    _print_report(report)
+    last_report.clear()
+    last_report.update(report)
+
+    if errors:
+        raise RuntimeError(f"Models failed to load: {', '.join(errors)}")
+    return report
+
+def _print_report(report):
+    total = report["_total"]
+    print(f"📊 Models ready in {total['wall_s']:.1f}s (sum of per-model times {total['sum_s']:.1f}s)")
+    for name, r in report.items():
+        if name == "_total":
+            continue
+        load = f"{r['load_s']:.1f}s" if r["load_s"] is not None else "-"
+        warm = f"{r['warmup_s']:.2f}s" if r["warmup_s"] is not None else "-"
+        print(f"    {name:<11} load {load:>7}   warmup {warm:>7}")
+
+PHRASES_PATH = os.path.join(os.path.dirname(__file__), "..", "tts", "phrases_ml.txt")
+
+def prewarm_tts(path=PHRASES_PATH):
+    """
+    Fills the TTS cache with the phrase file, the translated fixed
+    guardrail replies and the overload hold message, so those are never
+    synthesized during a call.
+    """
+    from backend.call_pipeline import LEG_SAMPLE_RATE
+    from llm.guardrails import FIXED_REPLIES
+    from llm.overload import HOLD_MESSAGE_ML
+    from llm.translate import en_to_ml
+
+    phrases = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            phrases = [l.strip() for l in f if l.strip() and not l.startswith("#")]
+    except FileNotFoundError:
+        logging.warning(f"TTS phrase file not found: {path}")
+    phrases += [en_to_ml(text) for text in FIXED_REPLIES]
+    phrases.append(HOLD_MESSAGE_ML)
+
+    started = time.perf_counter()
+    added = tts.prewarm(phrases, LEG_SAMPLE_RATE)
+    print(f"🔊 TTS cache: {added} new of {len(phrases)} phrases in {time.perf_counter() - started:.1f}s")
+
+async def start_models(ready: asyncio.Event, names=None):
+    """Loads off the event loop, pre-synthesizes fixed phrases, then opens the gate."""
+    await asyncio.to_thread(load_models, names)
+    if names is None or "tts" in names:
+        try:
+            await asyncio.to_thread(prewarm_tts)
+        except Exception as e:
+            logging.warning(f"TTS cache prewarm skipped: {e}")
+    ready.set()
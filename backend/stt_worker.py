@@ -1,41 +1,169 @@
 import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from faster_whisper import WhisperModel
+from backend.resample import pcm16_to_float, resample
+from telemetry.metrics import metrics
+
+# Smaller model for overload tiers (llm/overload.py light_stt); unset = always the main one
+WHISPER_LIGHT_PATH = os.getenv("WHISPER_LIGHT_PATH")
+
+# cuda: GPU model first, int8 CPU workers take the overflow
+# cpu:  everything on int8 CPU workers (tests, small deployments)
+STT_DEVICE = os.getenv("ZENTRY_STT_DEVICE", "cuda")
+CPU_WORKERS = int(os.getenv("ZENTRY_STT_CPU_WORKERS", "0"))
+CPU_THREADS = int(os.getenv("ZENTRY_STT_CPU_THREADS", "2"))     # per worker
+OVERFLOW_MS = float(os.getenv("ZENTRY_STT_OVERFLOW_MS", "300"))  # estimated GPU wait before spilling
+GPU_SLOTS = 3
+
+class OverflowRouter:
+    """
+    Decides per utterance: primary model, or an idle CPU overflow worker.
+
+    Estimated primary wait = audio seconds queued or running on it x its
+    measured real-time factor / slots. An utterance spills to the CPU when
+    that wait is over overflow_ms and the slower CPU would still finish it
+    sooner, so short utterances are the first to move (a long one would
+    take longer on the CPU than waiting for the GPU).
+    """
+    def __init__(self, slots=GPU_SLOTS, cpu_workers=0, overflow_ms=OVERFLOW_MS, cpu_max_s=8.0,
+                 primary_rtf=0.05, cpu_rtf=0.5):
+        self.slots = slots
+        self.cpu_workers = cpu_workers
+        self.overflow_ms = overflow_ms
+        self.cpu_max_s = cpu_max_s
+        self.rtf = {"primary": primary_rtf, "overflow": cpu_rtf}  # EMA of service time / audio time
+        self.pending_s = 0.0
+        self.cpu_busy = 0
+        self._lock = threading.Lock()
+
+    def estimated_wait_ms(self):
+        return self.pending_s * self.rtf["primary"] / self.slots * 1000
+
+    def choose(self, seconds):
+        with self._lock:
+            wait = self.estimated_wait_ms()
+            metrics.set("stt_primary_wait_est_ms", round(wait, 1))
+            if self.cpu_busy < self.cpu_workers and seconds <= self.cpu_max_s and wait > self.overflow_ms:
+                if seconds * self.rtf["overflow"] * 1000 < wait + seconds * self.rtf["primary"] * 1000:
+                    self.cpu_busy += 1
+                    return "overflow"
+            self.pending_s += seconds
+            return "primary"
+
+    def done(self, route, seconds, service_s=None):
+        with self._lock:
+            if route == "overflow":
+                self.cpu_busy -= 1
+            else:
+                self.pending_s = max(0.0, self.pending_s - seconds)
+            if service_s is not None and seconds > 0.5:
+                self.rtf[route] = 0.8 * self.rtf[route] + 0.2 * (service_s / seconds)
+
 
 class MalayalamSTT:
-    def __init__(self, model_path):
-        print(f"⚙️ Loading Whisper Model: {model_path}")
-        self.model = WhisperModel(
-            model_path,
-            device="cuda",
-            compute_type="float16" # Use int8_float16 if VRAM is tight
-        )
-        # Allow max 3 concurrent GPU inferences. 
-        # The 4th call will wait asynchronously (non-blocking) until one finishes.
-        self.gpu_lock = asyncio.Semaphore(3)
-
-    async def transcribe(self, audio_bytes, sample_rate=16000):
-        # We use asyncio.to_thread to run the blocking model.transcribe 
+    def __init__(self, model_path, light_model_path=WHISPER_LIGHT_PATH, device=STT_DEVICE,
+                 cpu_workers=CPU_WORKERS, cpu_threads=CPU_THREADS, overflow_ms=OVERFLOW_MS):
+        self.device = device
+        print(f"⚙️ Loading Whisper Model: {model_path} ({device})")
+        if device == "cpu":
+            # CPU-only: the int8 workers are the primary model
+            slots = max(1, cpu_workers)
+            self.model = self._cpu_model(model_path, slots, cpu_threads)
+            self.cpu_model = None
+            self.cpu_pool = None
+        else:
+            slots = GPU_SLOTS
+            self.model = WhisperModel(
+                model_path,
+                device="cuda",
+                compute_type="float16" # Use int8_float16 if VRAM is tight
+            )
+            # Overflow pool: one int8 copy; num_workers lets that many utterances run at once
+            self.cpu_model = self._cpu_model(model_path, cpu_workers, cpu_threads) if cpu_workers else None
+        # Own threads for the overflow, so slow CPU decodes never tie up the default to_thread pool
+        self.cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="stt-cpu") if self.cpu_model else None
+        self.router = OverflowRouter(slots, cpu_workers if self.cpu_model else 0, overflow_ms)
+
+        # Loaded up front when configured: an overload is the worst moment for a model load
+        self.light_model = None
+        if light_model_path:
+            print(f"⚙️ Loading light Whisper Model: {light_model_path}")
+            if device == "cpu":
+                self.light_model = self._cpu_model(light_model_path, slots, cpu_threads)
+            else:
+                self.light_model = WhisperModel(light_model_path, device="cuda", compute_type="int8_float16")
+        # Allow max 3 concurrent GPU inferences (CPU-only: one per worker).
+        # The next call will wait asynchronously (non-blocking) until one finishes.
+        self.gpu_lock = asyncio.Semaphore(slots)
+        self._primary_slots = threading.Semaphore(slots)  # same limit for transcribe_blocking
+
+    @staticmethod
+    def _cpu_model(path, workers, threads):
+        print(f"⚙️ Whisper int8 CPU workers: {workers} x {threads} threads")
+        return WhisperModel(path, device="cpu", compute_type="int8", cpu_threads=threads, num_workers=workers)
+
+    async def transcribe(self, audio_bytes, sample_rate=16000, light=False):
+        # We use asyncio.to_thread to run the blocking model.transcribe
         # in a separate thread, but governed by the asyncio Semaphore.
-        async with self.gpu_lock:
-            return await asyncio.to_thread(self._sync_transcribe, audio_bytes, sample_rate)
+        seconds = len(audio_bytes) / 2 / sample_rate
+        route = self.router.choose(seconds)
+        metrics.inc("stt_routed_total", route=route)
+        service_s = None
+        try:
+            if route == "overflow":
+                started = time.perf_counter()
+                text = await asyncio.get_running_loop().run_in_executor(
+                    self.cpu_pool, self._sync_transcribe, audio_bytes, sample_rate, light, route
+                )
+                service_s = time.perf_counter() - started
+                return text
+            queued = time.perf_counter()
+            async with self.gpu_lock:
+                started = time.perf_counter()
+                metrics.observe("queue_wait_ms", (started - queued) * 1000, queue="stt")
+                text = await asyncio.to_thread(self._sync_transcribe, audio_bytes, sample_rate, light, route)
+                service_s = time.perf_counter() - started
+                return text
+        finally:
+            self.router.done(route, seconds, service_s)
+
+    def transcribe_blocking(self, audio_bytes, sample_rate=16000, light=False):
+        """Routed transcription for callers already on a thread (the whisper worker process)."""
+        seconds = len(audio_bytes) / 2 / sample_rate
+        route = self.router.choose(seconds)
+        metrics.inc("stt_routed_total", route=route)
+        service_s = None
+        try:
+            if route == "overflow":
+                started = time.perf_counter()
+                text = self._sync_transcribe(audio_bytes, sample_rate, light, route)
+            else:
+                queued = time.perf_counter()
+                with self._primary_slots:
+                    started = time.perf_counter()
+                    metrics.observe("queue_wait_ms", (started - queued) * 1000, queue="stt")
+                    text = self._sync_transcribe(audio_bytes, sample_rate, light, route)
+            service_s = time.perf_counter() - started
+            return text
+        finally:
+            self.router.done(route, seconds, service_s)
 
-    def _sync_transcribe(self, audio_bytes, sample_rate):
-        import numpy as np
-        
+    def _sync_transcribe(self, audio_bytes, sample_rate, light=False, route="primary"):
         # 1. Convert bytes -> float32 array
-        audio_array = np.frombuffer(audio_bytes, dtype=np.int16).flatten().astype(np.float32) / 32768.0
+        audio_array = pcm16_to_float(audio_bytes)
 
         # 2. Resample if needed (Whisper expects 16k)
+        # Cached polyphase filter; anti-aliased, unlike the old np.interp
         if sample_rate != 16000:
-            num_samples = len(audio_array)
-            target_num_samples = int(num_samples * 16000 / sample_rate)
-            # Use basic linear interpolation (fast, sufficient for STT)
-            audio_array = np.interp(
-                np.linspace(0.0, 1.0, target_num_samples, endpoint=False),
-                np.linspace(0.0, 1.0, num_samples, endpoint=False),
-                audio_array
-            )
+            audio_array = resample(audio_array, sample_rate, 16000)
 
         # 3. Transcribe
-        segments, _ = self.model.transcribe(audio_array, language="ml", beam_size=1)
-        return " ".join(s.text for s in segments).strip()
\ No newline at end of file
+        if route == "overflow":
+            model = self.cpu_model
+        else:
+            model = self.light_model if light and self.light_model else self.model
+        segments, _ = model.transcribe(audio_array, language="ml", beam_size=1)
+        return " ".join(s.text for s in segments).strip()
@@ -0,0 +1,131 @@
+# backend/turns.py
+# Per-call turn bookkeeping for CallPipeline. One reply in flight at a time:
+# if the caller starts talking again before we answer, the pending turn is
+# cancelled and its utterances are folded into the next one, so two quick
+# bursts cost one STT->LLM->TTS run and get one (newest) reply.
+import asyncio
+import logging
+from telemetry.metrics import metrics
+
+class Turn:
+    def __init__(self, seq, utterances):
+        self.seq = seq
+        self.utterances = utterances  # transcription tasks, in speaking order
+        self.task = None
+        self.speaking = False         # reply audio has started going out
+        self.stopped = False          # cancel requested; lands at the task's next await
+
+    @property
+    def active(self):
+        return self.task is not None and not self.task.done() and not self.stopped
+
+
+class TurnManager:
+    """
+    respond(text_ml, turn) does the LLM/TTS work for a turn and must call
+    claim_reply(turn) right before it sends audio; a False there means a
+    newer turn exists and the reply is dropped.
+
+    Transcription tasks outlive the turn that started them (they are
+    shielded and carried over), so the manager tracks them itself:
+    cancel() stops every one of them along with the turn.
+
+        speech starts while a turn is thinking  -> turn cancelled, utterances carried over
+        speech starts while a reply is going out -> reply cancelled (barge-in), nothing carried
+        utterance ends                          -> new turn over carried + this utterance
+    """
+    def __init__(self, respond, name="", track=None):
+        self.respond = respond
+        self.name = name
+        self.track = track          # CallRegistry.track, so a hangup cancels the turn
+        self.seq = 0
+        self.current = None
+        self.carry = []             # utterances of a superseded turn, waiting for the next one
+        self.stt_tasks = set()      # every transcription still running for this call
+        self.counts = {"turns": 0, "merged": 0, "superseded": 0, "interrupted": 0, "stale": 0, "empty": 0}
+
+    @property
+    def responding(self):
+        return self.current is not None and self.current.active
+
+    def speech_started(self):
+        if self.responding:
+            self._stop(self.current)
+
+    def watch(self, task):
+        """Ties a transcription task (utterance or partial) to the call, so cancel() stops it."""
+        self.stt_tasks.add(task)
+        task.add_done_callback(self.stt_tasks.discard)
+        if self.track:
+            self.track(task)
+        return task
+
+    def utterance(self, text_task):
+        """A finished utterance whose transcription is already running in text_task."""
+        self.watch(text_task)
+        if self.responding:
+            self._stop(self.current)
+        utterances = self.carry + [text_task]
+        if self.carry:
+            self._count("merged", len(self.carry))
+        self.carry = []
+
+        self.seq += 1
+        turn = Turn(self.seq, utterances)
+        turn.task = asyncio.create_task(self._run(turn))
+        if self.track:
+            self.track(turn.task)
+        self.current = turn
+        self._count("turns")
+        return turn
+
+    def claim_reply(self, turn):
+        if turn is not self.current or turn.stopped:
+            self._count("stale")
+            print(f"[{self.name}] 🗑️ Dropping reply for superseded turn {turn.seq}")
+            return False
+        turn.speaking = True
+        return True
+
+    def cancel(self):
+        # Call over: the turn, and every transcription the shields kept alive
+        self.carry = []
+        if self.current:
+            self.current.task.cancel()
+        for task in list(self.stt_tasks):
+            task.cancel()
+
+    def _stop(self, turn):
+        turn.stopped = True
+        turn.task.cancel()
+        if turn.speaking:
+            print(f"[{self.name}] 🛑 Barge-in: Cancelling AI response")
+            self._count("interrupted")
+        else:
+            # Caller wasn't finished: answer everything together once they are
+            self.carry = turn.utterances + self.carry
+            self._count("superseded")
+
+    def _count(self, what, n=1):
+        self.counts[what] += n
+        metrics.inc(f"turn_{what}_total", n)
+
+    async def _run(self, turn):
+        texts = []
+        for task in turn.utterances:
+            try:
+                # Shielded: a superseded turn hands its transcriptions to the next one
+                text = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise  # this turn was superseded
+                continue
+            except Exception as e:
+                logging.error(f"STT failed for a turn utterance: {e}")
+                continue
+            if text and len(text.strip()) >= 2:
+                texts.append(text.strip())
+        if not texts:
+            self._count("empty")
+            return
+        await self.respond(" ".join(texts), turn)
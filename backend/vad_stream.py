@@ -1,13 +1,23 @@
 import numpy as np
 import logging
 import os
+from backend.endpointing import ENDPOINTING, Endpointer
 
 class VADStreamer:
     """
     VADStreamer using Silero VAD (ONNX) for high-performance voice activity detection.
     Supports 8000Hz and 16000Hz.
     """
-    def __init__(self, sample_rate=16000, min_energy=0.1, threshold=0.5):
+    def __init__(self, sample_rate=16000, min_energy=0.1, threshold=0.5,
+                 endpointing=None, partials=None, tail_ms=96, partial_after_ms=192):
+        """
+        endpointing: "fixed" (500ms hangover) or "adaptive" (backend/endpointing.py);
+            default ZENTRY_ENDPOINTING
+        partials: in adaptive mode, return "PAUSE" once per silence after
+            partial_after_ms so the caller can transcribe pending_audio() and
+            hand the text to set_partial(); default ZENTRY_PARTIAL_STT
+        tail_ms: trailing silence kept on an utterance; the rest is trimmed before STT
+        """
         self.sample_rate = sample_rate
         self.threshold = threshold
         self.min_energy = min_energy
@@ -28,6 +38,16 @@ class VADStreamer:
         self.silence_duration = 0 # in chunks
         self.max_silence_chunks = int(500 / 32) # ~500ms of silence to stop
 
+        endpointing = endpointing or ENDPOINTING
+        self.endpointer = Endpointer(frame_ms=32) if endpointing == "adaptive" else None
+        if partials is None:
+            partials = os.getenv("ZENTRY_PARTIAL_STT", "0") == "1"
+        self.partials = bool(partials) and self.endpointer is not None
+        self.partial_after_chunks = max(1, round(partial_after_ms / 32))
+        self.tail_chunks = round(tail_ms / 32)
+        self.utterance_id = 0     # bumps on every speech onset; tags partials
+        self.trimmed_bytes = 0    # trailing silence never sent to STT
+
         # AI State for Silero
         self.session = None
         self._h = np.zeros((2, 1, 64), dtype=np.float32)
@@ -75,6 +95,7 @@ class VADStreamer:
         
         detected_utterance = None
         barge_in_triggered = False
+        pause_triggered = False
 
         while len(self.buffer) >= required_bytes:
             # Extract frame
@@ -103,20 +124,36 @@ class VADStreamer:
             
             # Logic
             is_speech = speech_prob > self.threshold
+            if self.endpointer:
+                self.endpointer.tick()
             
             if is_speech:
                 if not self.in_speech:
                     self.in_speech = True
                     barge_in_triggered = True
                     self.speech_buffer = bytearray()
+                    self.utterance_id += 1
+                    if self.endpointer:
+                        self.endpointer.speech_started()
+                elif self.silence_duration and self.endpointer:
+                    self.endpointer.speech_resumed(self.silence_duration)
                 self.speech_buffer.extend(frame_bytes)
                 self.silence_duration = 0
             else:
                 if self.in_speech:
                     self.speech_buffer.extend(frame_bytes)
                     self.silence_duration += 1
-                    if self.silence_duration > self.max_silence_chunks:
-                        detected_utterance = bytes(self.speech_buffer)
+                    if self.endpointer:
+                        done = self.endpointer.silence(speech_prob, self.silence_duration)
+                        if self.partials and self.silence_duration == self.partial_after_chunks and not done:
+                            pause_triggered = True
+                    else:
+                        done = self.silence_duration > self.max_silence_chunks
+                    if done:
+                        detected_utterance = self.pending_audio()
+                        self.trimmed_bytes += len(self.speech_buffer) - len(detected_utterance)
+                        if self.endpointer:
+                            self.endpointer.turn_ended(self.silence_duration)
                         self.in_speech = False
                         self.speech_buffer = bytearray()
                         self.silence_duration = 0
@@ -125,5 +162,18 @@ class VADStreamer:
         
         if barge_in_triggered:
             return "BARGE_IN"
+
+        if detected_utterance is None and pause_triggered and self.in_speech:
+            return "PAUSE"
         
-        return detected_utterance
\ No newline at end of file
+        return detected_utterance
+
+    def pending_audio(self):
+        """Current utterance with its trailing silence cut down to tail_ms."""
+        cut = max(0, self.silence_duration - self.tail_chunks) * self.window_size_samples * 2
+        return bytes(self.speech_buffer[:len(self.speech_buffer) - cut])
+
+    def set_partial(self, utterance_id, text):
+        """Partial transcript of pending_audio(); ignored once that utterance has moved on."""
+        if self.endpointer and self.in_speech and utterance_id == self.utterance_id and self.silence_duration:
+            self.endpointer.partial(text)
\ No newline at end of file
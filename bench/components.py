@@ -0,0 +1,300 @@
+# bench/components.py
+# One benchmark per hot component. Each returns a list of metrics:
+#   {"name", "value", "unit", "higher_is_better"}
+import tempfile
+import time
+import numpy as np
+from bench import fixtures
+from bench import stubs
+
+class Skipped(Exception):
+    pass
+
+
+def measure(fn, min_seconds=1.0, min_runs=5, warmup=2):
+    """Runs fn until both limits are met; returns per-call seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < min_runs or time.perf_counter() - start < min_seconds:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return np.array(samples)
+
+
+def metric(name, value, unit, higher_is_better=False):
+    return {"name": name, "value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def latency_metrics(prefix, samples):
+    return [
+        metric(f"{prefix}.p50_ms", np.percentile(samples, 50) * 1000, "ms"),
+        metric(f"{prefix}.p95_ms", np.percentile(samples, 95) * 1000, "ms"),
+    ]
+
+
+def _require(module_name):
+    try:
+        __import__(module_name)
+    except Exception as e:
+        raise Skipped(f"{module_name} unavailable: {e}")
+
+# ---------------------------------------------------------
+# Audio path
+# ---------------------------------------------------------
+
+def bench_vad(mode, seconds):
+    _require("backend.vad_stream")
+    if mode == "real":
+        from backend.vad_stream import VADStreamer
+        vad = VADStreamer(sample_rate=8000, min_energy=400)
+    else:
+        vad = stubs.stub_vad(8000)
+
+    frames = fixtures.chunks(fixtures.call_audio_8k(10.0))
+    windows = len(b"".join(frames)) // (vad.window_size_samples * 2)
+
+    def run():
+        vad.reset_states()
+        vad.buffer = bytearray()
+        for f in frames:
+            vad.process_chunk(f)
+
+    samples = measure(run, min_seconds=seconds)
+    return [metric("vad.frames_per_sec", windows / np.median(samples), "frames/s", True)]
+
+
+def bench_stt_resample(mode, seconds):
+    _require("backend.stt_worker")
+    stt = stubs.stub_stt()
+    audio = fixtures.utterance_8k(3.0)
+    samples = measure(lambda: stt._sync_transcribe(audio, 8000), min_seconds=seconds)
+    return latency_metrics("stt_resample", samples)
+
+
+def _legacy_interp(audio, src_rate, dst_rate):
+    # What MalayalamSTT._sync_transcribe did before backend/resample.py
+    n = len(audio)
+    target = int(n * dst_rate / src_rate)
+    return np.interp(
+        np.linspace(0.0, 1.0, target, endpoint=False),
+        np.linspace(0.0, 1.0, n, endpoint=False),
+        audio,
+    )
+
+
+def bench_resample(mode, seconds):
+    from backend.resample import StreamingResampler, pcm16_to_float, resample
+    x8 = pcm16_to_float(fixtures.utterance_8k(3.0))
+    x16 = fixtures.tts_audio_16k(4.0)
+    frames = [x8[i:i + 160] for i in range(0, len(x8), 160)]
+
+    def stream():
+        rs = StreamingResampler(8000, 16000)
+        for f in frames:
+            rs.process(f)
+        rs.flush()
+
+    results = []
+    for name, fn, n_in in [
+        ("resample_8k_16k.polyphase", lambda: resample(x8, 8000, 16000), len(x8)),
+        ("resample_8k_16k.interp", lambda: _legacy_interp(x8, 8000, 16000), len(x8)),
+        ("resample_8k_16k.stream_20ms", stream, len(x8)),
+        ("resample_16k_8k.polyphase", lambda: resample(x16, 16000, 8000), len(x16)),
+    ]:
+        samples = measure(fn, min_seconds=seconds)
+        results.append(metric(f"{name}.msamples_per_sec", n_in / np.median(samples) / 1e6, "Msamples/s", True))
+    return results
+
+
+def bench_payload_encode(mode, seconds):
+    from backend.audio_payload import float_to_pcm16, stream_audio_payload
+    audio = fixtures.tts_audio_16k(4.0)
+    samples = measure(lambda: stream_audio_payload(float_to_pcm16(audio), 16000), min_seconds=seconds)
+    return latency_metrics("payload_encode", samples)
+
+
+def bench_tts(mode, seconds):
+    _require("tts.tts_module")
+    if mode == "real":
+        from tts.tts_module import TTSModule
+        tts = TTSModule("models/mms-tts-mal.onnx")
+    else:
+        tts = stubs.stub_tts()
+
+    text = fixtures.REPLIES_ML[0]
+    audio_seconds = len(tts.tell(text, play=False)) / 16000
+    samples = measure(lambda: tts.tell(text, play=False), min_seconds=seconds)
+
+    # Recurring phrase at the call-leg rate: first call synthesizes, the rest hit the cache
+    from tts.tts_cache import TTSCache
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tts.cache = TTSCache(cache_dir)
+        tts.tell_pcm(text, 8000)
+        cached = measure(lambda: tts.tell_pcm(text, 8000), min_seconds=seconds)
+        tts.cache = None
+
+    return latency_metrics("tts", samples) + latency_metrics("tts.cache_hit", cached) + [
+        metric("tts.rtf", np.median(samples) / audio_seconds, "x"),
+    ]
+
+# ---------------------------------------------------------
+# Language path
+# ---------------------------------------------------------
+
+def bench_intent(mode, seconds):
+    _require("llm.intent")
+    if mode == "real":
+        from llm.intent import detector
+    else:
+        from llm.intent import IntentDetector
+        detector = IntentDetector(model=stubs.StubEmbedder(call_ms=0, text_ms=0))
+    queries = fixtures.QUERIES_EN
+    samples = measure(lambda: [detector.detect(q) for q in queries], min_seconds=seconds)
+    return latency_metrics("intent", samples / len(queries))
+
+
+def bench_retrieve(mode, seconds):
+    _require("llm.rag.retriever")
+    if mode == "real":
+        from llm.rag.embedder import embedder_instance
+    else:
+        embedder_instance = stubs.StubEmbedder(call_ms=0, text_ms=0)
+    from llm.rag.retriever import RAGRetriever
+    from llm.rag.store import get_collection
+    from chromadb import Client
+    from chromadb.config import Settings
+
+    col = get_collection(Client(Settings(anonymized_telemetry=False)), name="bench")
+    docs = [d for d, _ in fixtures.RAG_CORPUS]
+    col.add(
+        ids=[f"bench-{i}" for i in range(len(docs))],
+        documents=docs,
+        embeddings=embedder_instance.embed(docs),
+        metadatas=[{"topic": t, "type": "doc"} for _, t in fixtures.RAG_CORPUS],
+    )
+    rag = RAGRetriever(embedder_instance=embedder_instance, collection=col)
+
+    queries = fixtures.QUERIES_EN
+    samples = measure(lambda: [rag.retrieve(q, "fees") for q in queries], min_seconds=seconds)
+    return latency_metrics("retrieve", samples / len(queries))
+
+
+def bench_build_prompt(mode, seconds):
+    from llm.prompt import ApproxTokenizer, PromptBudget
+    if mode == "real":
+        _require("llama_cpp")
+        from llm.brain import phi_tokenizer as tokenizer
+    else:
+        tokenizer = ApproxTokenizer()
+    budget = PromptBudget(tokenizer)
+    docs = [d for d, _ in fixtures.RAG_CORPUS[:3]]
+    args = (fixtures.QUERIES_EN[1], docs, fixtures.HISTORY, fixtures.SNAPSHOT)
+    samples = measure(lambda: budget.build(*args), min_seconds=seconds)
+    _, usage = budget.build(*args)
+    return latency_metrics("build_prompt", samples) + [metric("build_prompt.tokens", usage["total"], "tokens")]
+
+
+def _legacy_guardrails(response_en, intent, rag_docs, model):
+    """apply_guardrails before the GuardrailEngine: substring numbers, re-encode every doc."""
+    import re
+    if intent == "general":
+        return None
+    combined_context = " ".join(rag_docs)
+    for num in re.findall(r"\d+", response_en):
+        if num not in {"10", "12", "2024", "2025"} and num not in combined_context:
+            return "numeric"
+    res_emb = model.encode(response_en, normalize_embeddings=True)
+    ctx_emb = model.encode(rag_docs, normalize_embeddings=True)
+    return "grounding" if float(np.max(ctx_emb @ res_emb)) < 0.5 else None
+
+
+def bench_guardrails(mode, seconds, concurrency=8):
+    import asyncio
+    from llm.guardrails import GuardrailEngine
+    if mode == "real":
+        _require("sentence_transformers")
+        from llm.rag.embedder import Embedder
+        embedder = Embedder()
+        model = embedder.model
+    else:
+        embedder = model = stubs.StubEmbedder()
+    docs = [d for d, _ in fixtures.RAG_CORPUS[:3]]
+    # Stored vectors, as RAGRetriever.stored_vectors hands them over after a query
+    stored = dict(zip(docs, embedder.embed(docs)))
+    reply = fixtures.REPLIES_EN[0]
+
+    legacy = measure(lambda: _legacy_guardrails(reply, "fee", docs, model), min_seconds=seconds)
+
+    loop = asyncio.new_event_loop()
+    try:
+        engine = GuardrailEngine(embedder, stored_vectors=lambda ds: {d: stored[d] for d in ds if d in stored})
+        single = measure(lambda: loop.run_until_complete(engine.check(reply, "fee", docs)), min_seconds=seconds)
+
+        async def burst():
+            replies = [fixtures.REPLIES_EN[i % len(fixtures.REPLIES_EN)] for i in range(concurrency)]
+            await asyncio.gather(*(engine.check(r, "fee", docs) for r in replies))
+        per_turn = measure(lambda: loop.run_until_complete(burst()), min_seconds=seconds) / concurrency
+    finally:
+        loop.close()
+    return (
+        latency_metrics("guardrails_legacy", legacy)
+        + latency_metrics("guardrails", single)
+        + latency_metrics(f"guardrails_x{concurrency}_per_turn", per_turn)
+    )
+
+
+def bench_translate(mode, seconds):
+    _require("translate.translator")
+    if mode == "real":
+        from llm.translate import translator
+    else:
+        translator = stubs.stub_translator()
+    samples_ml = measure(lambda: translator.translate(fixtures.QUERIES_ML[0], "ml-en"), min_seconds=seconds)
+    samples_en = measure(lambda: translator.translate(fixtures.REPLIES_EN[0], "en-ml"), min_seconds=seconds)
+    return latency_metrics("translate_ml_en", samples_ml) + latency_metrics("translate_en_ml", samples_en)
+
+
+def bench_db(mode, seconds):
+    """Call setup + snapshot against LocalDB with a simulated round trip (real: Supabase)."""
+    import asyncio
+    from db import client
+    from db.call_repo import start_call
+    from db.snapshot_repo import prefetch_snapshot
+    if mode == "real":
+        if not client.SUPABASE_URL:
+            raise Skipped("SUPABASE_URL not set")
+        db = client.RestDB(client.SUPABASE_URL, client.SUPABASE_KEY)
+    else:
+        db = client.LocalDB(latency_ms=fixtures.DB_LATENCY_MS, seed=fixtures.DB_SEED)
+    previous = client.set_db(db)
+
+    async def call_setup():
+        _, caller_id = await start_call("bench-uuid", fixtures.BENCH_PHONE)
+        await prefetch_snapshot(caller_id)
+
+    loop = asyncio.new_event_loop()
+    try:
+        samples = measure(lambda: loop.run_until_complete(call_setup()), min_seconds=seconds)
+        loop.run_until_complete(db.close())
+    finally:
+        loop.close()
+        client.set_db(previous)
+    return latency_metrics("db_call_setup", samples)
+
+
+BENCHES = {
+    "vad": bench_vad,
+    "stt_resample": bench_stt_resample,
+    "resample": bench_resample,
+    "intent": bench_intent,
+    "retrieve": bench_retrieve,
+    "build_prompt": bench_build_prompt,
+    "guardrails": bench_guardrails,
+    "translate": bench_translate,
+    "db": bench_db,
+    "payload_encode": bench_payload_encode,
+    "tts": bench_tts,
+}
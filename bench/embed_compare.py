@@ -0,0 +1,76 @@
+# bench/embed_compare.py
+"""
+SentenceTransformer vs int8 ONNX MiniLM: cosine agreement on the admissions
+corpus, single-query latency and bulk throughput.
+
+    python -m bench.embed_compare                 # fixture corpus
+    python -m bench.embed_compare --chroma rag_db # every document in the live index
+
+Agreement is measured per text (cosine between the two backends' vectors)
+and as top-k retrieval overlap for the fixture queries. Exits non-zero when
+the minimum cosine falls below --min-cosine.
+"""
+import argparse
+import sys
+import numpy as np
+from bench import fixtures
+from bench.components import latency_metrics, measure
+
+def corpus_texts(chroma_path=None):
+    if chroma_path:
+        from llm.rag.store import get_chroma_client, get_collection
+        return get_collection(get_chroma_client(chroma_path)).get(include=["documents"])["documents"]
+    return (
+        [doc for doc, _ in fixtures.RAG_CORPUS]
+        + [en for _, en in fixtures.ADMISSIONS_PARALLEL]
+        + fixtures.REPLIES_EN
+    )
+
+
+def topk(queries, docs, k):
+    return [set(row) for row in np.argsort(-(queries @ docs.T), axis=1)[:, :k]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chroma", help="compare on the documents stored in this Chroma path")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args(argv)
+
+    from llm.rag.embedder import Embedder
+    reference = Embedder(backend="torch").model
+    candidate = Embedder(backend="onnx").model
+
+    texts = corpus_texts(args.chroma)
+    queries = fixtures.QUERIES_EN
+    ref_docs = np.asarray(reference.encode(texts, normalize_embeddings=True))
+    cand_docs = np.asarray(candidate.encode(texts, normalize_embeddings=True))
+
+    cosine = (ref_docs * cand_docs).sum(axis=1)
+    ref_top = topk(np.asarray(reference.encode(queries, normalize_embeddings=True)), ref_docs, args.top_k)
+    cand_top = topk(np.asarray(candidate.encode(queries, normalize_embeddings=True)), cand_docs, args.top_k)
+    overlap = np.mean([len(a & b) / len(a) for a, b in zip(ref_top, cand_top)])
+
+    print(f"📐 {len(texts)} texts: cosine min {cosine.min():.4f}  mean {cosine.mean():.4f}  "
+          f"top-{args.top_k} overlap {overlap:.0%}")
+
+    for name, model in (("torch", reference), ("onnx", candidate)):
+        single = measure(lambda: model.encode(queries[0], normalize_embeddings=True), min_seconds=args.seconds)
+        bulk = measure(lambda: model.encode(texts, batch_size=32, normalize_embeddings=True),
+                       min_seconds=args.seconds, min_runs=3)
+        for m in latency_metrics(f"{name}.single_query", single):
+            print(f"    {m['name']:<28} {m['value']:>10.3f} {m['unit']}")
+        print(f"    {name + '.bulk':<28} {len(texts) / np.median(bulk):>10.1f} texts/s")
+
+    worst = int(np.argmin(cosine))
+    if cosine[worst] < args.min_cosine:
+        print(f"\n❌ Cosine {cosine[worst]:.4f} below {args.min_cosine} for: {texts[worst][:80]!r}")
+        return 1
+    print("✅ ONNX embeddings agree with the reference model.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# bench/endpoint_replay.py
+"""
+Replays recorded-style caller audio through VADStreamer and scores end-of-turn
+detection against the known turn boundaries.
+
+    python -m bench.endpoint_replay                       # fixed vs adaptive, 40 synthetic callers
+    python -m bench.endpoint_replay --callers 200 --vad real
+    python -m bench.endpoint_replay --partial-accuracy 0.9 --partial-delay-ms 250
+
+latency      end of the caller's last word -> utterance handed to STT
+cut-offs     turns split because a mid-sentence pause was taken as the end
+stt audio    seconds of audio sent to STT (trailing silence is trimmed)
+
+--partial-accuracy simulates the partial-transcript hint: on every "PAUSE"
+the VAD gets a complete/incomplete-looking text after --partial-delay-ms,
+right with the given probability.
+"""
+import argparse
+import sys
+import numpy as np
+from bench import fixtures, stubs
+
+COMPLETE_TEXT = "ഫീസ് എത്രയാണ്?"
+DANGLING_TEXT = "മാനേജ്മെന്റ് ക്വാട്ട പിന്നെ"
+
+def _vad(kind, endpointing, partials):
+    if kind == "real":
+        from backend.vad_stream import VADStreamer
+        return VADStreamer(sample_rate=8000, min_energy=400, endpointing=endpointing, partials=partials)
+
+    from backend.vad_stream import VADStreamer
+
+    class _StubVAD(VADStreamer):
+        def load_model(self):
+            self.session = stubs.StubVADSession()
+
+    return _StubVAD(sample_rate=8000, min_energy=400, endpointing=endpointing, partials=partials)
+
+
+def replay(pcm, labels, vad, partial_accuracy=None, partial_delay_ms=250, rng=None, sample_rate=8000):
+    """Feeds 20ms chunks; returns per-turn latencies (s), cut-off count, seconds sent to STT."""
+    ends = np.array([end for _, end in labels])
+    latencies, cutoffs, sent = [], 0, 0.0
+    answered = set()
+    hints = []  # (due_seconds, utterance_id, text)
+
+    pos = 0
+    for chunk in fixtures.chunks(pcm):
+        pos += len(chunk) // 2
+        now = pos / sample_rate
+        while hints and hints[0][0] <= now:
+            _, uid, text = hints.pop(0)
+            vad.set_partial(uid, text)
+
+        result = vad.process_chunk(chunk)
+        if result == "PAUSE" and partial_accuracy is not None:
+            at_end = np.any((ends <= now) & (now - ends < 0.3))
+            right = rng.random() < partial_accuracy
+            text = COMPLETE_TEXT if at_end == right else DANGLING_TEXT
+            hints.append((now + partial_delay_ms / 1000, vad.utterance_id, text))
+        elif isinstance(result, bytes):
+            sent += len(result) / 2 / sample_rate
+            turn = int(np.searchsorted(ends, now - 1e-9) - 1)  # last turn that finished speaking
+            in_turn = [i for i, (s, e) in enumerate(labels) if s <= now < e]
+            if in_turn:
+                cutoffs += 1
+            elif turn >= 0 and turn not in answered:
+                answered.add(turn)
+                latencies.append(now - ends[turn])
+    return latencies, cutoffs, sent
+
+
+def run(callers, vad_kind, endpointing, partial_accuracy=None, partial_delay_ms=250):
+    rng = np.random.default_rng(fixtures.SEED)
+    latencies, cutoffs, turns, sent, trimmed = [], 0, 0, 0.0, 0.0
+    for seed in range(callers):
+        pcm, labels = fixtures.caller_turns_8k(seed)
+        vad = _vad(vad_kind, endpointing, partials=partial_accuracy is not None)
+        lat, cut, s = replay(pcm, labels, vad, partial_accuracy, partial_delay_ms, rng)
+        latencies += lat
+        cutoffs += cut
+        turns += len(labels)
+        sent += s
+        trimmed += vad.trimmed_bytes / 2 / 8000
+    lat = np.array(latencies) * 1000
+    return {
+        "turns": turns,
+        "latency_p50_ms": float(np.percentile(lat, 50)),
+        "latency_p95_ms": float(np.percentile(lat, 95)),
+        "cutoff_rate": cutoffs / turns,
+        "stt_audio_s": sent,
+        "trimmed_s": trimmed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=40)
+    parser.add_argument("--vad", choices=("stub", "real"), default="stub")
+    parser.add_argument("--partial-accuracy", type=float, help="simulate partial-transcript hints")
+    parser.add_argument("--partial-delay-ms", type=float, default=250, help="STT time for a partial")
+    parser.add_argument("--cutoff-slack", type=float, default=0.0,
+                        help="allowed cut-off rate above fixed endpointing")
+    args = parser.parse_args(argv)
+
+    modes = [("fixed", None), ("adaptive", None)]
+    if args.partial_accuracy is not None:
+        modes.append(("adaptive", args.partial_accuracy))
+
+    results = {}
+    print(f"{'mode':<20} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'cut-offs':>9} {'stt audio s':>12} {'trimmed s':>10}")
+    for endpointing, accuracy in modes:
+        name = endpointing if accuracy is None else f"{endpointing}+partials"
+        r = results[name] = run(args.callers, args.vad, endpointing, accuracy, args.partial_delay_ms)
+        print(f"{name:<20} {r['turns']:>6} {r['latency_p50_ms']:>8.0f} {r['latency_p95_ms']:>8.0f} "
+              f"{r['cutoff_rate']:>8.1%} {r['stt_audio_s']:>12.1f} {r['trimmed_s']:>10.1f}")
+
+    fixed, adaptive = results["fixed"], results["adaptive"]
+    for name, r in results.items():
+        if name != "fixed":
+            print(f"⏱️  {name} saves {fixed['latency_p50_ms'] - r['latency_p50_ms']:.0f} ms at p50 "
+                  f"({fixed['cutoff_rate']:.1%} -> {r['cutoff_rate']:.1%} turns cut off)")
+    ok = adaptive["cutoff_rate"] <= fixed["cutoff_rate"] + args.cutoff_slack
+    print("✅ No more cut-offs than fixed endpointing." if ok else "❌ Adaptive endpointing cuts off more turns.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# bench/fake_esl.py
+"""
+Local stand-in for FreeSWITCH's event socket, enough to drive ESLClient:
+auth, event subscription, api / bgapi (replies + BACKGROUND_JOB with a
+configurable delay), pushed channel events and forced disconnects.
+
+    python -m bench.fake_esl                           # 200 calls, 0.5s per uuid_audio_stream
+    python -m bench.fake_esl --calls 500 --rate 100 --drop-after 250
+
+Fires CHANNEL_ANSWER at --rate per second and reports how long each answer
+took to reach the call registry (must not grow with the job delay) and to
+finish its audio-stream job. Every answered call's command must run exactly
+once on the server, including across a dropped connection.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid as uuidlib
+from urllib.parse import quote
+import numpy as np
+from backend.esl import parse_headers
+
+class FakeESLServer:
+    def __init__(self, password="ClueCon", job_delay=0.0, host="127.0.0.1", port=0):
+        self.password = password
+        self.job_delay = job_delay
+        self.host = host
+        self.port = port
+        self.server = None
+        self.clients = set()
+        self.commands = []     # every command line received, in order
+        self.jobs_run = []     # bgapi commands executed (to spot duplicates)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.drop()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def drop(self):
+        """Closes every client connection, like a FreeSWITCH restart."""
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+
+    # ---------------------------------------------------------
+    # Wire format
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def _message(writer, headers, body=b""):
+        if body:
+            headers = {**headers, "Content-Length": len(body)}
+        head = "".join(f"{k}: {v}\n" for k, v in headers.items()) + "\n"
+        writer.write(head.encode() + body)
+
+    def _event(self, writer, name, headers=None, body=""):
+        fields = {"Event-Name": name, **(headers or {})}
+        payload = body.encode()
+        if payload:
+            fields["Content-Length"] = len(payload)
+        text = "".join(f"{k}: {quote(str(v))}\n" for k, v in fields.items()) + "\n"
+        self._message(writer, {"Content-Type": "text/event-plain"}, text.encode() + payload)
+
+    def emit(self, name, **headers):
+        """Pushes an event to every subscribed client (header names use _ for -)."""
+        fields = {k.replace("_", "-"): v for k, v in headers.items()}
+        for writer in list(self.clients):
+            self._event(writer, name, fields)
+
+    # ---------------------------------------------------------
+    # Connection
+    # ---------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        self._message(writer, {"Content-Type": "auth/request"})
+        try:
+            while True:
+                block = await reader.readuntil(b"\n\n")
+                first, _, rest = block.decode().partition("\n")
+                headers = parse_headers(rest.encode())
+                self.commands.append(first)
+                await self._command(writer, first, headers)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # client went away, or the server is stopping
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _command(self, writer, line, headers):
+        reply = {"Content-Type": "command/reply"}
+        if line.startswith("auth "):
+            ok = line[5:] == self.password
+            self._message(writer, {**reply, "Reply-Text": "+OK accepted" if ok else "-ERR invalid"})
+            if not ok:
+                writer.close()
+        elif line.startswith("event "):
+            self.clients.add(writer)
+            self._message(writer, {**reply, "Reply-Text": "+OK event listener enabled plain"})
+        elif line.startswith("bgapi "):
+            job_uuid = headers.get("Job-UUID") or str(uuidlib.uuid4())
+            self._message(writer, {**reply, "Reply-Text": f"+OK Job-UUID: {job_uuid}", "Job-UUID": job_uuid})
+            asyncio.create_task(self._run_job(writer, job_uuid, line[6:]))
+        elif line.startswith("api "):
+            await asyncio.sleep(self.job_delay)  # api blocks the socket, like FreeSWITCH
+            self._message(writer, {"Content-Type": "api/response"}, b"+OK\n")
+        else:
+            self._message(writer, {**reply, "Reply-Text": "-ERR command not found"})
+        await writer.drain()
+
+    async def _run_job(self, writer, job_uuid, cmd):
+        await asyncio.sleep(self.job_delay)
+        self.jobs_run.append(cmd)
+        if writer in self.clients:
+            self._event(writer, "BACKGROUND_JOB", {"Job-UUID": job_uuid, "Job-Command": cmd.split()[0]}, "+OK Success\n")
+
+
+# ---------------------------------------------------------
+# Call-setup load run
+# ---------------------------------------------------------
+
+class _RecordingRegistry:
+    def __init__(self):
+        self.answered = {}
+
+    def on_answer(self, uuid, phone):
+        self.answered[uuid] = time.perf_counter()
+
+    async def on_hangup(self, uuid):
+        pass
+
+
+async def load_run(calls, rate, job_delay, drop_after=None):
+    from backend.esl_client import ESLClient
+    from session.affinity import NodeRing
+
+    server = await FakeESLServer(job_delay=job_delay).start()
+    registry = _RecordingRegistry()
+    client = ESLClient("127.0.0.1", server.port, "ClueCon",
+                       ring=NodeRing({"bench": "ws://127.0.0.1:5001"}), node_id="bench", registry=registry)
+    client.conn.reconnect_delay = 0.2
+
+    finished, outcomes = {}, {}
+    start_stream = client.start_stream
+
+    async def timed_start(uuid, phone, ws_url):
+        outcomes[uuid] = await start_stream(uuid, phone, ws_url)
+        finished[uuid] = time.perf_counter()
+    client.start_stream = timed_start
+
+    runner = asyncio.create_task(client.connect())
+    await client.conn.connected.wait()
+
+    sent = {}
+    for i in range(calls):
+        if drop_after is not None and i == drop_after:
+            server.drop()
+            while client.conn.connected.is_set():
+                await asyncio.sleep(0.01)
+            await client.conn.connected.wait()
+            while not server.clients:  # subscribed again
+                await asyncio.sleep(0.01)
+        uuid = str(uuidlib.uuid4())
+        sent[uuid] = time.perf_counter()
+        server.emit("CHANNEL_ANSWER", Unique_ID=uuid, Caller_Caller_ID_Number=f"+9190000{i:05d}")
+        await asyncio.sleep(1 / rate)
+
+    deadline = time.perf_counter() + job_delay + 10
+    while len(finished) < len(registry.answered) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+    await server.stop()
+
+    dispatch = np.array([registry.answered[u] - sent[u] for u in registry.answered]) * 1000
+    setup = np.array([finished[u] - sent[u] for u in finished if outcomes[u] == "ok"]) * 1000
+    ran = {cmd.split()[1] for cmd in server.jobs_run}
+    return {
+        "sent": calls,
+        "answered": len(registry.answered),
+        "streams_started": len(ran & set(registry.answered)),
+        "results_lost": sum(o == "unknown" for o in outcomes.values()),
+        "duplicate_jobs": len(server.jobs_run) - len(set(server.jobs_run)),
+        "dispatch_p50_ms": float(np.percentile(dispatch, 50)),
+        "dispatch_p99_ms": float(np.percentile(dispatch, 99)),
+        "setup_p50_ms": float(np.percentile(setup, 50)) if len(setup) else None,
+        "setup_p99_ms": float(np.percentile(setup, 99)) if len(setup) else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50, help="CHANNEL_ANSWER events per second")
+    parser.add_argument("--job-delay", type=float, default=0.5, help="seconds per uuid_audio_stream job")
+    parser.add_argument("--drop-after", type=int, help="drop the connection after this many calls")
+    args = parser.parse_args(argv)
+
+    r = asyncio.run(load_run(args.calls, args.rate, args.job_delay, args.drop_after))
+    print(f"📞 {r['answered']}/{r['sent']} answers dispatched, {r['streams_started']} streams started "
+          f"({r['results_lost']} results lost to the disconnect), {r['duplicate_jobs']} duplicate jobs")
+    print(f"    event -> registry   p50 {r['dispatch_p50_ms']:8.2f} ms   p99 {r['dispatch_p99_ms']:8.2f} ms")
+    if r["setup_p50_ms"] is not None:
+        print(f"    event -> stream up  p50 {r['setup_p50_ms']:8.2f} ms   p99 {r['setup_p99_ms']:8.2f} ms")
+
+    ok = r["answered"] == r["sent"] and r["streams_started"] == r["answered"] and not r["duplicate_jobs"]
+    print("✅ All calls set up." if ok else "❌ Some calls were lost.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
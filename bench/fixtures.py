@@ -0,0 +1,162 @@
+# bench/fixtures.py
+# Fixed, seeded inputs so numbers are comparable run to run.
+import numpy as np
+
+SEED = 1234
+
+QUERIES_EN = [
+    "how many seats are left in btech computer science",
+    "what is the fee for the management quota",
+    "which companies came for placements last year",
+    "am i eligible with 60 percent in plus two",
+    "hello who am i talking to",
+    "is there hostel facility for girls",
+]
+
+QUERIES_ML = [
+    "ബി.ടെക്ക് കമ്പ്യൂട്ടർ സയൻസിൽ എത്ര സീറ്റ് ബാക്കിയുണ്ട്?",
+    "മാനേജ്മെന്റ് ക്വാട്ടയുടെ ഫീസ് എത്രയാണ്?",
+    "കഴിഞ്ഞ വർഷം പ്ലേസ്മെന്റിന് ഏതൊക്കെ കമ്പനികൾ വന്നു?",
+]
+
+REPLIES_EN = [
+    "The management quota fee for B.Tech is one lakh twenty thousand rupees per year.",
+    "Around forty seats are still open in computer science this year.",
+]
+
+REPLIES_ML = [
+    "മാനേജ്മെന്റ് ക്വാട്ടയിൽ ബി.ടെക്കിന് വർഷം ഒരു ലക്ഷത്തി ഇരുപതിനായിരം രൂപയാണ് ഫീസ്.",
+    "ദയവായി ഒന്നുകൂടി പറയാമോ?",
+    "നമസ്കാരം, സെൻട്രി കോളേജിലേക്ക് സ്വാഗതം.",
+]
+
+RAG_CORPUS = [
+    ("B.Tech Computer Science has 120 seats, of which 36 are under management quota.", "seats"),
+    ("Electronics and Communication has 60 seats for the 2025 admission cycle.", "seats"),
+    ("The tuition fee for B.Tech under government quota is 35000 rupees per year.", "fees"),
+    ("Management quota fee for B.Tech is 120000 rupees per year excluding hostel.", "fees"),
+    ("NRI quota fee is 5000 US dollars per year for all engineering branches.", "fees"),
+    ("Over 85 percent of eligible students were placed in 2024.", "placements"),
+    ("Recruiters include TCS, Infosys, UST Global and IBS Software.", "placements"),
+    ("Minimum 45 percent in Physics, Chemistry and Mathematics is required for B.Tech.", "requirements"),
+    ("MCA admission requires a bachelor degree with mathematics at plus two or degree level.", "requirements"),
+    ("The campus has separate hostels for boys and girls with mess facilities.", "campus"),
+]
+
+HISTORY = [
+    {"role": "user", "text": "hello"},
+    {"role": "ai", "text": "Hello, welcome to Zentry College. How can I help you?"},
+    {"role": "user", "text": "i want to know about btech admission"},
+    {"role": "ai", "text": "Sure. B.Tech admissions are open for computer science and electronics."},
+    {"role": "user", "text": "what about the fees"},
+    {"role": "ai", "text": "Government quota fee is thirty five thousand rupees per year."},
+]
+
+SNAPSHOT = "Repeat caller. Previous enquiry exists."
+
+# Held-out (Malayalam, English) admissions pairs for translation parity checks.
+# Not used anywhere in prompts or the RAG corpus.
+ADMISSIONS_PARALLEL = [
+    ("ബി.ടെക്ക് പ്രവേശനത്തിനുള്ള അവസാന തീയതി എന്നാണ്?",
+     "What is the last date for B.Tech admission?"),
+    ("ഹോസ്റ്റൽ ഫീസ് എത്രയാണ്?",
+     "How much is the hostel fee?"),
+    ("എം.സിഎ കോഴ്സിന് എത്ര സീറ്റുകൾ ഉണ്ട്?",
+     "How many seats are there for the MCA course?"),
+    ("പ്ലസ് ടുവിന് എനിക്ക് എഴുപത് ശതമാനം മാർക്കുണ്ട്.",
+     "I have seventy percent marks in plus two."),
+    ("കോളേജിലേക്ക് ബസ് സൗകര്യം ഉണ്ടോ?",
+     "Is there bus facility to the college?"),
+    ("സ്കോളർഷിപ്പിന് എങ്ങനെ അപേക്ഷിക്കാം?",
+     "How can I apply for a scholarship?"),
+    ("പ്രവേശന പരീക്ഷ നിർബന്ധമാണോ?",
+     "Is the entrance exam compulsory?"),
+    ("ഫീസ് തവണകളായി അടയ്ക്കാൻ പറ്റുമോ?",
+     "Can the fee be paid in instalments?"),
+    ("കഴിഞ്ഞ വർഷം എത്ര കുട്ടികൾക്ക് ജോലി കിട്ടി?",
+     "How many students got jobs last year?"),
+    ("അപേക്ഷാ ഫോം ഓൺലൈനായി ലഭിക്കുമോ?",
+     "Is the application form available online?"),
+    ("ഇലക്ട്രോണിക്സ് ബ്രാഞ്ചിൽ ഇനിയും സീറ്റ് ഒഴിവുണ്ടോ?",
+     "Are there still vacant seats in the electronics branch?"),
+    ("അഡ്മിഷന് ഏതൊക്കെ സർട്ടിഫിക്കറ്റുകൾ കൊണ്ടുവരണം?",
+     "Which certificates should I bring for admission?"),
+]
+
+
+# LocalDB stand-in for Supabase (bench_db): one request ~ one round trip to the region
+DB_LATENCY_MS = 20
+BENCH_PHONE = "+919400000000"
+DB_SEED = {
+    "admission_baseline": [
+        {"quota_type": "management", "confidence_level": "medium", "date": "2025-05-01"},
+        {"quota_type": "nri", "confidence_level": "high", "date": "2025-05-01"},
+        {"quota_type": "general", "confidence_level": "low", "date": "2025-05-01"},
+    ],
+}
+
+
+def call_audio_8k(seconds=10.0, sample_rate=8000):
+    """Alternating ~1.2s speech-like bursts and ~0.8s near-silence, PCM16."""
+    rng = np.random.default_rng(SEED)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    voiced = (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 720 * t)) * 0.4
+    gate = ((t % 2.0) < 1.2).astype(np.float32)
+    audio = voiced * gate + rng.standard_normal(n) * 0.003
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def utterance_8k(seconds=3.0):
+    return call_audio_8k(seconds)
+
+
+def tts_audio_16k(seconds=4.0):
+    rng = np.random.default_rng(SEED)
+    return (rng.standard_normal(int(seconds * 16000)) * 0.3).astype(np.float32)
+
+
+def chunks(pcm_bytes, chunk_ms=20, sample_rate=8000):
+    """Splits PCM16 into the frame size FreeSWITCH sends over the websocket."""
+    step = int(sample_rate * chunk_ms / 1000) * 2
+    return [pcm_bytes[i:i + step] for i in range(0, len(pcm_bytes), step)]
+
+
+def caller_turns_8k(seed=0, turns=8, sample_rate=8000):
+    """
+    One caller's side of a call: turns of 1-3 phrases separated by this
+    caller's own mid-sentence pauses, then 1.5-3s waiting for the reply.
+    Some pauses carry a breath (sub-threshold energy). Returns (pcm16 bytes,
+    [(turn_start_s, turn_end_s)]) with turn_end at the last speech sample.
+    """
+    rng = np.random.default_rng(SEED + seed)
+    pause_median = rng.uniform(0.12, 0.45)  # how long this caller pauses mid-sentence
+    pieces, labels, pos = [], [], 0
+
+    def add(audio):
+        nonlocal pos
+        pieces.append(audio)
+        pos += len(audio)
+
+    def speech(seconds):
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        f0 = rng.uniform(120, 240)
+        return (np.sin(2 * np.pi * f0 * t) + 0.5 * np.sin(2 * np.pi * 4 * f0 * t)) * rng.uniform(0.25, 0.45)
+
+    def quiet(seconds, breath=False):
+        n = int(seconds * sample_rate)
+        return rng.standard_normal(n) * (0.02 if breath else 0.003)
+
+    add(quiet(0.5))
+    for _ in range(turns):
+        start = pos
+        for i in range(int(rng.integers(1, 4))):
+            if i:
+                pause = float(np.clip(rng.lognormal(np.log(pause_median), 0.35), 0.064, 0.9))
+                add(quiet(pause, breath=rng.random() < 0.3))
+            add(speech(rng.uniform(0.5, 1.6)))
+        labels.append((start / sample_rate, pos / sample_rate))
+        add(quiet(rng.uniform(1.5, 3.0)))
+
+    audio = np.concatenate(pieces)
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes(), labels
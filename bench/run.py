@@ -0,0 +1,137 @@
+# bench/run.py
+"""
+Per-component micro-benchmarks with a stored baseline.
+
+    python -m bench.run                      # stub models, compare with bench/baseline.json
+    python -m bench.run --models real        # real Silero / MMS TTS weights from models/
+    python -m bench.run --only vad tts
+    python -m bench.run --save-baseline      # accept current numbers as the new baseline
+
+Exits non-zero when any metric regresses past the tolerance, when a
+baseline metric of a bench that was run is missing (skipped or renamed),
+or when there is no baseline to compare with.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from bench.components import BENCHES, Skipped
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def run_benches(names, mode, seconds):
+    results, skipped = {}, {}
+    for name in names:
+        print(f"⏱️  {name} ...", flush=True)
+        try:
+            for m in BENCHES[name](mode, seconds):
+                m["bench"] = name
+                results[m["name"]] = m
+                print(f"    {m['name']:<28} {m['value']:>12.3f} {m['unit']}")
+        except Skipped as e:
+            skipped[name] = str(e)
+            print(f"    ⏭️  skipped: {e}")
+    return results, skipped
+
+
+def compare(results, baseline, tolerance, noise_floor_ms=0.05, benches=None):
+    """
+    Returns (regressions, missing): (metric, baseline, current, change) for
+    every regression, and the baseline metrics the run didn't produce.
+    benches: the benches that were run; metrics of the others aren't missing.
+    """
+    regressions, missing = [], []
+    for name, base in baseline.get("results", {}).items():
+        cur = results.get(name)
+        if not cur:
+            if benches is None or base.get("bench") in benches:
+                missing.append(name)
+            continue
+        if not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = -change if cur["higher_is_better"] else change
+        # Microsecond-scale timings jitter far more than any tolerance
+        if cur["unit"] == "ms" and abs(cur["value"] - base["value"]) < noise_floor_ms:
+            continue
+        if worse > base.get("tolerance", tolerance):
+            regressions.append((name, base["value"], cur["value"], change))
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zentry component benchmarks")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHES), help="run just these benches")
+    parser.add_argument("--skip", nargs="*", default=[], choices=list(BENCHES))
+    parser.add_argument("--models", choices=("stub", "real"), default="stub")
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum timing window per bench")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.05, help="ignore smaller absolute ms changes")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = [n for n in (args.only or BENCHES) if n not in args.skip]
+    results, skipped = run_benches(names, args.models, args.seconds)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_rev(),
+            "models": args.models,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("models") != args.models:
+        print(f"⚠️ Baseline was recorded with --models {baseline['meta'].get('models')}; comparison may be noisy.")
+
+    regressions, missing = compare(results, baseline, args.tolerance, args.noise_floor_ms, benches=names)
+    if regressions:
+        print("\n❌ PERFORMANCE REGRESSION")
+        for name, base, cur, change in regressions:
+            print(f"    {name:<28} {base:>10.3f} -> {cur:>10.3f} ({change:+.1%})")
+    if missing:
+        print("\n❌ MISSING METRICS (in the baseline, not in this run)")
+        for name in missing:
+            reason = skipped.get(baseline["results"][name].get("bench"), "not produced")
+            print(f"    {name:<28} {reason}")
+    if regressions or missing:
+        return 1
+
+    print("✅ No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
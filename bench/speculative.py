@@ -0,0 +1,71 @@
+# bench/speculative.py
+"""
+Plain vs speculative decoding for PhiEngine on the bench RAG prompts.
+
+    python -m bench.speculative --model models/phi-4-mini-instruct.Q4_K_M.gguf --draft lookup
+    python -m bench.speculative --model tiny.gguf --draft tiny-draft.gguf --cpu
+
+--draft is "lookup" (prompt n-grams) or a GGUF path sharing the model's
+tokenizer. Decoding is greedy (temperature 0) so both runs must produce
+the same text; exits non-zero when they don't. Reports tokens/s, the
+speedup and the draft acceptance rate. Tiny GGUF models with --cpu are
+enough to check correctness; the speedup only means something on real ones.
+"""
+import argparse
+import sys
+import time
+from bench import fixtures
+
+def prompts():
+    from llm.prompt import build_prompt
+    docs = [d for d, _ in fixtures.RAG_CORPUS]
+    for i, query in enumerate(fixtures.QUERIES_EN):
+        yield build_prompt(query, docs[i % len(docs):][:3], fixtures.HISTORY[-4:], fixtures.SNAPSHOT)
+
+
+def run(engine, max_tokens):
+    outputs = []
+    started = time.perf_counter()
+    for prompt in prompts():
+        outputs.append(engine.generate(prompt, max_tokens, temperature=0.0))
+    stats = engine.stats()
+    stats["wall_s"] = time.perf_counter() - started
+    return outputs, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--draft", default="lookup", help='"lookup" or a draft GGUF path')
+    parser.add_argument("--draft-tokens", type=int, default=8)
+    parser.add_argument("--max-tokens", type=int, default=120)
+    parser.add_argument("--cpu", action="store_true", help="no GPU offload (tiny test models)")
+    args = parser.parse_args(argv)
+
+    from llm.engine import PhiEngine
+    layers = 0 if args.cpu else 40
+
+    plain = PhiEngine(args.model, speculative="off", n_gpu_layers=layers)
+    base_out, base = run(plain, args.max_tokens)
+    del plain
+
+    kind = "lookup" if args.draft == "lookup" else "draft"
+    spec = PhiEngine(args.model, speculative=kind, draft_path=args.draft if kind == "draft" else None,
+                     draft_tokens=args.draft_tokens, n_gpu_layers=layers)
+    spec_out, stats = run(spec, args.max_tokens)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(base_out, spec_out)) if a != b]
+    print(f"{'mode':<10} {'tokens':>7} {'tok/s':>8} {'wall s':>7} {'accept':>7}")
+    for name, s in (("plain", base), (kind, stats)):
+        accept = f"{s['acceptance']:.0%}" if s["acceptance"] is not None else "-"
+        print(f"{name:<10} {s['tokens']:>7} {s['tokens_per_s']:>8.1f} {s['wall_s']:>7.2f} {accept:>7}")
+    print(f"speedup x{base['wall_s'] / stats['wall_s']:.2f}, "
+          f"{stats['accepted_tokens']}/{stats['draft_tokens']} drafted tokens kept")
+    if mismatches:
+        print(f"❌ speculative output differs from plain decoding for prompts {mismatches}")
+        sys.exit(1)
+    print("✅ identical output")
+
+
+if __name__ == "__main__":
+    main()
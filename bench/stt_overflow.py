@@ -0,0 +1,95 @@
+# bench/stt_overflow.py
+"""
+Burst simulation for the hybrid STT executor (backend/stt_worker.py).
+
+    python -m bench.stt_overflow                        # 80 utterances in 2s, GPU-only vs +4 CPU workers
+    python -m bench.stt_overflow --cpu-workers 8 --gpu-rtf 0.08 --cpu-rtf 0.4
+
+Stub models sleep audio_seconds x RTF, so only the routing and queueing
+are real. Reports STT latency (queue + service) per utterance and which
+route each one took.
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from bench import fixtures
+
+class _SleepModel:
+    """Stands in for WhisperModel: holds the thread for audio x rtf seconds."""
+    def __init__(self, rtf):
+        self.rtf = rtf
+
+    def transcribe(self, audio, language=None, beam_size=1):
+        time.sleep(len(audio) / 16000 * self.rtf)
+        return [], None
+
+
+def _stt(cpu_workers, gpu_rtf, cpu_rtf, overflow_ms):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.stt_worker import GPU_SLOTS, MalayalamSTT, OverflowRouter
+    stt = MalayalamSTT.__new__(MalayalamSTT)
+    stt.device = "cuda"
+    stt.model = _SleepModel(gpu_rtf)
+    stt.cpu_model = _SleepModel(cpu_rtf) if cpu_workers else None
+    stt.cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers) if cpu_workers else None
+    stt.light_model = None
+    stt.router = OverflowRouter(GPU_SLOTS, cpu_workers, overflow_ms, primary_rtf=gpu_rtf, cpu_rtf=cpu_rtf)
+    stt.gpu_lock = asyncio.Semaphore(GPU_SLOTS)
+    stt._primary_slots = threading.Semaphore(GPU_SLOTS)
+    return stt
+
+
+async def burst(stt, utterances, spread_s, seed=0):
+    rng = np.random.default_rng(fixtures.SEED + seed)
+    lengths = rng.choice([1.0, 1.5, 2.0, 3.0, 5.0, 8.0], size=utterances, p=[.25, .25, .2, .15, .1, .05])
+    starts = np.sort(rng.uniform(0, spread_s, size=utterances))
+    latencies = []
+
+    async def one(at, seconds):
+        await asyncio.sleep(at)
+        audio = np.zeros(int(seconds * 8000), dtype=np.int16).tobytes()
+        t0 = time.perf_counter()
+        await stt.transcribe(audio, sample_rate=8000)
+        latencies.append((seconds, time.perf_counter() - t0))
+
+    await asyncio.gather(*(one(a, s) for a, s in zip(starts, lengths)))
+    return latencies
+
+
+def run(args, cpu_workers):
+    from telemetry.metrics import metrics
+    metrics.counters.clear()
+    stt = _stt(cpu_workers, args.gpu_rtf, args.cpu_rtf, args.overflow_ms)
+    lat = asyncio.run(burst(stt, args.utterances, args.spread))
+    ms = np.array([l for _, l in lat]) * 1000
+    short = np.array([l for s, l in lat if s <= 2.0]) * 1000
+    overflow = sum(v for (n, labels), v in metrics.counters.items()
+                   if n == "stt_routed_total" and ("route", "overflow") in labels)
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "short_p95_ms": float(np.percentile(short, 95)) if len(short) else None,
+        "overflow": int(overflow),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=80)
+    parser.add_argument("--spread", type=float, default=2.0, help="seconds the burst arrives over")
+    parser.add_argument("--cpu-workers", type=int, default=4)
+    parser.add_argument("--gpu-rtf", type=float, default=0.05)
+    parser.add_argument("--cpu-rtf", type=float, default=0.5)
+    parser.add_argument("--overflow-ms", type=float, default=300)
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<16} {'p50 ms':>8} {'p95 ms':>8} {'short p95':>10} {'to CPU':>7}")
+    for name, workers in (("gpu only", 0), (f"gpu + {args.cpu_workers} cpu", args.cpu_workers)):
+        r = run(args, workers)
+        print(f"{name:<16} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['short_p95_ms']:>10.0f} {r['overflow']:>7}")
+
+
+if __name__ == "__main__":
+    main()
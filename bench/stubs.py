@@ -0,0 +1,123 @@
+# bench/stubs.py
+# Stand-ins for the heavy models so every component can be timed on a
+# CPU-only box. They keep the real call shapes; only the inference is fake.
+import time
+import numpy as np
+
+class StubVADSession:
+    """Mimics the Silero ONNX session: speech prob from frame energy."""
+    def run(self, _outputs, inputs):
+        frame = inputs["input"]
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        prob = np.array([[min(1.0, rms * 20)]], dtype=np.float32)
+        return [prob, inputs["h"], inputs["c"]]
+
+
+class StubWhisper:
+    """Returns no segments, so only our own pre-processing is timed."""
+    def transcribe(self, audio, language=None, beam_size=1):
+        return [], None
+
+
+class StubTTSTokenizer:
+    def __call__(self, text, return_tensors="np"):
+        ids = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.int64)
+        return {"input_ids": ids.reshape(1, -1)}
+
+
+class StubTTSSession:
+    """~70ms of 16 kHz audio per input token, like MMS on short Malayalam text."""
+    SAMPLES_PER_TOKEN = 1120
+
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, _outputs, inputs):
+        n = inputs["input_ids"].shape[1] * self.SAMPLES_PER_TOKEN
+        return [self.rng.standard_normal((1, n)).astype(np.float32) * 0.3]
+
+
+class StubEmbedder:
+    """
+    MiniLM-shaped: 384-dim normalized bag-of-words vectors, so related texts
+    still score high. Sleeps like MiniLM on CPU: a fixed cost per call plus
+    a smaller one per text, which is what makes batching pay.
+    """
+    DIM = 384
+
+    def __init__(self, call_ms=4.0, text_ms=1.0):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+
+    def _vector(self, text):
+        v = np.zeros(self.DIM, dtype=np.float32)
+        for word in text.lower().split():
+            v[hash(word) % self.DIM] += 1.0
+        return v / (np.linalg.norm(v) or 1.0)
+
+    def encode(self, texts, **_kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        vectors = np.stack([self._vector(t) for t in texts])
+        return vectors[0] if single else vectors
+
+    def embed(self, texts):
+        return self.encode(texts).tolist()
+
+
+class StubTranslateBackend:
+    """Translator backend that answers with fixed target-language text."""
+    def __init__(self, outputs):
+        self.outputs = outputs
+
+    def generate(self, batch, max_new_tokens=128):
+        return [self.outputs[i % len(self.outputs)] for i in range(len(batch))]
+
+
+def stub_vad(sample_rate=8000):
+    from backend.vad_stream import VADStreamer
+
+    class _StubVAD(VADStreamer):
+        def load_model(self):
+            self.session = StubVADSession()
+
+    return _StubVAD(sample_rate=sample_rate, min_energy=400)
+
+
+def stub_stt():
+    from backend.stt_worker import MalayalamSTT
+    stt = MalayalamSTT.__new__(MalayalamSTT)
+    stt.model = StubWhisper()
+    stt.light_model = None
+    return stt
+
+
+def stub_tts():
+    from tts.tts_module import TTSModule
+    tts = TTSModule.__new__(TTSModule)
+    tts.tokenizer = StubTTSTokenizer()
+    tts.session = StubTTSSession()
+    tts.cache = None
+    return tts
+
+
+def stub_translator():
+    """Real domain mapping and IndicProcessor pre/post-processing, stub models."""
+    from IndicTransToolkit.processor import IndicProcessor
+    from translate.backends import MODELS
+    from translate.translator import Translator
+    from bench.fixtures import REPLIES_EN, REPLIES_ML
+    tr = Translator.__new__(Translator)
+    tr.backend = "stub"
+    tr.ip = IndicProcessor(inference=True)
+    tr.models = {
+        "ml-en": StubTranslateBackend(REPLIES_EN),
+        "en-ml": StubTranslateBackend(REPLIES_ML),
+    }
+    tr.directions = tuple(tr.models)
+    for direction in tr.directions:
+        _, src_lang, tgt_lang = MODELS[direction]
+        setattr(tr, f"{direction}_src_lang", src_lang)
+        setattr(tr, f"{direction}_tgt_lang", tgt_lang)
+    return tr
@@ -0,0 +1,132 @@
+# bench/translate_compare.py
+"""
+Torch vs CTranslate2 int8 for the IndicTrans2 translator: load time, memory,
+single-sentence latency, batched throughput, and BLEU/chrF on the held-out
+admissions phrase set (fixtures.ADMISSIONS_PARALLEL).
+
+    python -m bench.translate_compare
+    python -m bench.translate_compare --backends ct2 --max-chrf-drop 1.5
+
+Each backend runs in a fresh process so the memory numbers don't overlap.
+Exits non-zero when a candidate backend's chrF falls more than
+--max-chrf-drop points below the reference backend (the first one listed).
+Needs sacrebleu for the scores.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import sys
+import time
+import numpy as np
+from bench import fixtures
+from bench.components import measure
+
+DIRECTIONS = {
+    # direction -> (source column, reference column) in ADMISSIONS_PARALLEL
+    "ml-en": (0, 1),
+    "en-ml": (1, 0),
+}
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_backend(kind, seconds, batch_size):
+    """Child process: loads one backend and measures it."""
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    from translate.translator import Translator
+    translator = Translator(backend=kind)
+    load_s = time.perf_counter() - started
+
+    result = {"backend": kind, "load_s": load_s, "rss_mb": rss_mb() - rss_before, "directions": {}}
+    for direction, (src_col, _) in DIRECTIONS.items():
+        sources = [pair[src_col] for pair in fixtures.ADMISSIONS_PARALLEL]
+        outputs = [translator.translate(s, direction) for s in sources]
+
+        next_source = itertools.cycle(sources).__next__
+        latency = measure(lambda: translator.translate(next_source(), direction), min_seconds=seconds)
+
+        t0 = time.perf_counter()
+        for i in range(0, len(sources), batch_size):
+            translator.translate_batch(sources[i:i + batch_size], direction)
+        throughput = len(sources) / (time.perf_counter() - t0)
+
+        result["directions"][direction] = {
+            "outputs": outputs,
+            "p50_ms": float(np.percentile(latency, 50) * 1000),
+            "p95_ms": float(np.percentile(latency, 95) * 1000),
+            "sentences_per_s": throughput,
+        }
+    result["peak_rss_mb"] = rss_mb()
+    return result
+
+
+def score(hyps, refs):
+    import sacrebleu
+    return {
+        "bleu": sacrebleu.corpus_bleu(hyps, [refs]).score,
+        "chrf": sacrebleu.corpus_chrf(hyps, [refs]).score,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "ct2"], choices=("torch", "ct2"),
+                        help="the first one is the reference for the parity check")
+    parser.add_argument("--seconds", type=float, default=3.0, help="minimum latency window per direction")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--max-chrf-drop", type=float, default=2.0)
+    parser.add_argument("--out", default="translate_compare.json")
+    args = parser.parse_args(argv)
+
+    try:
+        import sacrebleu  # noqa: F401
+    except ImportError:
+        print("❌ sacrebleu is required for the parity check (pip install sacrebleu)")
+        return 2
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for kind in args.backends:
+        print(f"⏱️  {kind} ...", flush=True)
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(run_backend, (kind, args.seconds, args.batch_size)))
+
+    reference = results[0]
+    failures = []
+    for r in results:
+        print(f"\n{r['backend']}: load {r['load_s']:.1f}s, +{r['rss_mb']:.0f} MB RSS (peak {r['peak_rss_mb']:.0f} MB)")
+        for direction, (_, ref_col) in DIRECTIONS.items():
+            d = r["directions"][direction]
+            refs = [pair[ref_col] for pair in fixtures.ADMISSIONS_PARALLEL]
+            d.update(score(d["outputs"], refs))
+            # Agreement with the reference backend's own output
+            d["chrf_vs_reference"] = score(d["outputs"], reference["directions"][direction]["outputs"])["chrf"]
+            print(f"    {direction}  p50 {d['p50_ms']:7.1f} ms  p95 {d['p95_ms']:7.1f} ms  "
+                  f"{d['sentences_per_s']:6.1f} sent/s  BLEU {d['bleu']:5.1f}  chrF {d['chrf']:5.1f}  "
+                  f"chrF vs {reference['backend']} {d['chrf_vs_reference']:5.1f}")
+            drop = reference["directions"][direction]["chrf"] - d["chrf"]
+            if r is not reference and drop > args.max_chrf_drop:
+                failures.append((r["backend"], direction, drop))
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n📝 Results written to {args.out}")
+
+    if failures:
+        print("\n❌ TRANSLATION QUALITY REGRESSION")
+        for backend, direction, drop in failures:
+            print(f"    {backend} {direction}: chrF {drop:.1f} points below {reference['backend']}")
+        return 1
+    print("✅ Translation parity within tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
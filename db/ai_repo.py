@@ -1,9 +1,9 @@
 # db/ai_repo.py
-from db.client import init_supabase
+from db.client import get_db
 
-def log_processing_step(call_id, step_type, input_data=None, output_data=None, status="success", latency_ms=None):
-    sb = init_supabase()
-    sb.table("ai_processing_steps").insert({
+async def log_processing_step(call_id, step_type, input_data=None, output_data=None, status="success", latency_ms=None):
+    sb = get_db()
+    await sb.table("ai_processing_steps").insert({
         "call_id": call_id,
         "step_type": step_type,
         "input": input_data,
@@ -13,18 +13,18 @@ def log_processing_step(call_id, step_type, input_data=None, output_data=None, s
     }).execute()
 
 
-def log_intent(call_id, intent, confidence=None):
-    sb = init_supabase()
-    sb.table("call_intents").insert({
+async def log_intent(call_id, intent, confidence=None):
+    sb = get_db()
+    await sb.table("call_intents").insert({
         "call_id": call_id,
         "intent": intent,
         "confidence": confidence
     }).execute()
 
 
-def log_interest(call_id, caller_id, program=None, quota=None, strength="medium"):
-    sb = init_supabase()
-    sb.table("interest_signals").insert({
+async def log_interest(call_id, caller_id, program=None, quota=None, strength="medium"):
+    sb = get_db()
+    await sb.table("interest_signals").insert({
         "call_id": call_id,
         "caller_id": caller_id,
         "program_code": program,
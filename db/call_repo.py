@@ -1,55 +1,59 @@
 # db/call_repo.py
+import asyncio
 import hashlib
-from db.client import init_supabase
+from db.client import get_db
 
 def _hash_phone(phone: str) -> str:
     return hashlib.sha256(phone.encode()).hexdigest()
 
-def start_call(freeswitch_uuid: str, phone: str):
-    sb = init_supabase()
+async def start_call(freeswitch_uuid: str, phone: str):
+    sb = get_db()
     phone_hash = _hash_phone(phone)
 
     # 1. Get or create caller
-    caller = sb.table("caller_profiles") \
-        .select("*") \
-        .eq("phone_hash", phone_hash) \
-        .execute()
-
-    if caller.data:
-        caller_id = caller.data[0]["id"]
-        sb.table("caller_profiles") \
-          .update({"last_seen": "now()", "total_calls": caller.data[0]["total_calls"] + 1}) \
-          .eq("id", caller_id) \
-          .execute()
-    else:
-        res = sb.table("caller_profiles").insert({
+    async def caller_id():
+        caller = await sb.table("caller_profiles") \
+            .select("*") \
+            .eq("phone_hash", phone_hash) \
+            .execute()
+
+        if caller.data:
+            caller_id = caller.data[0]["id"]
+            await sb.table("caller_profiles") \
+              .update({"last_seen": "now()", "total_calls": caller.data[0]["total_calls"] + 1}) \
+              .eq("id", caller_id) \
+              .execute()
+            return caller_id
+        res = await sb.table("caller_profiles").insert({
             "phone_hash": phone_hash,
             "total_calls": 1
         }).execute()
-        caller_id = res.data[0]["id"]
+        return res.data[0]["id"]
 
-    # 2. Create call session
-    call = sb.table("call_sessions").insert({
-        "freeswitch_uuid": freeswitch_uuid,
-        "phone_hash": phone_hash,
-        "status": "ongoing"
-    }).execute()
+    # 2. Create call session (keyed by phone_hash, so it needn't wait for the caller row)
+    async def call_id():
+        call = await sb.table("call_sessions").insert({
+            "freeswitch_uuid": freeswitch_uuid,
+            "phone_hash": phone_hash,
+            "status": "ongoing"
+        }).execute()
+        return call.data[0]["id"]
 
-    call_id = call.data[0]["id"]
-    return call_id, caller_id
+    caller, call = await asyncio.gather(caller_id(), call_id())
+    return call, caller
 
 
-def end_call(call_id: str, status: str = "completed"):
-    sb = init_supabase()
-    sb.table("call_sessions") \
+async def end_call(call_id: str, status: str = "completed"):
+    sb = get_db()
+    await sb.table("call_sessions") \
       .update({"status": status, "ended_at": "now()"}) \
       .eq("id", call_id) \
       .execute()
 
 
-def log_message(call_id: str, speaker: str, raw_text: str, normalized_text=None, confidence=None):
-    sb = init_supabase()
-    sb.table("call_messages").insert({
+async def log_message(call_id: str, speaker: str, raw_text: str, normalized_text=None, confidence=None):
+    sb = get_db()
+    await sb.table("call_messages").insert({
         "call_id": call_id,
         "speaker": speaker,
         "raw_text": raw_text,
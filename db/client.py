@@ -1,14 +1,274 @@
 # db/client.py
+# Data access for the repos. get_db() returns one of two backends with the
+# same query-builder interface (the subset of supabase-py the repos use),
+# except that execute() is awaited:
+#
+#   RestDB   PostgREST over one pooled keep-alive httpx.AsyncClient, with
+#            per-request timeouts, bounded concurrency and retry with backoff
+#   LocalDB  in-process tables, for offline runs and the benches
+#
+# ZENTRY_DB_BACKEND = supabase (default) | local
+import asyncio
+import copy
+import itertools
+import logging
 import os
-from supabase import create_client
+import random
+import time
+from datetime import datetime, timezone
+from telemetry.metrics import metrics
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+DB_BACKEND = os.getenv("ZENTRY_DB_BACKEND", "supabase")
+DB_MAX_CONCURRENCY = int(os.getenv("ZENTRY_DB_MAX_CONCURRENCY", "16"))
+DB_TIMEOUT_S = float(os.getenv("ZENTRY_DB_TIMEOUT_S", "5"))
+DB_RETRIES = int(os.getenv("ZENTRY_DB_RETRIES", "3"))
 
 supabase = None
 
 def init_supabase():
+    """Blocking supabase-py client; only session/backends.py still uses it (from threads)."""
     global supabase
     if not supabase:
+        from supabase import create_client
         supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
     return supabase
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class Query:
+    """sb.table(name).select(...).eq(...).order(...).limit(...); then `await .execute()`."""
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.method = "GET"
+        self.columns = "*"
+        self.body = None
+        self.filters = []     # (column, op, value), op in eq | in
+        self.orders = []      # (column, desc)
+        self.limit_n = None
+
+    def select(self, columns="*"):
+        self.method, self.columns = "GET", columns
+        return self
+
+    def insert(self, rows):
+        self.method, self.body = "POST", rows
+        return self
+
+    def update(self, values):
+        self.method, self.body = "PATCH", values
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, "eq", value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append((column, "in", list(values)))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    async def execute(self):
+        started = time.perf_counter()
+        try:
+            return Result(await self.db.execute(self))
+        finally:
+            metrics.observe("db_ms", (time.perf_counter() - started) * 1000, table=self.table, method=self.method)
+
+
+class RestDB:
+    # Worth retrying: gateway trouble or "try again". Writes only retry the
+    # two that guarantee the request wasn't applied.
+    RETRY_STATUS = {429, 502, 503, 504}
+    RETRY_STATUS_WRITE = {429, 503}
+
+    def __init__(self, url, key, max_concurrency=DB_MAX_CONCURRENCY, timeout_s=DB_TIMEOUT_S,
+                 retries=DB_RETRIES, backoff_s=0.1):
+        import httpx  # already installed with supabase-py
+        self.httpx = httpx
+        self.client = httpx.AsyncClient(
+            base_url=f"{url}/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=httpx.Timeout(timeout_s, connect=min(2.0, timeout_s)),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=60,
+            ),
+        )
+        # Queue here instead of in httpx's pool, whose wait counts against the timeout
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.retries = retries
+        self.backoff_s = backoff_s
+
+    def table(self, name):
+        return Query(self, name)
+
+    @staticmethod
+    def _params(q):
+        params = []
+        if q.method == "GET":
+            params.append(("select", q.columns))
+        for column, op, value in q.filters:
+            if op == "in":
+                params.append((column, "in.(" + ",".join(f'"{v}"' for v in value) + ")"))
+            else:
+                params.append((column, f"eq.{value}"))
+        if q.orders:
+            params.append(("order", ",".join(f"{c}.{'desc' if d else 'asc'}" for c, d in q.orders)))
+        if q.limit_n is not None:
+            params.append(("limit", str(q.limit_n)))
+        return params
+
+    async def execute(self, q):
+        headers = {} if q.method == "GET" else {"Prefer": "return=representation"}
+        retry_status = self.RETRY_STATUS if q.method == "GET" else self.RETRY_STATUS_WRITE
+        httpx = self.httpx
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.slots:
+                    res = await self.client.request(
+                        q.method, f"/{q.table}", params=self._params(q), json=q.body, headers=headers,
+                    )
+                if res.status_code not in retry_status or attempt == self.retries:
+                    res.raise_for_status()
+                    return res.json()
+                reason = res.status_code
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Never reached the server: safe to retry even an insert
+                if attempt == self.retries:
+                    raise
+                reason = type(e).__name__
+            except httpx.TransportError as e:
+                # Sent, reply lost: only reads are known to be safe to repeat
+                if q.method != "GET" or attempt == self.retries:
+                    raise
+                reason = type(e).__name__
+            delay = self.backoff_s * 2 ** attempt * random.uniform(0.5, 1.5)
+            metrics.inc("db_retries_total", table=q.table)
+            logging.warning(f"🔁 DB {q.method} {q.table} failed ({reason}), retry in {delay * 1000:.0f}ms")
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class LocalDB:
+    """
+    In-process stand-in for the Supabase tables: rows are dicts, ids are
+    ints, "now()" and created_at become ISO timestamps. latency_ms delays
+    every request like a network round trip would (benches).
+    """
+    def __init__(self, latency_ms=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.tables = {}
+        self._ids = itertools.count(1)
+        for table, rows in (seed or {}).items():
+            for row in rows:
+                self._insert(table, row)
+
+    def table(self, name):
+        return Query(self, name)
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat()
+
+    def _insert(self, table, row):
+        row = {k: (self._now() if v == "now()" else v) for k, v in row.items()}
+        row.setdefault("id", next(self._ids))
+        row.setdefault("created_at", self._now())
+        self.tables.setdefault(table, []).append(row)
+        return row
+
+    @staticmethod
+    def _matches(row, filters):
+        for column, op, value in filters:
+            if op == "in" and row.get(column) not in value:
+                return False
+            if op == "eq" and str(row.get(column)) != str(value):
+                return False
+        return True
+
+    async def execute(self, q):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if q.method == "POST":
+            rows = q.body if isinstance(q.body, list) else [q.body]
+            return [copy.deepcopy(self._insert(q.table, r)) for r in rows]
+
+        rows = [r for r in self.tables.get(q.table, []) if self._matches(r, q.filters)]
+        if q.method == "PATCH":
+            values = {k: (self._now() if v == "now()" else v) for k, v in q.body.items()}
+            for r in rows:
+                r.update(values)
+            return copy.deepcopy(rows)
+
+        for column, desc in reversed(q.orders):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if q.limit_n is not None:
+            rows = rows[:q.limit_n]
+        if q.columns != "*":
+            columns = [c.strip() for c in q.columns.split(",")]
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+        return copy.deepcopy(rows)
+
+    async def close(self):
+        pass
+
+
+_db = None
+
+def get_db():
+    global _db
+    if _db is None:
+        if DB_BACKEND == "local":
+            logging.info("🗄️ Using the in-process LocalDB (ZENTRY_DB_BACKEND=local)")
+            _db = LocalDB()
+        else:
+            _db = RestDB(SUPABASE_URL, SUPABASE_KEY)
+    return _db
+
+
+def set_db(db):
+    """Swap the backend (benches, offline runs); returns the previous one."""
+    global _db
+    previous, _db = _db, db
+    return previous
+
+
+async def close_db():
+    if _db is not None:
+        await _db.close()
+
+
+_background = set()
+
+def background(coro, what="DB write"):
+    """
+    Fire-and-forget for audit writes nothing downstream reads, so a turn
+    never waits on an insert. Keeps the task referenced until it's done.
+    """
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(lambda t: _background_done(t, what))
+    return task
+
+
+def _background_done(task, what):
+    _background.discard(task)
+    if not task.cancelled() and task.exception():
+        logging.error(f"⚠️ {what} failed: {task.exception()}")
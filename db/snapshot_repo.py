@@ -1,50 +1,79 @@
 # db/snapshot_repo.py
-from db.client import init_supabase
+import asyncio
+from db.client import get_db
 
-def get_snapshot(caller_id: str, intent: str):
+QUOTAS = ("management", "nri", "general")
+
+async def prefetch_snapshot(caller_id: str):
+    """
+    Loads everything get_snapshot needs, for every intent, so the call
+    registry can fetch it once on answer instead of on every turn.
+    The three reads are independent and go out together.
+    """
+    sb = get_db()
+
+    caller, interest, baseline = await asyncio.gather(
+        sb.table("caller_profiles") \
+            .select("total_calls") \
+            .eq("id", caller_id) \
+            .execute(),
+
+        sb.table("interest_signals") \
+            .select("strength, quota_type") \
+            .eq("caller_id", caller_id) \
+            .order("created_at", desc=True) \
+            .limit(1) \
+            .execute(),
+
+        sb.table("admission_baseline") \
+            .select("quota_type, confidence_level") \
+            .in_("quota_type", list(QUOTAS)) \
+            .order("date", desc=True) \
+            .limit(50) \
+            .execute(),
+    )
+
+    confidence = {}
+    for row in baseline.data or []:
+        confidence.setdefault(row["quota_type"], row["confidence_level"])  # newest first
+
+    return {
+        "total_calls": caller.data[0]["total_calls"] if caller.data else 0,
+        "interest": interest.data[0] if interest.data else None,
+        "baseline": confidence,
+    }
+
+
+async def get_snapshot(caller_id: str, intent: str, parts=None):
     """
     Returns a SMALL operational snapshot string
     to guide the LLM (never raw numbers).
+    parts: prefetch_snapshot() result; queried here when missing.
     """
-    sb = init_supabase()
+    if parts is None:
+        parts = await prefetch_snapshot(caller_id)
 
     notes = []
 
     # 1. Repeat caller signal
-    caller = sb.table("caller_profiles") \
-        .select("total_calls") \
-        .eq("id", caller_id) \
-        .execute()
-
-    if caller.data and caller.data[0]["total_calls"] > 1:
+    if parts["total_calls"] > 1:
         notes.append("Repeat caller. Previous enquiry exists.")
 
     # 2. Recent strong interest
-    interest = sb.table("interest_signals") \
-        .select("strength, quota_type") \
-        .eq("caller_id", caller_id) \
-        .order("created_at", desc=True) \
-        .limit(1) \
-        .execute()
-
-    if interest.data:
-        strength = interest.data[0]["strength"]
-        quota = interest.data[0]["quota_type"]
+    if parts["interest"]:
+        strength = parts["interest"]["strength"]
+        quota = parts["interest"]["quota_type"]
         if strength == "strong":
             notes.append(f"High interest detected earlier ({quota} quota).")
 
     # 3. Admission baseline (VERY CAREFUL)
-    baseline = sb.table("admission_baseline") \
-        .select("estimated_range, confidence_level") \
-        .eq("quota_type", _map_intent_to_quota(intent)) \
-        .order("date", desc=True) \
-        .limit(1) \
-        .execute()
+    quota_type = _map_intent_to_quota(intent)
+    confidence = parts["baseline"].get(quota_type)
+    if confidence is None and quota_type not in parts["baseline"]:
+        confidence = await _baseline_confidence(quota_type)
 
-    if baseline.data:
-        confidence = baseline.data[0]["confidence_level"]
-        if confidence in ("low", "medium"):
-            notes.append("Admission availability is limited. Avoid guarantees.")
+    if confidence in ("low", "medium"):
+        notes.append("Admission availability is limited. Avoid guarantees.")
 
     if not notes:
         return "No special operational constraints."
@@ -52,6 +81,18 @@ def get_snapshot(caller_id: str, intent: str):
     return " ".join(notes)
 
 
+async def _baseline_confidence(quota_type: str):
+    # Quota not among the prefetched rows
+    sb = get_db()
+    baseline = await sb.table("admission_baseline") \
+        .select("estimated_range, confidence_level") \
+        .eq("quota_type", quota_type) \
+        .order("date", desc=True) \
+        .limit(1) \
+        .execute()
+    return baseline.data[0]["confidence_level"] if baseline.data else None
+
+
 def _map_intent_to_quota(intent: str):
     if intent in ("management", "seat"):
         return "management"
@@ -1,23 +1,58 @@
 # llm/brain.py
 import asyncio
-from llm.intent import detect_intent, detector as shared_detector
+import hashlib
+import json
+import logging
+import time
+from llm.intent import detect_intent
 from llm.engine import PhiEngine
 from llm.scheduler import gpu_scheduler, cpu_scheduler
-from llm.guardrails import apply_guardrails
-from llm.prompt import build_prompt
+from llm.guardrails import GuardrailEngine
+from llm.prompt import LlamaTokenizer, PromptBudget
 from llm.rag.retriever import RAGRetriever
 from llm.rag.embedder import embedder_instance # Import the Global Singleton
-from llm.translate import ml_to_en, en_to_ml
+from llm.translate import ml_to_en, en_to_ml, mixed_to_en
+from llm import cache as answer_cache
+from llm.langid import classify, gloss_manglish, reply_lang, update_preference
 from session.session_store import SessionStore
 from db.call_repo import log_message
+from db.client import background
 from db.ai_repo import log_processing_step, log_intent
-from db.snapshot_repo import get_snapshot
+from db.snapshot_repo import get_snapshot, prefetch_snapshot
+from llm.lazy import LazyModel
+from llm.stages import StageGraph
+from llm.overload import controller as overload
+from workers.ipc import RemoteModel, workers_enabled
 
-# 1. Initialize Singletons correctly
-engine = PhiEngine("models/phi-4-mini-instruct.Q4_K_M.gguf")
+PHI_PATH = "models/phi-4-mini-instruct.Q4_K_M.gguf"
+
+# 1. Initialize Singletons correctly (lazily; backend/startup.py loads them in parallel)
+# In multi-process mode the model lives in its own worker (see workers/model_server.py)
+engine = LazyModel(
+    "phi",
+    lambda: RemoteModel("phi") if workers_enabled() else PhiEngine(PHI_PATH),
+    warmup=lambda e: e.generate("User: Hello\nAssistant:", max_tokens=4),
+)
+
+# Vocabulary only, in this process: section budgets are counted without a round trip to the phi worker
+phi_tokenizer = LazyModel("phi_vocab", lambda: LlamaTokenizer(PHI_PATH))
+prompt_budget = PromptBudget(phi_tokenizer)
 
 # CRITICAL FIX: Pass the shared embedder to the retriever
-rag = RAGRetriever(embedder_instance=embedder_instance)
+def _load_rag():
+    retriever = RAGRetriever(embedder_instance=embedder_instance)
+    # A new index version makes answers built on the old documents stale
+    retriever.on_swap(lambda old, new: answer_cache.clear())
+    return retriever
+
+rag = LazyModel("rag", _load_rag, warmup=lambda r: r.retrieve("admission fees"))
+
+# Reuses the chunk vectors the retriever already fetched; replies of concurrent calls embed in one batch
+guardrails = GuardrailEngine(
+    embedder_instance,
+    stored_vectors=lambda docs: rag.stored_vectors(docs),
+    run=cpu_scheduler.run,
+)
 
 session_store = None 
 
@@ -30,77 +65,210 @@ INTENT_TO_TOPIC = {
     "eligibility": "requirements"
 }
 
+QA_MATCH = 0.8  # question similarity for answering straight from a QA chunk
+
 def init_globals(store_instance):
     global session_store
     session_store = store_instance
 
-async def handle_llm(call_id, caller_id, phone, text_ml) -> str:
-    session = session_store.get_session(phone)
-    history = session.get("history", [])[-6:]
+def release_session(phone):
+    # Call over: flush history and let another node take the caller next time
+    if session_store:
+        session_store.release(phone)
 
-    # ---------------------------------------------------------
-    # STEP 1: Translate (CPU Bound)
-    # ---------------------------------------------------------
-    text_en = await cpu_scheduler.run(ml_to_en, text_ml)
-    
-    log_processing_step(call_id, "translate_ml_en", text_ml, text_en)
+def _answer_key(text_en, intent, history, snapshot):
+    # The prompt also carries the caller's history and snapshot: only a caller
+    # with the same context may reuse an answer
+    context = hashlib.sha1(json.dumps([history, snapshot], ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return f"{intent}:{context}:{' '.join(text_en.lower().split())}"
 
-    # ---------------------------------------------------------
-    # STEP 2: Intent Detection (Fast & First)
-    # ---------------------------------------------------------
-    # Must run BEFORE RAG to enable filtering
-    intent = await cpu_scheduler.run(detect_intent, text_en)
 
-    log_intent(call_id, intent)
+def _qa_answer(text_en, rag_docs):
+    """Answer of the top QA chunk (llm/rag/ingest.py iter_qa_chunks) if it asks the same thing."""
+    if not rag_docs or not rag_docs[0].startswith("Question: "):
+        return None
+    question, _, answer = rag_docs[0][len("Question: "):].partition("\nAnswer: ")
+    if not answer:
+        return None
+    a, b = embedder_instance.embed([text_en, question])
+    return answer.strip() if sum(x * y for x, y in zip(a, b)) >= QA_MATCH else None
+
 
-    snapshot = get_snapshot(caller_id, intent)
+def _log(fn, *args, **kwargs):
+    """
+    Supabase audit writes run off the turn: nothing downstream reads them,
+    so the reply never waits on an insert.
+    """
+    background(fn(*args, **kwargs), "Turn log write")
+
+
+async def handle_llm(call_id, caller_id, phone, text_ml, snapshot_parts=None) -> str:
+    """
+    One turn as a stage graph (llm/stages.py). After translation, intent,
+    an unfiltered speculative retrieval and the snapshot lookup run side by
+    side; the filtered RAG result is then cut from the speculative pool
+    instead of querying again.
+
+        session ─────────────────────────────────────────────┐
+        snapshot_parts ──────────────┐                       │
+        translate ─┬─ intent ──── snapshot ─── prompt ─ generate ─ guardrail ─ reply
+                   └─ candidates ─── rag ───────┘
+    """
+    lang = classify(text_ml)
+    # One degradation tier for the whole turn (llm/overload.py)
+    tier = overload.tier
+    graph = StageGraph()
 
     # ---------------------------------------------------------
-    # STEP 3: Smart RAG Retrieval (Topic Filtered)
+    # Inputs: session history, caller snapshot, English text
     # ---------------------------------------------------------
-    # If intent is 'general', topic is None (searches all docs)
-    rag_topic = INTENT_TO_TOPIC.get(intent, None)
-    
-    # Pass the topic to narrow down the search
-    rag_docs = await cpu_scheduler.run(rag.retrieve, text_en, rag_topic)
+    async def session_stage():
+        return await session_store.fetch_session(phone)
+
+    async def snapshot_parts_stage():
+        # Prefetched on CHANNEL_ANSWER (backend/call_registry.py); no DB round trip then
+        if snapshot_parts is not None:
+            return snapshot_parts
+        return await prefetch_snapshot(caller_id)
+
+    async def translate_stage():
+        # Language check, then Translate only if needed (CPU Bound)
+        started = time.perf_counter()
+        if lang.needs_translation:
+            text_en = await cpu_scheduler.run(ml_to_en, text_ml)
+            status = "translated"
+        elif lang.lang == "mixed":
+            # Mostly English: only the Malayalam spans take the ml-en hop
+            text_en = await cpu_scheduler.run(mixed_to_en, text_ml)
+            status = "translated_spans"
+        elif lang.lang == "manglish":
+            text_en = gloss_manglish(text_ml)
+            status = "skipped_manglish"
+        else:
+            text_en = text_ml
+            status = "skipped_en"
 
-    log_processing_step(call_id, "rag", text_en, [d[:80] for d in rag_docs])
+        # status + latency_ms make the skipped hops measurable per turn
+        _log(
+            log_processing_step, call_id, "translate_ml_en", text_ml, text_en,
+            status=status,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+        )
+        return text_en
 
     # ---------------------------------------------------------
-    # STEP 4: Build Prompt
+    # Intent, with retrieval started speculatively beside it
     # ---------------------------------------------------------
-    prompt = build_prompt(text_en, rag_docs, history, snapshot)
+    async def intent_stage(translate):
+        intent = await cpu_scheduler.run(detect_intent, translate)
+        _log(log_intent, call_id, intent)
+        return intent
+
+    async def candidates_stage(translate):
+        # Unfiltered, so it can start before the topic is known
+        try:
+            return await cpu_scheduler.run(rag.candidates, translate)
+        except Exception as e:
+            logging.error(f"⚠️ Speculative retrieval failed, querying after intent: {e}")
+            return None
+
+    async def snapshot_stage(intent, snapshot_parts):
+        return await get_snapshot(caller_id, intent, parts=snapshot_parts)
+
+    async def rag_stage(translate, intent, candidates):
+        # If intent is 'general', topic is None (searches all docs)
+        rag_topic = INTENT_TO_TOPIC.get(intent, None)
+        rag_docs = rag.from_candidates(candidates, rag_topic) if candidates is not None else None
+        status = "speculative"
+        if rag_docs is None:
+            # Too few topic docs in the pool: ask the index with the filter
+            rag_docs = await cpu_scheduler.run(rag.retrieve, translate, rag_topic)
+            status = "requeried"
+        _log(log_processing_step, call_id, "rag", translate, [d[:80] for d in rag_docs], status=status)
+        return rag_docs
 
     # ---------------------------------------------------------
-    # STEP 5: LLM Generation (GPU Bound)
+    # Prompt -> LLM (GPU Bound) -> Guardrails
     # ---------------------------------------------------------
-    response_en = await gpu_scheduler.run(engine.generate, prompt)
+    async def prompt_stage(translate, rag, session, snapshot):
+        # rag docs arrive best-first, so the budget drops the weakest chunks first
+        prompt, usage = prompt_budget.build(translate, rag, session.get("history", [])[-6:], snapshot)
+        _log(
+            log_processing_step, call_id, "prompt_tokens", None, usage,
+            status="trimmed" if usage["trimmed"] else "success",
+        )
+        return prompt
 
-    log_processing_step(call_id, "llm_generate", None, response_en)
+    async def generate_stage(prompt, translate, intent, rag, session, snapshot):
+        if tier.prefer_cached:
+            # Overloaded: a recent answer to the same question, or a matching QA chunk, beats a GPU wait
+            cached = answer_cache.get(_answer_key(translate, intent, session.get("history", [])[-6:], snapshot))
+            if cached is None:
+                cached = await cpu_scheduler.run(_qa_answer, translate, rag)
+            if cached:
+                _log(log_processing_step, call_id, "llm_generate", None, cached, status="cached")
+                return cached
+        response_en = await gpu_scheduler.run(engine.generate, prompt, tier.max_tokens)
+        _log(log_processing_step, call_id, "llm_generate", None, response_en, status=tier.name)
+        return response_en
+
+    async def guardrail_stage(generate, translate, intent, rag, session, snapshot):
+        safety_response = await guardrails.check(generate, intent, rag, grounding=tier.grounding_check)
+        _log(log_processing_step, call_id, "guardrail", status="modified" if safety_response else "passed")
+        if safety_response:
+            return safety_response
+        answer_cache.set(_answer_key(translate, intent, session.get("history", [])[-6:], snapshot), generate)
+        return generate
 
     # ---------------------------------------------------------
-    # STEP 6: Guardrails & Translate Back
+    # History + Translate Back
     # ---------------------------------------------------------
-    # CRITICAL FIX: Pass 'shared_detector' as the 4th argument
-    safety_response = apply_guardrails(response_en, intent, rag_docs, shared_detector)
+    async def reply_stage(translate, guardrail, session):
+        final_en = guardrail
+        langs, lang_pref = update_preference(session.get("langs", []), lang)
+        _log(
+            log_processing_step, call_id, "langid", None,
+            {"lang": lang.lang, "ml_ratio": round(lang.ml_ratio, 2), "preference": lang_pref},
+        )
+        _log(log_message, call_id, "ai", final_en)
+
+        # Update History
+        new_history = session.get("history", [])[-6:] + [
+            {"role": "user", "text": translate},
+            {"role": "ai", "text": final_en}
+        ]
+        session_store.update_session(phone, {"history": new_history[-6:], "langs": langs})
+        session_store.persist_later(phone)
 
-    log_processing_step(
-        call_id,
-        "guardrail",
-        status="modified" if safety_response else "passed"
-    )
+        # Final Translation (skipped when the caller prefers a language the TTS can voice directly)
+        if reply_lang(lang_pref) == "en":
+            _log(log_processing_step, call_id, "translate_en_ml", final_en, final_en, status="skipped_en", latency_ms=0)
+            return final_en
 
-    final_en = safety_response if safety_response else response_en
+        started = time.perf_counter()
+        reply_ml = await cpu_scheduler.run(en_to_ml, final_en)
+        _log(
+            log_processing_step, call_id, "translate_en_ml", final_en, reply_ml,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+        )
+        return reply_ml
 
-    log_message(call_id, "ai", final_en)
+    graph.add("session", session_stage)
+    graph.add("snapshot_parts", snapshot_parts_stage)
+    graph.add("translate", translate_stage)
+    graph.add("intent", intent_stage, ("translate",))
+    graph.add("candidates", candidates_stage, ("translate",))
+    graph.add("snapshot", snapshot_stage, ("intent", "snapshot_parts"))
+    graph.add("rag", rag_stage, ("translate", "intent", "candidates"))
+    graph.add("prompt", prompt_stage, ("translate", "rag", "session", "snapshot"))
+    graph.add("generate", generate_stage, ("prompt", "translate", "intent", "rag", "session", "snapshot"))
+    graph.add("guardrail", guardrail_stage, ("generate", "translate", "intent", "rag", "session", "snapshot"))
+    graph.add("reply", reply_stage, ("translate", "guardrail", "session"))
 
-    # Update History
-    new_history = history + [
-        {"role": "user", "text": text_en},
-        {"role": "ai", "text": final_en}
-    ]
-    session_store.update_session(phone, {"history": new_history[-6:]})
-    session_store.persist_later(phone)
+    results = await graph.run()
 
-    # Final Translation
-    return await cpu_scheduler.run(en_to_ml, final_en)
\ No newline at end of file
+    # wall_ms vs sequential_ms = critical path saved by running stages side by side
+    report = graph.report()
+    report["tier"] = tier.name
+    _log(log_processing_step, call_id, "turn_timing", None, report, latency_ms=int(report["wall_ms"]))
+    return results["reply"]
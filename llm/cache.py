@@ -4,6 +4,7 @@ import time
 _cache = {}
 
 TTL = 180  # seconds
+MAX_ENTRIES = 2048
 
 def get(key):
     val = _cache.get(key)
@@ -16,4 +17,13 @@ def get(key):
     return text
 
 def set(key, value):
+    _cache.pop(key, None)
     _cache[key] = (value, time.time())
+    while len(_cache) > MAX_ENTRIES:
+        _cache.pop(next(iter(_cache)))  # oldest write first
+
+def clear():
+    # RAG index swapped (llm/brain.py): cached answers were built on the old documents.
+    # Rebound rather than cleared: the swap runs in a thread while the loop may be in set()
+    global _cache
+    _cache = {}
@@ -1,22 +1,58 @@
 # llm/engine.py
+import time
 from llama_cpp import Llama
+from llm.prompt import MAX_NEW_TOKENS, N_CTX
+from llm.speculative import DRAFT_PATH, DRAFT_TOKENS, SPECULATIVE, make_draft
+from telemetry.metrics import metrics
 
 class PhiEngine:
-    def __init__(self, model_path):
+    def __init__(self, model_path, speculative=SPECULATIVE, draft_path=DRAFT_PATH, draft_tokens=DRAFT_TOKENS,
+                 n_gpu_layers=40, n_threads=2):
+        self.draft = make_draft(speculative, draft_path, draft_tokens)
         self.model = Llama(
             model_path=model_path,
-            n_ctx=2048,
-            n_threads=2,      # 🔒 prevents CPU starvation
-            n_gpu_layers=40,  # RTX 3080 Ti sweet spot
+            n_ctx=N_CTX,
+            n_threads=n_threads,  # 🔒 prevents CPU starvation
+            n_gpu_layers=n_gpu_layers,  # 40 = RTX 3080 Ti sweet spot
+            draft_model=self.draft,
             verbose=False
         )
+        draft_model = getattr(self.draft.inner, "model", None) if self.draft else None
+        if draft_model is not None and draft_model.n_vocab() != self.model.n_vocab():
+            raise ValueError(
+                f"Draft model vocabulary ({draft_model.n_vocab()}) doesn't match Phi ({self.model.n_vocab()})"
+            )
+        self.tokens = 0
+        self.seconds = 0.0
 
-    def generate(self, prompt: str) -> str:
-        out = self.model(
-            prompt,
-            max_tokens=120,
-            temperature=0.4,   # slightly conversational
-            top_p=0.9,
-            repeat_penalty=1.1
-        )
+    def generate(self, prompt: str, max_tokens=MAX_NEW_TOKENS, temperature=0.4) -> str:
+        started = time.perf_counter()
+        try:
+            out = self.model(
+                prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,   # slightly conversational
+                top_p=0.9,
+                repeat_penalty=1.1
+            )
+        finally:
+            if self.draft:
+                self.draft.finish()
+        elapsed = time.perf_counter() - started
+        tokens = out["usage"]["completion_tokens"]
+        self.tokens += tokens
+        self.seconds += elapsed
+        if tokens:
+            metrics.observe("phi_tokens_per_s", tokens / elapsed)
         return out["choices"][0]["text"].strip()
+
+    def stats(self):
+        """Decode throughput since load, and the draft acceptance rate when speculative."""
+        return {
+            "speculative": self.draft.kind if self.draft else "off",
+            "tokens": self.tokens,
+            "tokens_per_s": self.tokens / self.seconds if self.seconds else None,
+            "draft_tokens": self.draft.proposed if self.draft else 0,
+            "accepted_tokens": self.draft.accepted if self.draft else 0,
+            "acceptance": self.draft.acceptance() if self.draft else None,
+        }
@@ -1,41 +1,148 @@
-from sentence_transformers import util
+# llm/guardrails.py
+# Post-generation checks on the English reply: every number must appear in
+# the retrieved chunks, and the reply must sit close to at least one chunk
+# in MiniLM space. Chunks are checked through a per-document cache (unit
+# vector + numeric tokens), with vectors taken from the RAG index where
+# possible, so a turn only embeds its own reply; replies from concurrent
+# calls are embedded together in one batch.
+import asyncio
 import re
+import threading
+from collections import OrderedDict
+import numpy as np
 
-def apply_guardrails(response_en, intent, rag_docs, intent_detector):
+# Fixed replies; their Malayalam audio is pre-synthesized at startup (backend/startup.py)
+NUMERIC_FALLBACK = (
+    "I don’t have verified numerical data for that at the moment. "
+    "Please refer to the official admission notification."
+)
+GROUNDING_FALLBACK = "The official data for this query is currently being updated. May I help you with course details or placements instead?"
+FIXED_REPLIES = (NUMERIC_FALLBACK, GROUNDING_FALLBACK)
+
+SAFE_NUMBERS = frozenset({"10", "12", "2024", "2025"})
+GROUNDING_MIN_SIM = 0.5
+
+# Whole numbers only: "5" is not in "2025". Grouping commas go ("1,20,000" == "120000").
+_NUMBER = re.compile(r"\d+(?:,\d+)*(?:\.\d+)?")
+
+def numbers_in(text):
+    return frozenset(m.replace(",", "") for m in _NUMBER.findall(text))
+
+
+class GuardrailEngine:
     """
-    Checks if the answer is factual and grounded in context.
+    check(response_en, intent, rag_docs, grounding) -> fallback reply or None.
+
+    embedder: has embed(texts) -> normalized vectors (llm/rag/embedder.py)
+    stored_vectors: docs -> {doc: vector} already in the index (RAGRetriever.stored_vectors)
+    run: how blocking embed calls are run, e.g. cpu_scheduler.run
+    Replies arriving within max_wait_ms of each other share one embed call (up to max_batch).
+    The document cache is keyed by text, so it stays valid across index swaps.
     """
-    # 1. Skip check for general greetings
-    if intent == "general":
+    def __init__(self, embedder, stored_vectors=None, run=None, max_batch=16, max_wait_ms=3.0, cache_size=4096):
+        self.embedder = embedder
+        self.stored_vectors = stored_vectors
+        self.run = run or asyncio.to_thread
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.cache_size = cache_size
+        self._docs = OrderedDict()     # doc -> [unit vector or None, numeric tokens]
+        self._lock = threading.Lock()
+        self._pending = []             # (text, future) waiting for the next batch
+        self._flush_handle = None
+        self._inflight = set()
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def check(self, response_en, intent, rag_docs, grounding=True):
+        # 1. Skip check for general greetings
+        if intent == "general":
+            return None
+        entries = self._entries(rag_docs)
+
+        # 2. Fact Check: every number in the reply is a number in a retrieved chunk
+        known = frozenset().union(*(e[1] for e in entries))
+        if numbers_in(response_en) - SAFE_NUMBERS - known:
+            return NUMERIC_FALLBACK
+
+        if not grounding:
+            return None
+
+        # 3. Groundedness: one matrix-vector product against the chunk vectors
+        if not entries:
+            return GROUNDING_FALLBACK
+        (reply_vec,), _ = await asyncio.gather(self._embed([response_en]), self._fill_vectors(rag_docs, entries))
+        sims = np.stack([e[0] for e in entries]) @ reply_vec
+        if float(sims.max()) < GROUNDING_MIN_SIM:
+            return GROUNDING_FALLBACK
         return None
 
-    # 2. Fact Check: Hallucinated Numbers
-    # If the response contains a percentage or large number not in RAG, flag it.
-    numbers_in_response = re.findall(r'\d+', response_en)
-    combined_context = " ".join(rag_docs)
-    
-    SAFE_NUMBERS = {"10", "12", "2024", "2025"}
-
-    for num in numbers_in_response:
-        if num in SAFE_NUMBERS:
-            continue
-        if num not in combined_context:
-            return (
-                "I don’t have verified numerical data for that at the moment. "
-                "Please refer to the official admission notification."
-            )
-
-
-    # 3. Groundedness: Is the response actually related to the data we found?
-    # Use the shared IntentDetector's model for efficiency
-    res_emb = intent_detector.model.encode(response_en, convert_to_tensor=True)
-    ctx_emb = intent_detector.model.encode(rag_docs, convert_to_tensor=True)
-    
-    # If the bot's answer is totally unrelated to the provided documents (similarity < 0.5)
-    max_context_sim = util.cos_sim(res_emb, ctx_emb).max().item()
-    
-    if max_context_sim < 0.5:
-        # Fallback response instead of a made-up one
-        return "The official data for this query is currently being updated. May I help you with course details or placements instead?"
-
-    return None
\ No newline at end of file
+    # ---------------------------------------------------------
+    # Per-document cache: [unit vector or None, numeric tokens]
+    # ---------------------------------------------------------
+
+    def _entries(self, docs):
+        entries = []
+        with self._lock:
+            for d in docs:
+                entry = self._docs.get(d)
+                if entry is None:
+                    entry = self._docs[d] = [None, numbers_in(d)]
+                    if len(self._docs) > self.cache_size:
+                        self._docs.popitem(last=False)
+                else:
+                    self._docs.move_to_end(d)
+                entries.append(entry)
+        return entries
+
+    async def _fill_vectors(self, docs, entries):
+        missing = {d: e for d, e in zip(docs, entries) if e[0] is None}
+        if not missing:
+            return
+        vectors = dict(self.stored_vectors(list(missing))) if self.stored_vectors else {}
+        unseen = [d for d in missing if d not in vectors]
+        if unseen:
+            vectors.update(zip(unseen, await self._embed(unseen)))
+        for d, e in missing.items():
+            e[0] = np.asarray(vectors[d], dtype=np.float32)
+
+    # ---------------------------------------------------------
+    # Cross-call batching
+    # ---------------------------------------------------------
+
+    async def _embed(self, texts):
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return [np.asarray(v, dtype=np.float32) for v in await asyncio.gather(*futures)]
+
+    def _flush(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch):
+        self.batches += 1
+        self.batched_texts += len(batch)
+        try:
+            vectors = await self.run(self.embedder.embed, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vec in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vec)
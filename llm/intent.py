@@ -1,10 +1,16 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
+from llm.lazy import LazyModel
+from workers.ipc import RemoteIntentDetector, workers_enabled
 
 class IntentDetector:
-    def __init__(self):
+    def __init__(self, model=None):
         # Extremely small and fast (80MB), perfect for 50+ concurrent lookups
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Pass an already-loaded MiniLM to avoid a second copy in memory
+        if model is None:
+            from llm.rag.embedder import Embedder
+            model = Embedder().model  # torch or onnx, per ZENTRY_EMBEDDER_BACKEND
+        self.model = model
         
         # Define "Anchor" phrases for each intent
         self.intent_anchors = {
@@ -36,6 +42,14 @@ class IntentDetector:
                 
         return best_intent
 
+def _load_detector():
+    # Proxy to the MiniLM worker in multi-process mode
+    if workers_enabled():
+        return RemoteIntentDetector()
+    # Share the embedder's MiniLM instead of loading a second copy
+    from llm.rag.embedder import embedder_instance
+    return IntentDetector(model=embedder_instance.model)
+
 # Singleton instance
-detector = IntentDetector()
+detector = LazyModel("intent", _load_detector, warmup=lambda d: d.detect("hello"))
 def detect_intent(text): return detector.detect(text)
\ No newline at end of file
@@ -0,0 +1,104 @@
+# llm/langid.py
+# Script-based language check on the STT text, so handle_llm only pays for
+# the IndicTrans2 ml-en hop when the caller actually spoke Malayalam script.
+#
+#   ml       - mostly Malayalam script: full ml-en translation
+#   mixed    - mostly English with some Malayalam script: only the Malayalam
+#              spans go through ml-en (one batch), the English stays as spoken
+#   manglish - romanized Malayalam ("B.Tech fees ethra?"): the model only reads
+#              Malayalam script, so common words are glossed to English instead
+#   en       - English: no translation
+import os
+import re
+from dataclasses import dataclass
+
+MALAYALAM = re.compile(r"[\u0D00-\u0D7F]")
+LATIN = re.compile(r"[A-Za-z]")
+LATIN_WORD = re.compile(r"[A-Za-z]+")
+# A run of Malayalam words (ZWJ/ZWNJ are part of the spelling)
+MALAYALAM_SPAN = re.compile(r"[\u0D00-\u0D7F\u200C\u200D]+(?:\s+[\u0D00-\u0D7F\u200C\u200D]+)*")
+
+# Romanized Malayalam function/question words callers mix into English
+MANGLISH_GLOSS = {
+    "ethra": "how much", "etra": "how much", "ethre": "how much",
+    "enthanu": "what is", "entha": "what", "enthu": "what", "enth": "what",
+    "engane": "how", "eppol": "when", "eppo": "when", "evide": "where",
+    "aaranu": "who is", "aara": "who", "ethu": "which", "eth": "which",
+    "undo": "is there", "undu": "there is", "und": "there is", "illa": "no", "alla": "not",
+    "aano": "is it", "ano": "is it", "aanu": "is", "anu": "is", "alle": "right",
+    "venam": "want", "venamo": "needed", "kittumo": "can I get", "kittum": "will get",
+    "pattumo": "is it possible", "pattum": "possible", "parayamo": "can you tell",
+    "njan": "I", "enikku": "for me", "ningal": "you", "ningalude": "your",
+    "sheri": "okay", "seri": "okay", "mathi": "enough", "kollam": "good",
+    "nallath": "good", "koodi": "also", "kure": "many", "kurach": "a little",
+}
+
+@dataclass
+class LangDecision:
+    lang: str
+    ml_ratio: float        # Malayalam-script share of letters
+    manglish_words: int
+
+    @property
+    def needs_translation(self):
+        return self.lang == "ml"
+
+
+def classify(text: str) -> LangDecision:
+    ml = len(MALAYALAM.findall(text))
+    latin = len(LATIN.findall(text))
+    letters = ml + latin
+    if letters == 0:
+        return LangDecision("ml", 0.0, 0)  # nothing to judge; keep the old path
+
+    ratio = ml / letters
+    if ratio >= 0.5:
+        return LangDecision("ml", ratio, 0)
+    if ml:
+        return LangDecision("mixed", ratio, 0)
+
+    hits = sum(w.lower() in MANGLISH_GLOSS for w in LATIN_WORD.findall(text))
+    if hits:
+        return LangDecision("manglish", ratio, hits)
+    return LangDecision("en", ratio, 0)
+
+
+def malayalam_spans(text: str):
+    """The Malayalam-script runs of a mixed transcript, in order."""
+    return MALAYALAM_SPAN.findall(text)
+
+
+def splice_spans(text: str, translated) -> str:
+    """Puts the translations back where the spans were, in the same order."""
+    parts = iter(translated)
+    return MALAYALAM_SPAN.sub(lambda m: next(parts, m.group(0)), text)
+
+
+def gloss_manglish(text: str) -> str:
+    """Word-level English gloss; Phi reads the result fine as a query."""
+    return LATIN_WORD.sub(lambda m: MANGLISH_GLOSS.get(m.group(0).lower(), m.group(0)), text)
+
+
+# ---------------------------------------------------------
+# Per-call preference
+# ---------------------------------------------------------
+
+PREFERENCE_WINDOW = 3
+
+# Languages the TTS can voice. MMS-TTS is Malayalam-only, so English replies
+# are still translated until an English voice is added here.
+REPLY_LANGS = set(os.getenv("ZENTRY_REPLY_LANGS", "ml").split(","))
+
+def update_preference(recent, decision: LangDecision):
+    """
+    recent: last few turn languages from the session. Returns (recent, pref)
+    where pref is "en" once most recent turns were plain English, else "ml".
+    """
+    recent = (list(recent) + [decision.lang])[-PREFERENCE_WINDOW:]
+    en_turns = sum(lang == "en" for lang in recent)
+    pref = "en" if en_turns * 2 > len(recent) else "ml"
+    return recent, pref
+
+
+def reply_lang(pref):
+    return pref if pref in REPLY_LANGS else "ml"
@@ -0,0 +1,55 @@
+# llm/lazy.py
+# Model singletons that load on first use instead of at import time, so
+# backend/startup.py can load independent models in parallel and warm them up.
+import logging
+import threading
+import time
+
+MODELS = {}  # name -> LazyModel, in registration order
+
+class LazyModel:
+    """
+    Stands in for the model object; attribute access loads it on first use.
+    Loading is guarded, so concurrent first users share one load.
+    """
+    def __init__(self, name, factory, warmup=None):
+        self._name = name
+        self._factory = factory
+        self._warmup = warmup
+        self._instance = None
+        self._lock = threading.Lock()
+        self.load_seconds = None
+        self.warmup_seconds = None
+        MODELS[name] = self
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    started = time.perf_counter()
+                    instance = self._factory()
+                    self.load_seconds = time.perf_counter() - started
+                    logging.info(f"✅ {self._name} loaded in {self.load_seconds:.1f}s")
+                    self._instance = instance
+        return self._instance
+
+    def warmup(self):
+        instance = self.get()
+        if self._warmup and self.warmup_seconds is None:
+            started = time.perf_counter()
+            self._warmup(instance)
+            self.warmup_seconds = time.perf_counter() - started
+        return instance
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModel {self._name} ({state})>"
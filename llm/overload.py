@@ -0,0 +1,111 @@
+# llm/overload.py
+# Overload controller: watches how long work waits for the GPU slots
+# (gpu_scheduler, MalayalamSTT.gpu_lock) against a latency SLO and steps
+# through degradation tiers, instead of letting every call slow down together.
+import asyncio
+import logging
+import os
+import numpy as np
+from telemetry.metrics import metrics
+
+class Tier:
+    def __init__(self, level, name, max_tokens, grounding_check=True, prefer_cached=False,
+                 light_stt=False, hold_new_calls=False):
+        self.level = level
+        self.name = name
+        self.max_tokens = max_tokens          # reply length cap for Phi
+        self.grounding_check = grounding_check  # MiniLM groundedness check in GuardrailEngine.check
+        self.prefer_cached = prefer_cached    # answer from the answer cache / QA chunks, skip Phi
+        self.light_stt = light_stt            # WHISPER_LIGHT_PATH model, when configured
+        self.hold_new_calls = hold_new_calls  # new calls hear HOLD_MESSAGE_ML until load drops
+
+    def __repr__(self):
+        return f"<Tier {self.level} {self.name}>"
+
+
+TIERS = [
+    Tier(0, "normal", max_tokens=120),
+    Tier(1, "lean", max_tokens=80, grounding_check=False),
+    Tier(2, "cached", max_tokens=60, grounding_check=False, prefer_cached=True, light_stt=True),
+    Tier(3, "shed", max_tokens=60, grounding_check=False, prefer_cached=True, light_stt=True,
+         hold_new_calls=True),
+]
+
+# p95 queue wait (ms) each queue may reach before it counts as over SLO
+SLO_MS = {
+    "gpu": float(os.getenv("ZENTRY_SLO_GPU_WAIT_MS", "800")),
+    "stt": float(os.getenv("ZENTRY_SLO_STT_WAIT_MS", "400")),
+}
+
+HOLD_MESSAGE_ML = "ക്ഷമിക്കണം, ഇപ്പോൾ ധാരാളം കോളുകൾ ഉണ്ട്. ദയവായി അൽപ്പനേരം കാത്തിരിക്കൂ."
+
+class OverloadController:
+    """
+    pressure = max over queues of p95(wait over the last `window` seconds) / SLO
+
+    Steps up one tier after `up_after` consecutive checks with pressure > 1,
+    and down one after `down_after` checks below `calm` (hysteresis, so a
+    single burst doesn't flap the tiers).
+    """
+    def __init__(self, slo_ms=None, window=10.0, interval=1.0, up_after=2, down_after=10, calm=0.5):
+        self.slo_ms = slo_ms or SLO_MS
+        self.window = window
+        self.interval = interval
+        self.up_after = up_after
+        self.down_after = down_after
+        self.calm = calm
+        self.level = 0
+        self.pressure = 0.0
+        self._over = 0
+        self._under = 0
+        metrics.set("overload_tier", 0)
+
+    @property
+    def tier(self):
+        return TIERS[self.level]
+
+    def measure(self):
+        pressure = 0.0
+        for queue, slo in self.slo_ms.items():
+            waits = metrics.recent("queue_wait_ms", self.window, queue=queue)
+            if waits:
+                p95 = float(np.percentile(waits, 95))
+                metrics.set("queue_wait_p95_ms", round(p95, 1), queue=queue)
+                pressure = max(pressure, p95 / slo)
+        return pressure
+
+    def evaluate(self):
+        self.pressure = self.measure()
+        metrics.set("overload_pressure", round(self.pressure, 3))
+        if self.pressure > 1.0:
+            self._over, self._under = self._over + 1, 0
+            if self._over >= self.up_after and self.level < len(TIERS) - 1:
+                self._change(self.level + 1)
+        elif self.pressure < self.calm:
+            self._over, self._under = 0, self._under + 1
+            if self._under >= self.down_after and self.level > 0:
+                self._change(self.level - 1)
+        else:
+            self._over = self._under = 0
+        return self.tier
+
+    def _change(self, level):
+        old = self.tier
+        self.level = level
+        self._over = self._under = 0
+        metrics.set("overload_tier", level)
+        metrics.inc("overload_tier_entered_total", tier=self.tier.name)
+        metrics.event("overload_tier_change", old=old.name, new=self.tier.name, pressure=round(self.pressure, 3))
+        log = logging.warning if level > old.level else logging.info
+        log(f"🚦 Overload tier {old.name} -> {self.tier.name} (pressure {self.pressure:.2f})")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.evaluate()
+            except Exception as e:
+                logging.error(f"Overload controller check failed: {e}")
+
+
+controller = OverloadController()
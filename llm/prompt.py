@@ -1,3 +1,19 @@
+# llm/prompt.py
+# Prompt assembly under a token budget. Every section is measured with the
+# Phi tokenizer, so the prompt always fits n_ctx with room for the reply,
+# and no prefill token is spent on text that was going to overflow anyway.
+
+N_CTX = 2048            # PhiEngine context window
+MAX_NEW_TOKENS = 120    # reserved for the reply (PhiEngine.generate default)
+
+# Per-section caps in tokens; the RAG context gets whatever is left
+BUDGETS = {
+    "user": 160,
+    "snapshot": 96,
+    "history": 384,
+}
+SUMMARY_QUESTION_TOKENS = 16
+
 SYSTEM_PROMPT = """
 ### ROLE
 You are the voice-based Admission Assistant for Zentry College. Your goal is to provide accurate information and guide prospective students through the admission process over the phone.
@@ -26,16 +42,21 @@ User: {user_input}
 Assistant (Short, verbal response):
 """
 
-def build_prompt(user_en, rag_docs, history_list, snapshot):
+def format_history(history_list, summary=None):
+    lines = [f"Earlier in the call the student asked about: {summary}"] if summary else []
+    for turn in history_list:
+        prefix = "Student" if turn["role"] == "user" else "Assistant"
+        lines.append(f"{prefix}: {turn['text']}")
+    return "".join(line + "\n" for line in lines)
+
+
+def build_prompt(user_en, rag_docs, history_list, snapshot, history_summary=None):
     # 1. RAG Context - Keep it lean
     context_str = "\n".join(rag_docs) if rag_docs else "No specific context provided."
 
     # 2. Format History
     # For voice, 6 exchanges is good, but make sure to label them clearly
-    history_str = ""
-    for turn in history_list[-6:]:
-        prefix = "Student" if turn["role"] == "user" else "Assistant"
-        history_str += f"{prefix}: {turn['text']}\n"
+    history_str = format_history(history_list[-6:], history_summary)
 
     # 3. Fill Template
     return SYSTEM_PROMPT.format(
@@ -43,4 +64,140 @@ def build_prompt(user_en, rag_docs, history_list, snapshot):
         snapshot=snapshot,
         history=history_str,
         user_input=user_en
-    )
\ No newline at end of file
+    )
+
+# ---------------------------------------------------------
+# Tokenizers
+# ---------------------------------------------------------
+
+class LlamaTokenizer:
+    """The GGUF's own vocabulary (vocab_only: no weights, loads in well under a second)."""
+    def __init__(self, model_path):
+        from llama_cpp import Llama
+        self.vocab = Llama(model_path=model_path, vocab_only=True, verbose=False)
+
+    def encode(self, text):
+        return self.vocab.tokenize(text.encode("utf-8"), add_bos=False)
+
+    def decode(self, tokens):
+        return self.vocab.detokenize(tokens).decode("utf-8", errors="ignore")
+
+
+class ApproxTokenizer:
+    """~4 characters per token; for tools and benchmarks without the GGUF."""
+    CHARS = 4
+
+    def encode(self, text):
+        return [text[i:i + self.CHARS] for i in range(0, len(text), self.CHARS)]
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+# ---------------------------------------------------------
+# Budgeted assembly
+# ---------------------------------------------------------
+
+class PromptBudget:
+    def __init__(self, tokenizer, n_ctx=N_CTX, max_new_tokens=MAX_NEW_TOKENS, budgets=None):
+        self.tokenizer = tokenizer
+        self.limit = n_ctx - max_new_tokens
+        self.budgets = {**BUDGETS, **(budgets or {})}
+        self._fixed = None
+
+    def count(self, text):
+        return len(self.tokenizer.encode(text)) if text else 0
+
+    def truncate(self, text, n, keep="head"):
+        tokens = self.tokenizer.encode(text)
+        if len(tokens) <= n:
+            return text
+        if n <= 0:
+            return ""
+        return self.tokenizer.decode(tokens[-n:] if keep == "tail" else tokens[:n]).strip()
+
+    @property
+    def fixed(self):
+        # Template text around the sections; measured once, on first use
+        if self._fixed is None:
+            self._fixed = self.count(SYSTEM_PROMPT.format(context="", snapshot="", history="", user_input=""))
+        return self._fixed
+
+    def build(self, user_en, rag_docs, history_list, snapshot):
+        """
+        Returns (prompt, usage). rag_docs must be best-first; the lowest
+        ranked chunks are the first to go. usage has tokens per section.
+        """
+        trimmed = []
+
+        # 1. The caller's words: keep the end, that's where the question is
+        user = self.truncate(user_en, self.budgets["user"], keep="tail")
+        if user != user_en:
+            trimmed.append("user")
+
+        snapshot = snapshot or ""
+        snap = self.truncate(snapshot, self.budgets["snapshot"])
+        if snap != snapshot:
+            trimmed.append("snapshot")
+
+        # 2. History: newest turns verbatim, older student questions folded into one line
+        turns, summary = self._fit_history(history_list[-6:])
+        if len(turns) < len(history_list[-6:]):
+            trimmed.append("history")
+        history_tokens = self.count(format_history(turns, summary))
+
+        # 3. RAG context: best-first until the remaining room runs out
+        room = self.limit - self.fixed - self.count(user) - self.count(snap) - history_tokens
+        docs, context_tokens = [], 0
+        for doc in rag_docs or []:
+            n = self.count(doc + "\n")
+            if context_tokens + n <= room:
+                docs.append(doc)
+                context_tokens += n
+            elif not docs and room > 0:
+                docs.append(self.truncate(doc, room - 1))  # the best chunk, cut to fit
+                context_tokens = self.count(docs[0] + "\n")
+        if len(docs) < len(rag_docs or []) or (docs and docs[0] != rag_docs[0]):
+            trimmed.append("context")
+
+        prompt = build_prompt(user, docs, turns, snap, summary)
+        total = self.count(prompt)
+        # Tokens merge differently across section joins; shave the context if that tipped it over
+        while total > self.limit and docs:
+            docs.pop()
+            prompt = build_prompt(user, docs, turns, snap, summary)
+            total = self.count(prompt)
+
+        usage = {
+            "system": self.fixed,
+            "user": self.count(user),
+            "snapshot": self.count(snap),
+            "history": history_tokens,
+            "context": self.count("\n".join(docs)),
+            "total": total,
+            "limit": self.limit,
+            "docs_used": len(docs),
+            "docs_dropped": len(rag_docs or []) - len(docs),
+            "history_turns": len(turns),
+            "history_summarised": summary is not None,
+            "trimmed": trimmed,
+        }
+        return prompt, usage
+
+    def _fit_history(self, history_list):
+        budget = self.budgets["history"]
+        kept, used = [], 0
+        for turn in reversed(history_list):
+            n = self.count(format_history([turn]))
+            if used + n > budget:
+                break
+            kept.insert(0, turn)
+            used += n
+
+        older = history_list[:len(history_list) - len(kept)]
+        questions = [self.truncate(t["text"], SUMMARY_QUESTION_TOKENS) for t in older if t["role"] == "user"]
+        while questions:
+            summary = "; ".join(questions)
+            if used + self.count(format_history([], summary)) <= budget:
+                return kept, summary
+            questions.pop(0)  # oldest question goes first
+        return kept, None
@@ -1,12 +1,29 @@
 # llm/rag/embeddor.py
-from sentence_transformers import SentenceTransformer
+import logging
+import os
+from llm.lazy import LazyModel
+from workers.ipc import RemoteModel, workers_enabled
 
 MODEL_NAME = "all-MiniLM-L6-v2"
 
+def backend_from_env():
+    """ZENTRY_EMBEDDER_BACKEND = torch (default) | onnx (int8, see llm/rag/export_onnx.py)"""
+    kind = os.getenv("ZENTRY_EMBEDDER_BACKEND", "torch")
+    if kind not in ("torch", "onnx"):
+        logging.warning(f"Unknown embedder backend '{kind}', using torch")
+        kind = "torch"
+    return kind
+
 class Embedder:
-    def __init__(self):
-        print(f"Loading Embedding Model: {MODEL_NAME}...")
-        self.model = SentenceTransformer(MODEL_NAME)
+    def __init__(self, backend=None):
+        self.backend = backend or backend_from_env()
+        print(f"Loading Embedding Model: {MODEL_NAME} ({self.backend})...")
+        if self.backend == "onnx":
+            from llm.rag.onnx_embedder import OnnxMiniLM
+            self.model = OnnxMiniLM()
+        else:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(MODEL_NAME)
 
     def embed(self, texts):
         # Handle single string input just in case
@@ -20,5 +37,9 @@ class Embedder:
         ).tolist()
 
 # --- SINGLETON INSTANCE ---
-# This runs once when you first import 'embedder_instance' anywhere
-embedder_instance = Embedder()
\ No newline at end of file
+# Loads on first use (or in parallel from backend/startup.py), once per process
+embedder_instance = LazyModel(
+    "minilm",
+    lambda: RemoteModel("minilm") if workers_enabled() else Embedder(),
+    warmup=lambda e: e.embed(["admission fees"]),
+)
\ No newline at end of file
@@ -0,0 +1,63 @@
+# llm/rag/export_onnx.py
+"""
+Exports all-MiniLM-L6-v2 to ONNX and quantizes its weights to int8 for the
+onnx embedder backend (llm/rag/onnx_embedder.py).
+
+    python -m llm.rag.export_onnx                 # -> models/minilm-onnx/
+
+Writes model.onnx (fp32), model.int8.onnx and tokenizer.json. Select it with
+ZENTRY_EMBEDDER_BACKEND=onnx and check it with python -m bench.embed_compare.
+"""
+import argparse
+import os
+from llm.rag.onnx_embedder import ONNX_DIR
+
+HF_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+def export(output_dir=ONNX_DIR, opset=17):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(HF_NAME)
+    model = AutoModel.from_pretrained(HF_NAME).eval()
+
+    # Only the transformer is exported; pooling + normalize run in numpy
+    sample = tokenizer(["admission fees for btech"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    print(f"🔄 Exporting {HF_NAME} -> {fp32_path}...")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        fp32_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "seq"},
+            "attention_mask": {0: "batch", 1: "seq"},
+            "token_type_ids": {0: "batch", 1: "seq"},
+            "last_hidden_state": {0: "batch", 1: "seq"},
+        },
+        opset_version=opset,
+    )
+
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+    print(f"🔄 Quantizing -> {int8_path}...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+    print(f"✅ MiniLM exported to {output_dir}")
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default=ONNX_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    export(args.output_dir, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# llm/rag/index_versions.py
+# Versioned Chroma snapshots under one root:
+#
+#   rag_db/
+#     CURRENT              <- name of the live version (replaced atomically)
+#     versions/<version>/  <- one complete persisted Chroma DB each
+#
+# Ingestion builds a new version next to the live one and publishes it by
+# rewriting CURRENT; running retrievers pick it up (RAGRetriever.reload_if_changed)
+# without a restart. A root with no CURRENT is the old single-directory layout.
+import logging
+import os
+import shutil
+import time
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+def current_version(db_root="rag_db"):
+    try:
+        with open(os.path.join(db_root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_path(db_root, version):
+    # None = legacy layout, the root itself is the database
+    return os.path.join(db_root, VERSIONS_DIR, version) if version else db_root
+
+
+def create_version(db_root="rag_db"):
+    """Copies the live index into a new version folder; returns (version, path)."""
+    version = time.strftime("%Y%m%d-%H%M%S")
+    path = version_path(db_root, version)
+    n = 1
+    while os.path.exists(path):
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{n}"
+        path = version_path(db_root, version)
+        n += 1
+
+    source = version_path(db_root, current_version(db_root))
+    if os.path.isdir(source):
+        shutil.copytree(
+            source, path,
+            ignore=shutil.ignore_patterns(CURRENT_FILE, VERSIONS_DIR) if source == db_root else None,
+        )
+    else:
+        os.makedirs(path)
+    return version, path
+
+
+def publish(db_root, version):
+    """Makes version live. Atomic: readers see the old name or the new one."""
+    tmp = os.path.join(db_root, CURRENT_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(db_root, CURRENT_FILE))
+    logging.info(f"📚 RAG index version {version} published")
+
+
+def prune_versions(db_root="rag_db", keep=3):
+    """Deletes old versions, keeping the newest `keep` and always the live one."""
+    root = os.path.join(db_root, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    live = current_version(db_root)
+    old = sorted(os.listdir(root))[:-keep] if keep else sorted(os.listdir(root))
+    removed = [v for v in old if v != live]
+    for v in removed:
+        shutil.rmtree(os.path.join(root, v), ignore_errors=True)
+    return removed
@@ -0,0 +1,270 @@
+# llm/rag/ingest.py
+"""
+Incremental bulk ingestion into the admission collection.
+
+    python -m llm.rag.ingest docs/fees_2025.pdf docs/hostel.txt --topic fees
+    python -m llm.rag.ingest faq/*.pdf --type qa --workers 8
+    python -m llm.rag.ingest docs/*.pdf --snapshot   # build a new index version, then publish it
+
+Pages stream out of a process pool (PDF extraction is the slow, CPU-bound
+part), get chunked, and are embedded in bounded batches. Chunk IDs are a
+hash of source + content, so re-running on the same file only embeds and
+writes chunks that changed, and drops the ones that disappeared.
+
+With --snapshot the live index is copied to a new version, updated there,
+and published only when ingestion succeeded; running voice servers swap it
+in within their poll interval (llm/rag/retriever.py watch_index).
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from llm.rag.chunker import chunk_text
+from llm.rag.index_versions import create_version, current_version, prune_versions, publish, version_path
+from llm.rag.store import get_chroma_client, get_collection
+
+PAGES_PER_JOB = 8
+TEXT_SECTION_CHARS = 4000
+
+# ---------------------------------------------------------
+# Extraction (generators; nothing holds a whole corpus in memory)
+# ---------------------------------------------------------
+
+def _pdf_page_count(path):
+    from PyPDF2 import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _extract_pdf_pages(job):
+    # Runs in a worker process
+    from PyPDF2 import PdfReader
+    path, start, stop = job
+    pages = PdfReader(path).pages
+    return [(i, pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def iter_pages(path, pool=None):
+    """Yields (page_no, text). PDFs are split into page ranges across the pool."""
+    if path.endswith(".pdf"):
+        count = _pdf_page_count(path)
+        jobs = [(path, s, min(s + PAGES_PER_JOB, count)) for s in range(0, count, PAGES_PER_JOB)]
+        results = pool.map(_extract_pdf_pages, jobs) if pool else map(_extract_pdf_pages, jobs)
+        for batch in results:  # in page order, as soon as each range is done
+            yield from batch
+        return
+
+    if path.endswith(".json"):
+        text = json.dumps(json.loads(Path(path).read_text()), indent=2)
+        yield 0, text
+        return
+
+    # Plain text: paragraph-aligned sections, read line by line
+    section, size, n = [], 0, 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            section.append(line)
+            size += len(line)
+            if size >= TEXT_SECTION_CHARS and not line.strip():
+                yield n, "".join(section)
+                section, size, n = [], 0, n + 1
+    if section:
+        yield n, "".join(section)
+
+
+def iter_doc_chunks(pages):
+    # Chunked per page, so an edit on one page leaves the other pages' IDs alone
+    for page_no, text in pages:
+        for chunk in chunk_text(text):
+            yield chunk, {"page": page_no}
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def iter_qa_pairs(lines):
+    """(question, answer) from "Q:" / "A:" blocks; a block may span pages."""
+    q, a = None, []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("Q:"):
+            if q and a:
+                yield q, _clean(" ".join(a))
+            q, a = line[2:].strip(), []
+        elif line.startswith("A:"):
+            a.append(line[2:].strip())
+        elif a:
+            a.append(line)
+    if q and a:
+        yield q, _clean(" ".join(a))
+
+
+def iter_qa_chunks(pages):
+    lines = (line for _, text in pages for line in text.splitlines())
+    for q, a in iter_qa_pairs(lines):
+        yield f"Question: {q}\nAnswer: {a}", {}
+
+
+def chunk_id(source, text):
+    return hashlib.sha1(f"{source}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# ---------------------------------------------------------
+# Upsert
+# ---------------------------------------------------------
+
+class IngestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.scanned = self.added = self.updated = self.unchanged = self.deleted = 0
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    def report(self, label):
+        rate = self.scanned / self.seconds if self.seconds else 0.0
+        print(f"✅ {label}: {self.scanned} chunks in {self.seconds:.1f}s ({rate:.0f} chunks/s) — "
+              f"{self.added} new, {self.updated} metadata-only, {self.unchanged} unchanged, {self.deleted} removed")
+
+
+def ingest_chunks(col, embedder, chunks, source, meta, seen, batch_size=64, stats=None):
+    """
+    chunks: iterable of (text, extra_metadata). Only chunks whose ID is not
+    in the collection are embedded; known IDs with different metadata get a
+    metadata update. Every ID is added to seen, for prune_source().
+    """
+    stats = stats or IngestStats()
+
+    for batch in _batches(chunks, batch_size):
+        ids, docs, metas = [], [], []
+        for text, extra in batch:
+            cid = chunk_id(source, text)
+            if cid in seen:
+                continue  # repeated boilerplate (headers/footers) within the source
+            seen.add(cid)
+            ids.append(cid)
+            docs.append(text)
+            metas.append({"source": source, **meta, **extra})
+        stats.scanned += len(ids)
+        if not ids:
+            continue
+
+        existing = col.get(ids=ids, include=["metadatas"])
+        known = dict(zip(existing["ids"], existing["metadatas"]))
+
+        new = [i for i, cid in enumerate(ids) if cid not in known]
+        changed = [i for i, cid in enumerate(ids) if cid in known and known[cid] != metas[i]]
+        stats.unchanged += len(ids) - len(new) - len(changed)
+
+        if new:
+            col.upsert(
+                ids=[ids[i] for i in new],
+                documents=[docs[i] for i in new],
+                embeddings=embedder.embed([docs[i] for i in new]),
+                metadatas=[metas[i] for i in new],
+            )
+            stats.added += len(new)
+        if changed:
+            col.update(ids=[ids[i] for i in changed], metadatas=[metas[i] for i in changed])
+            stats.updated += len(changed)
+
+    return stats
+
+
+def prune_source(col, source, seen):
+    """Deletes the source's chunks that were not seen in this run; returns the count."""
+    stored = col.get(where={"source": source}, include=[])["ids"]
+    stale = [cid for cid in stored if cid not in seen]
+    if stale:
+        col.delete(ids=stale)
+    return len(stale)
+
+
+def ingest_paths(paths, kind="doc", source=None, topic=None, workers=None,
+                 batch_size=64, prune=True, db_path="rag_db", embedder=None, snapshot=False, keep_versions=3):
+    """
+    Ingests files one after another; PDF pages of each file are extracted in parallel.
+    db_path is the index root; without snapshot the live version is updated in place.
+    """
+    if embedder is None:
+        from llm.rag.embedder import embedder_instance as embedder  # one MiniLM for the whole run
+
+    if snapshot:
+        version, target = create_version(db_path)
+        print(f"📚 Building index version {version}")
+    else:
+        version, target = None, version_path(db_path, current_version(db_path))
+
+    client = get_chroma_client(target)
+    col = get_collection(client)
+    total = IngestStats()
+    seen = {}  # source -> chunk IDs seen this run (a shared --source spans several files)
+
+    meta = {"type": kind}
+    if topic and kind == "doc":
+        meta["topic"] = topic
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in paths:
+            stats = IngestStats()
+            src = source or os.path.basename(path)
+            pages = iter_pages(path, pool)
+            chunks = iter_qa_chunks(pages) if kind == "qa" else iter_doc_chunks(pages)
+            ingest_chunks(col, embedder, chunks, src, meta, seen.setdefault(src, set()), batch_size, stats)
+            stats.report(path)
+            for field in ("scanned", "added", "updated", "unchanged"):
+                setattr(total, field, getattr(total, field) + getattr(stats, field))
+
+    if prune:
+        for src, ids in seen.items():
+            total.deleted += prune_source(col, src, ids)
+
+    client.persist()
+    total.report(f"{len(paths)} file(s)")
+
+    if snapshot:
+        publish(db_path, version)
+        prune_versions(db_path, keep_versions)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="files or glob patterns (.pdf, .txt, .json)")
+    parser.add_argument("--type", dest="kind", choices=("doc", "qa"), default="doc")
+    parser.add_argument("--source", help="source name (default: file name); pass every file of a shared source in one run")
+    parser.add_argument("--topic", help="topic metadata for doc chunks (seats, fees, placements, ...)")
+    parser.add_argument("--workers", type=int, help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embedding call")
+    parser.add_argument("--no-prune", dest="prune", action="store_false",
+                        help="keep chunks that are no longer in the source")
+    parser.add_argument("--db", default="rag_db", help="index root")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="write a new index version and publish it to running servers")
+    parser.add_argument("--keep-versions", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])})
+    ingest_paths(paths, args.kind, args.source, args.topic, args.workers,
+                 args.batch_size, args.prune, args.db,
+                 snapshot=args.snapshot, keep_versions=args.keep_versions)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,7 @@
 # llm/rag/ingest_docs.py
-import uuid
-from llm.rag.loader import load_file
-from llm.rag.chunker import chunk_text
-from llm.rag.embedder import Embedder
-from llm.rag.store import get_chroma_client, get_collection
+from llm.rag.ingest import ingest_paths
 
 def ingest_document(path, source, topic):
-    client = get_chroma_client()
-    col = get_collection(client)
-    embedder = Embedder()
-
-    text = load_file(path)
-    chunks = chunk_text(text)
-    embeddings = embedder.embed(chunks)
-
-    col.add(
-        ids=[str(uuid.uuid4()) for _ in chunks],
-        documents=chunks,
-        embeddings=embeddings,
-        metadatas=[
-            {
-                "source": source,
-                "topic": topic,
-                "type": "doc"
-            }
-            for _ in chunks
-        ]
-    )
-
-    client.persist()
-    print(f"✅ Ingested {len(chunks)} chunks from {path}")
+    # Incremental: unchanged chunks are skipped, removed ones dropped (llm/rag/ingest.py)
+    stats = ingest_paths([path], kind="doc", source=source, topic=topic)
+    print(f"✅ Ingested {stats.added} new chunks from {path}")
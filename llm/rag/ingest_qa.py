@@ -1,46 +1,10 @@
 # llm/rag/ingest_qa.py
-import os, re, uuid
-from PyPDF2 import PdfReader
-from llm.rag.embedder import Embedder
-from llm.rag.store import get_chroma_client, get_collection
-
-def clean(text):
-    return re.sub(r"\s+", " ", text).strip()
+from llm.rag.ingest import ingest_paths, iter_qa_pairs
 
 def extract_qa(text):
-    q, a, out = None, [], []
-    for line in text.splitlines():
-        line = line.strip()
-        if line.startswith("Q:"):
-            if q and a:
-                out.append((q, clean(" ".join(a))))
-            q, a = line[2:].strip(), []
-        elif line.startswith("A:"):
-            a.append(line[2:].strip())
-        elif a:
-            a.append(line)
-    if q and a:
-        out.append((q, clean(" ".join(a))))
-    return out
+    return list(iter_qa_pairs(text.splitlines()))
 
 def ingest_qa_pdf(path, source):
-    client = get_chroma_client()
-    col = get_collection(client)
-    embedder = Embedder()
-
-    text = "\n".join(
-        p.extract_text() or ""
-        for p in PdfReader(path).pages
-    )
-
-    docs, metas, ids = [], [], []
-    for q, a in extract_qa(text):
-        docs.append(f"Question: {q}\nAnswer: {a}")
-        metas.append({"source": source, "type": "qa"})
-        ids.append(str(uuid.uuid4()))
-
-    embeddings = embedder.embed(docs)
-    col.add(ids=ids, documents=docs, embeddings=embeddings, metadatas=metas)
-
-    client.persist()
-    print(f"✅ Ingested {len(docs)} QA pairs from {path}")
+    # Incremental: unchanged pairs are skipped, removed ones dropped (llm/rag/ingest.py)
+    stats = ingest_paths([path], kind="qa", source=source)
+    print(f"✅ Ingested {stats.added} new QA pairs from {path}")
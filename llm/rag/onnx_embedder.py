@@ -0,0 +1,93 @@
+# llm/rag/onnx_embedder.py
+# all-MiniLM-L6-v2 exported to ONNX with int8 weights (llm/rag/export_onnx.py).
+# Drop-in for the SentenceTransformer object: Embedder and IntentDetector
+# only ever call .encode().
+import os
+import threading
+import numpy as np
+
+ONNX_DIR = os.getenv("ZENTRY_MINILM_ONNX_DIR", "models/minilm-onnx")
+MAX_LENGTH = 256  # SentenceTransformer's max_seq_length for this model
+DIM = 384
+
+class OnnxMiniLM:
+    def __init__(self, model_dir=ONNX_DIR, model_file="model.int8.onnx",
+                 max_batch=64, max_length=MAX_LENGTH, threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.max_batch = max_batch
+        self.max_length = max_length
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.no_padding()  # we pad into our own buffers
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads or max(1, (os.cpu_count() or 2) // 2)
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), opts, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        # Per-thread input buffers: encode runs from several scheduler threads at once
+        self._local = threading.local()
+
+    def _buffers(self):
+        bufs = getattr(self._local, "bufs", None)
+        if bufs is None:
+            size = self.max_batch * self.max_length
+            bufs = self._local.bufs = {
+                "input_ids": np.zeros(size, dtype=np.int64),
+                "attention_mask": np.zeros(size, dtype=np.int64),
+                "token_type_ids": np.zeros(size, dtype=np.int64),
+            }
+        return bufs
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        batch, length = len(encodings), max(len(e.ids) for e in encodings)
+
+        # Contiguous (batch, length) views over the preallocated buffers
+        bufs = self._buffers()
+        ids = bufs["input_ids"][:batch * length].reshape(batch, length)
+        mask = bufs["attention_mask"][:batch * length].reshape(batch, length)
+        types = bufs["token_type_ids"][:batch * length].reshape(batch, length)
+        ids.fill(0)
+        mask.fill(0)
+        types.fill(0)
+        for row, e in enumerate(encodings):
+            n = len(e.ids)
+            ids[row, :n] = e.ids
+            mask[row, :n] = 1
+
+        feeds = {"input_ids": ids, "attention_mask": mask, "token_type_ids": types}
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self._input_names})[0]
+
+        # Mean pooling over real tokens, same as the SentenceTransformer head
+        m = mask[:, :, None].astype(np.float32)
+        return (hidden * m).sum(axis=1) / np.maximum(m.sum(axis=1), 1e-9)
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=True,
+               convert_to_tensor=False, show_progress_bar=False, **_):
+        """
+        Same call shape as SentenceTransformer.encode. Always returns numpy
+        (util.cos_sim accepts it). all-MiniLM-L6-v2 ships a Normalize layer,
+        so vectors are unit length either way.
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        if not sentences:
+            return np.zeros((0, DIM), dtype=np.float32)
+
+        # Length-sorted batches waste less work on padding
+        order = np.argsort([len(s) for s in sentences])
+        step = min(batch_size, self.max_batch)
+        out = np.empty((len(sentences), DIM), dtype=np.float32)
+        for i in range(0, len(order), step):
+            idx = order[i:i + step]
+            out[idx] = self._encode_batch([sentences[j] for j in idx])
+
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
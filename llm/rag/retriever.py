@@ -1,31 +1,159 @@
 # llm/rag/retriever.py
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from llm.rag.index_versions import current_version, version_path
 from llm.rag.store import get_chroma_client, get_collection
 
+def open_collection(db_root="rag_db", version=None):
+    return get_collection(get_chroma_client(version_path(db_root, version)), name="admission")
+
+
 class RAGRetriever:
-    def __init__(self, embedder_instance, top_k=3):
+    def __init__(self, embedder_instance, top_k=3, collection=None, db_root="rag_db", cache_size=1024):
         """
         Args:
             embedder_instance: The shared Embedder object from embedder.py
+            collection: Optional pre-opened Chroma collection (benchmarks, tools);
+                disables version reloading
+            db_root: versioned index root (see index_versions.py)
         """
-        # Use the helper from store.py for consistency
-        client = get_chroma_client() 
-        self.col = get_collection(client, name="admission")
-        
-        self.embedder = embedder_instance 
+        self.db_root = db_root
+        self.reloadable = collection is None
+        version = None
+        if collection is None:
+            # Use the helper from store.py for consistency
+            version = current_version(db_root)
+            collection = open_collection(db_root, version)
+        # (version, collection) swapped as one reference, so a query never mixes versions
+        self._index = (version, collection)
+
+        self.embedder = embedder_instance
         self.top_k = top_k
 
-    def retrieve(self, query, topic=None):
-        # 1. Embed query using the shared model
-        query_vector = self.embedder.embed([query]) 
+        # Query results per index version; dropped on every swap
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._vectors = {}   # doc -> stored embedding, from query results (llm/guardrails.py)
+        self._swap_lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def col(self):
+        return self._index[1]
+
+    @property
+    def version(self):
+        return self._index[0]
 
-        # 2. Build Filter
+    def retrieve(self, query, topic=None):
+        # If topic is None, searches all docs
         where = {"topic": topic} if topic else None
+        return [doc for doc, _ in self._query(query, self.top_k, where, topic)]
+
+    def candidates(self, query, n=None):
+        """
+        Unfiltered top-n (doc, metadata) pairs. Run while intent is still being
+        detected; from_candidates() then narrows them to the topic.
+        """
+        n = n or self.top_k * 4
+        return self._query(query, n, None, ("*", n))
+
+    def from_candidates(self, candidates, topic, n=None):
+        """
+        Topic-filtered top_k taken from a candidates() pool, or None when the
+        pool can't answer exactly and retrieve() has to query again. Exact
+        because the topic's best docs inside the overall top-n are its global
+        best, as long as top_k of them made it in (or the pool is the whole index).
+        """
+        n = n or self.top_k * 4
+        docs = [doc for doc, meta in candidates if not topic or (meta or {}).get("topic") == topic]
+        if len(docs) >= self.top_k or len(candidates) < n:
+            return docs[:self.top_k]
+        return None
+
+    def _query(self, query, n, where, cache_tag):
+        # In-flight queries keep the version they started on, even across a swap
+        version, col = self._index
+        key = (version, cache_tag, query.strip().lower())
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+
+        # 1. Embed query using the shared model
+        query_vector = self.embedder.embed([query])
 
-        # 3. Query using EMBEDDINGS
-        res = self.col.query(
-            query_embeddings=query_vector, 
-            n_results=self.top_k,
-            where=where
+        # 2. Query using EMBEDDINGS
+        res = col.query(
+            query_embeddings=query_vector,
+            n_results=n,
+            where=where,
+            include=["documents", "metadatas", "embeddings"],
         )
-        
-        return res["documents"][0] if res["documents"] else []
\ No newline at end of file
+
+        docs = res["documents"][0] if res["documents"] else []
+        metas = res["metadatas"][0] if res.get("metadatas") else [None] * len(docs)
+        vectors = res["embeddings"][0] if res.get("embeddings") is not None else []
+        hits = list(zip(docs, metas))
+
+        with self._cache_lock:
+            if version == self.version:  # don't refill the cache from a retired version
+                self._vectors.update(zip(docs, vectors))
+                self._cache[key] = hits
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return list(hits)
+
+    def stored_vectors(self, docs):
+        """{doc: embedding} for the docs a query has returned; the guardrails skip re-encoding them."""
+        with self._cache_lock:
+            return {d: self._vectors[d] for d in docs if d in self._vectors}
+
+    # ---------------------------------------------------------
+    # Hot swap
+    # ---------------------------------------------------------
+
+    def on_swap(self, callback):
+        """callback(old_version, new_version) after every swap; for caches built on retrieval."""
+        self._listeners.append(callback)
+
+    def swap(self, collection, version):
+        old = self.version
+        self._index = (version, collection)
+        with self._cache_lock:
+            self._cache.clear()
+            self._vectors.clear()
+        for callback in self._listeners:
+            try:
+                callback(old, version)
+            except Exception as e:
+                logging.error(f"RAG swap listener failed: {e}")
+        logging.info(f"🔁 RAG index swapped: {old or 'legacy'} -> {version or 'legacy'}")
+
+    def reload_if_changed(self):
+        """Opens the published version off to the side, then swaps it in. Returns True on swap."""
+        if not self.reloadable:
+            return False
+        with self._swap_lock:
+            version = current_version(self.db_root)
+            if version == self.version:
+                return False
+            collection = open_collection(self.db_root, version)
+            collection.count()  # fail here, not on a caller's query
+            self.swap(collection, version)
+            return True
+
+
+async def watch_index(retriever, interval=10.0):
+    """Background loader: polls CURRENT and hot-swaps new versions into the retriever."""
+    while True:
+        await asyncio.sleep(interval)
+        if not getattr(retriever, "loaded", True):
+            continue  # LazyModel not loaded yet; it will open the live version itself
+        try:
+            await asyncio.to_thread(retriever.reload_if_changed)
+        except Exception as e:
+            logging.error(f"⚠️ RAG index reload failed, keeping {retriever.version}: {e}")
@@ -1,19 +1,26 @@
 import asyncio
+import time
+from telemetry.metrics import metrics
 
 class AsyncScheduler:
-    def __init__(self, max_concurrent=1):
+    def __init__(self, max_concurrent=1, name=None):
         self.sem = asyncio.Semaphore(max_concurrent)
+        self.name = name
 
     async def run(self, fn, *args):
+        queued = time.perf_counter()
         async with self.sem:
+            # Time spent waiting for a slot; llm/overload.py watches it against the SLO
+            if self.name:
+                metrics.observe("queue_wait_ms", (time.perf_counter() - queued) * 1000, queue=self.name)
             # This moves the blocking CPU work to a separate thread
             # keeping your Audio Loop free!
             return await asyncio.to_thread(fn, *args)
 
 # Create two separate instances
 # GPU Scheduler: Strict limit (e.g., 1 or 2) to prevent OOM
-gpu_scheduler = AsyncScheduler(max_concurrent=1) 
+gpu_scheduler = AsyncScheduler(max_concurrent=1, name="gpu")
 
 # CPU Scheduler: Higher limit (e.g., 4 or 8) for translations
 # Your i9 can easily handle 4 concurrent translations.
-cpu_scheduler = AsyncScheduler(max_concurrent=4)
\ No newline at end of file
+cpu_scheduler = AsyncScheduler(max_concurrent=4, name="cpu")
@@ -0,0 +1,93 @@
+# llm/speculative.py
+# Draft models for speculative decoding in PhiEngine. A cheap drafter
+# proposes the next few tokens, Phi checks them all in one forward pass and
+# keeps the prefix it agrees with, so an accepted run costs one GPU step
+# instead of one per token. Phi still samples every kept token itself, so
+# the reply distribution doesn't change, only how many passes it takes.
+import os
+import numpy as np
+from llama_cpp import Llama
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+from llm.prompt import N_CTX
+from telemetry.metrics import metrics
+
+# off | lookup (n-grams copied from the prompt, i.e. the RAG context) | draft (small GGUF model)
+SPECULATIVE = os.getenv("ZENTRY_SPECULATIVE", "off")
+DRAFT_PATH = os.getenv("PHI_DRAFT_PATH")           # must share Phi's tokenizer
+DRAFT_TOKENS = int(os.getenv("ZENTRY_DRAFT_TOKENS", "8"))
+DRAFT_GPU_LAYERS = int(os.getenv("ZENTRY_DRAFT_GPU_LAYERS", "-1"))
+
+class SmallModelDraft(LlamaDraftModel):
+    """Greedy continuation from a small model with the same vocabulary."""
+    def __init__(self, model_path, num_pred_tokens=DRAFT_TOKENS, n_gpu_layers=DRAFT_GPU_LAYERS, n_threads=2):
+        print(f"⚙️ Loading draft model: {model_path}")
+        self.model = Llama(
+            model_path=model_path,
+            n_ctx=N_CTX,
+            n_threads=n_threads,
+            n_gpu_layers=n_gpu_layers,
+            verbose=False,
+        )
+        self.num_pred_tokens = num_pred_tokens
+
+    def __call__(self, input_ids, **kwargs):
+        draft = []
+        # reset=True keeps the longest common prefix in the draft's KV cache,
+        # so each call only evaluates the tokens Phi added since the last one
+        for token in self.model.generate(input_ids.tolist(), top_k=1, temp=0.0, reset=True):
+            draft.append(token)
+            if len(draft) >= self.num_pred_tokens or token == self.model.token_eos():
+                break
+        return np.array(draft, dtype=np.intc)
+
+
+class TrackedDraft(LlamaDraftModel):
+    """
+    Wraps a drafter and counts how many proposed tokens Phi kept.
+
+    llama_cpp calls the drafter with the context after every verify step.
+    Phi keeps `accepted` drafted tokens and adds one of its own, so the
+    context has grown by accepted + 1 since the previous call.
+    """
+    def __init__(self, inner, kind):
+        self.inner = inner
+        self.kind = kind
+        self.proposed = 0
+        self.accepted = 0
+        self._pending = None  # (context length, tokens proposed) awaiting verification
+
+    def __call__(self, input_ids, **kwargs):
+        n = len(input_ids)
+        if self._pending:
+            start, proposed = self._pending
+            if start < n <= start + proposed + 1:
+                self._settle(proposed, n - start - 1)
+        draft = self.inner(input_ids, **kwargs)
+        self._pending = (n, len(draft)) if len(draft) else None
+        return draft
+
+    def _settle(self, proposed, accepted):
+        self.proposed += proposed
+        self.accepted += accepted
+        metrics.inc("spec_draft_tokens_total", proposed, kind=self.kind)
+        metrics.inc("spec_accepted_tokens_total", accepted, kind=self.kind)
+
+    def finish(self):
+        """End of a generation: the last proposal was cut off by a stop, not verified."""
+        self._pending = None
+
+    def acceptance(self):
+        return self.accepted / self.proposed if self.proposed else None
+
+
+def make_draft(kind=SPECULATIVE, draft_path=DRAFT_PATH, num_pred_tokens=DRAFT_TOKENS):
+    """TrackedDraft for the configured mode, or None when speculative decoding is off."""
+    if kind == "off":
+        return None
+    if kind == "lookup":
+        return TrackedDraft(LlamaPromptLookupDecoding(num_pred_tokens=num_pred_tokens), kind)
+    if kind == "draft":
+        if not draft_path:
+            raise ValueError("ZENTRY_SPECULATIVE=draft needs PHI_DRAFT_PATH")
+        return TrackedDraft(SmallModelDraft(draft_path, num_pred_tokens), kind)
+    raise ValueError(f"Unknown speculative mode {kind!r} (off, lookup, draft)")
@@ -0,0 +1,73 @@
+# llm/stages.py
+# Tiny dependency-graph runner for one conversational turn. Each stage is an
+# async function of its dependencies' results; a stage starts the moment its
+# last dependency finishes, so independent work (DB lookups, retrieval,
+# intent) overlaps instead of queueing.
+import asyncio
+import time
+
+class StageGraph:
+    def __init__(self):
+        self.stages = {}      # name -> (fn, deps), in insertion order
+        self.results = {}
+        self.timings = {}     # name -> (start_ms, duration_ms) relative to run()
+
+    def add(self, name, fn, deps=()):
+        """fn(**{dep: result}) -> awaitable. Dependencies must be added first."""
+        for d in deps:
+            if d not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {d}")
+        self.stages[name] = (fn, tuple(deps))
+        return self
+
+    async def run(self):
+        t0 = time.perf_counter()
+        tasks = {}
+
+        async def run_stage(name, fn, deps):
+            if deps:
+                await asyncio.gather(*(tasks[d] for d in deps))
+            start = time.perf_counter()
+            result = await fn(**{d: self.results[d] for d in deps})
+            end = time.perf_counter()
+            self.results[name] = result
+            self.timings[name] = ((start - t0) * 1000, (end - start) * 1000)
+            return result
+
+        for name, (fn, deps) in self.stages.items():
+            tasks[name] = asyncio.create_task(run_stage(name, fn, deps))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            # One stage failed (or the turn was cancelled): stop the rest
+            for t in tasks.values():
+                t.cancel()
+            raise
+        self.wall_ms = (time.perf_counter() - t0) * 1000
+        return self.results
+
+    def report(self):
+        """
+        Per-stage timings plus wall_ms (what the caller waited) and
+        sequential_ms (the same stages run one after another, as before).
+        """
+        sequential = sum(d for _, d in self.timings.values())
+        return {
+            "stages": {n: {"start_ms": round(s, 1), "ms": round(d, 1)} for n, (s, d) in self.timings.items()},
+            "critical_path": self.critical_path(),
+            "wall_ms": round(self.wall_ms, 1),
+            "sequential_ms": round(sequential, 1),
+            "saved_ms": round(sequential - self.wall_ms, 1),
+        }
+
+    def critical_path(self):
+        """Chain of stages that decided wall time: last to finish, then its latest dependency, and so on."""
+        ends = {n: s + d for n, (s, d) in self.timings.items()}
+        if not ends:
+            return []
+        name = max(ends, key=ends.get)
+        path = [name]
+        while self.stages[name][1]:
+            name = max(self.stages[name][1], key=ends.get)
+            path.append(name)
+        return path[::-1]
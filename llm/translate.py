@@ -1,10 +1,29 @@
 # llm/translate.py
-from translate.translator import Translator
+from llm.lazy import LazyModel
+from workers.ipc import RemoteModel, workers_enabled
 
-translator = Translator()
+def _load_translator():
+    if workers_enabled():
+        return RemoteModel("indictrans")
+    from translate.translator import Translator
+    return Translator()
+
+def _warmup(t):
+    t.translate("നമസ്കാരം", "ml-en")
+    t.translate("Hello", "en-ml")
+
+translator = LazyModel("indictrans", _load_translator, warmup=_warmup)
 
 def ml_to_en(text: str) -> str:
     return translator.translate(text, "ml-en")
 
 def en_to_ml(text: str) -> str:
     return translator.translate(text, "en-ml")
+
+def mixed_to_en(text: str) -> str:
+    """Code-mixed turn: only the Malayalam spans are translated (one batch), the English is kept."""
+    from llm.langid import malayalam_spans, splice_spans
+    spans = malayalam_spans(text)
+    if not spans:
+        return text
+    return splice_spans(text, translator.translate_batch(spans, "ml-en"))
@@ -0,0 +1,56 @@
+# session/affinity.py
+# Call-to-node affinity. Rendezvous (highest random weight) hashing keeps a
+# caller on the same node across calls, so their session stays hot in that
+# node's memory, and only the callers of a removed node move when the ring changes.
+import hashlib
+import os
+import socket
+
+def node_id_from_env():
+    """Routing identity of this box in the NodeRing (shared by its front-ends)."""
+    return os.getenv("ZENTRY_NODE_ID") or socket.gethostname()
+
+
+def owner_id():
+    """
+    Session ownership identity: unique per process, so front-ends on one box
+    (same node id) still see each other's claims in the shared backend.
+    """
+    return f"{node_id_from_env()}:{os.getpid()}"
+
+
+class NodeRing:
+    def __init__(self, nodes):
+        """
+        Args:
+            nodes: {node_id: audio websocket url}
+        """
+        self.nodes = dict(nodes)
+
+    @classmethod
+    def from_env(cls):
+        """ZENTRY_NODES="node-a=ws://10.0.0.11:5001,node-b=ws://10.0.0.12:5001" """
+        spec = os.getenv("ZENTRY_NODES", "")
+        nodes = dict(item.split("=", 1) for item in spec.split(",") if "=" in item)
+        return cls(nodes or {node_id_from_env(): "ws://127.0.0.1:5001"})
+
+    @staticmethod
+    def _score(node_id, key):
+        return int.from_bytes(hashlib.blake2b(f"{node_id}:{key}".encode(), digest_size=8).digest(), "big")
+
+    def node_for(self, key):
+        return max(self.nodes, key=lambda n: self._score(n, key))
+
+    def url_for(self, key):
+        return self.nodes[self.node_for(key)]
+
+    def should_handle(self, key, node_id):
+        # A controller that is not itself in the ring routes every call
+        return node_id not in self.nodes or self.node_for(key) == node_id
+
+
+def affinity_key(uuid, phone=None):
+    # Prefer the caller so returning callers land where their history is hot
+    if phone and phone != "unknown":
+        return hashlib.sha256(phone.encode()).hexdigest()
+    return uuid
@@ -0,0 +1,168 @@
+# session/backends.py
+# Shared session storage. SessionStore keeps hot sessions in local memory and
+# only goes through one of these when a call lands on a node that does not
+# own the caller's session.
+#
+# All methods are blocking; SessionStore calls them through asyncio.to_thread.
+import copy
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+SESSION_FIELDS = ("history", "langs", "metadata")
+
+class SessionBackend:
+    def load(self, phone):
+        """Returns the stored session dict or None."""
+        raise NotImplementedError
+
+    def save(self, phone, session):
+        raise NotImplementedError
+
+    def save_many(self, sessions):
+        """{phone: session}; backends override this with one batched write."""
+        for phone, session in sessions.items():
+            self.save(phone, session)
+
+    def claim(self, phone, node_id):
+        """Marks node_id as owner of phone's session; returns the previous owner."""
+        raise NotImplementedError
+
+
+class InMemoryBackend(SessionBackend):
+    """
+    In-process stand-in for a shared store. Give several SessionStores the
+    same instance to simulate nodes in one process. Values are deep-copied
+    so nodes never share dict objects, same as with a real network store.
+
+    Not persistent: everything is gone on restart. Bounded to max_sessions
+    (least recently saved/loaded go first), so sessions SessionStore spills
+    here don't grow memory without limit; an evicted caller starts fresh.
+    """
+    def __init__(self, max_sessions=50000):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._owners = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def _bound(self, table):
+        while len(table) > self.max_sessions:
+            table.popitem(last=False)
+            if table is self._sessions:
+                self.evicted += 1
+
+    def load(self, phone):
+        with self._lock:
+            if phone not in self._sessions:
+                return None
+            self._sessions.move_to_end(phone)
+            return copy.deepcopy(self._sessions[phone])
+
+    def save(self, phone, session):
+        self.save_many({phone: session})
+
+    def save_many(self, sessions):
+        with self._lock:
+            for phone, session in sessions.items():
+                self._sessions[phone] = copy.deepcopy(session)
+                self._sessions.move_to_end(phone)
+            self._bound(self._sessions)
+
+    def claim(self, phone, node_id):
+        with self._lock:
+            prev = self._owners.pop(phone, None)
+            self._owners[phone] = node_id
+            self._bound(self._owners)
+            return prev
+
+
+class RedisBackend(SessionBackend):
+    def __init__(self, url, prefix="zentry:session:", ttl=30 * 24 * 3600):
+        import redis  # optional dependency, only needed for multi-node
+        self.r = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def load(self, phone):
+        raw = self.r.get(self.prefix + phone)
+        return json.loads(raw) if raw else None
+
+    def save(self, phone, session):
+        self.r.set(self.prefix + phone, json.dumps(session), ex=self.ttl)
+
+    def save_many(self, sessions):
+        pipe = self.r.pipeline(transaction=False)
+        for phone, session in sessions.items():
+            pipe.set(self.prefix + phone, json.dumps(session), ex=self.ttl)
+        pipe.execute()
+
+    def claim(self, phone, node_id):
+        prev = self.r.getset(self.prefix + "owner:" + phone, node_id)
+        return prev.decode() if prev else None
+
+
+class SupabaseBackend(SessionBackend):
+    """Uses the `sessions` table (phone, history, langs, metadata, owner_node)."""
+    def __init__(self):
+        from db.client import init_supabase
+        self.sb = init_supabase()
+
+    @staticmethod
+    def _row(phone, session):
+        return {"phone": phone, **{f: session.get(f) for f in SESSION_FIELDS if f in session}}
+
+    def load(self, phone):
+        res = self.sb.table("sessions").select(", ".join(SESSION_FIELDS)).eq("phone", phone).execute()
+        if not res.data:
+            return None
+        # Rows written before langs existed come back with a null there
+        return {f: res.data[0].get(f) or ({} if f == "metadata" else []) for f in SESSION_FIELDS}
+
+    def save(self, phone, session):
+        self.sb.table("sessions").upsert(self._row(phone, session)).execute()
+
+    def save_many(self, sessions):
+        # One multi-row upsert instead of a request per phone
+        rows = [self._row(phone, session) for phone, session in sessions.items()]
+        self.sb.table("sessions").upsert(rows).execute()
+
+    def claim(self, phone, node_id):
+        # Not atomic, but a call only moves when the ring changes
+        res = self.sb.table("sessions").select("owner_node").eq("phone", phone).execute()
+        prev = res.data[0]["owner_node"] if res.data else None
+        self.sb.table("sessions").upsert({"phone": phone, "owner_node": node_id}).execute()
+        return prev
+
+
+def backend_kind():
+    """
+    ZENTRY_SESSION_BACKEND = supabase | redis | memory
+        default: supabase when SUPABASE_URL is set (and ZENTRY_DB_BACKEND
+        isn't local), otherwise memory, which does not survive a restart
+        and is private to one process
+    """
+    from db.client import DB_BACKEND, SUPABASE_URL
+    default = "supabase" if SUPABASE_URL and DB_BACKEND != "local" else "memory"
+    kind = os.getenv("ZENTRY_SESSION_BACKEND", default)
+    if kind not in ("supabase", "redis", "memory"):
+        logging.warning(f"Unknown session backend '{kind}', using memory")
+        kind = "memory"
+    return kind
+
+
+def backend_from_env():
+    """
+    Backend picked by backend_kind().
+    ZENTRY_REDIS_URL          = redis://host:6379/0
+    ZENTRY_SESSION_MEMORY_MAX = sessions the memory backend keeps (50000)
+    """
+    kind = backend_kind()
+    if kind == "redis":
+        return RedisBackend(os.getenv("ZENTRY_REDIS_URL", "redis://127.0.0.1:6379/0"))
+    if kind == "supabase":
+        return SupabaseBackend()
+    logging.warning("⚠️ Session backend is in-process memory: histories are lost on restart")
+    return InMemoryBackend(max_sessions=int(os.getenv("ZENTRY_SESSION_MEMORY_MAX", "50000")))
@@ -1,43 +1,186 @@
 # session/session_store.py
 import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from session.affinity import owner_id
+from session.backends import InMemoryBackend
 
 class SessionStore:
-    def __init__(self, url=None, key=None):
+    """
+    Hot sessions in a bounded LRU; everything else lives in the backend.
+
+    - persist_later() only marks a phone dirty, so a caller talking for ten
+      turns is written once per flush interval, not ten times.
+    - Each flush writes all dirty sessions with one backend.save_many().
+    - Sessions idle for idle_ttl, or pushed out by max_sessions, are spilled
+      to the backend and reloaded lazily by fetch_session() on the next call.
+    """
+    def __init__(self, url=None, key=None, backend=None, node_id=None,
+                 max_sessions=5000, idle_ttl=1800, flush_interval=2.0):
         # self.supabase = create_client(url, key)
-        self.cache = {} 
-        self.queue = asyncio.Queue()
-        asyncio.create_task(self._sync_worker())
+        self.backend = backend or InMemoryBackend()
+        # Owner id for backend.claim(), per process (not the NodeRing node id)
+        self.node_id = node_id or owner_id()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.flush_interval = flush_interval
+
+        self.cache = OrderedDict()  # phone -> session, least recently used first
+        self.last_used = {}
+        self.active = set()         # phones whose ownership we already claimed for a live call
+        self.dirty = set()
+        self.spilled = {}           # evicted but not yet written: phone -> session
+        self._releases = set()      # end-of-call writes in flight
+        self._flush_lock = asyncio.Lock()
+        self._worker = asyncio.create_task(self._sync_worker())
+
+    def _new_session(self):
+        return {
+            "history": [],  # List of {"role": "...", "text": "..."}
+            "langs": [],    # Recent turn languages, see llm/langid.py
+            "metadata": {}
+        }
+
+    def _touch(self, phone):
+        self.cache.move_to_end(phone)
+        self.last_used[phone] = time.monotonic()
+
+    def _insert(self, phone, session):
+        self.cache[phone] = session
+        self._touch(phone)
+        self._enforce_cap()
 
     def get_session(self, phone):
+        """Cache-only accessor; use fetch_session() to honour evictions and other nodes."""
         if phone not in self.cache:
-            self.cache[phone] = {
-                "history": [],  # List of {"role": "...", "text": "..."}
-                "metadata": {}
-            }
+            self._insert(phone, self._new_session())
+        self._touch(phone)
         return self.cache[phone]
 
+    async def fetch_session(self, phone):
+        """
+        Like get_session, but consults the shared backend the first time a call
+        for this phone reaches this node. The stored copy is only read when the
+        session is not cached here or another node owned it since.
+        """
+        if phone in self.active and phone in self.cache:
+            self._touch(phone)
+            return self.cache[phone]
+
+        prev_owner = await asyncio.to_thread(self.backend.claim, phone, self.node_id)
+        self.active.add(phone)
+
+        if phone in self.cache and prev_owner in (None, self.node_id):
+            self._touch(phone)
+        elif phone in self.spilled and prev_owner in (None, self.node_id):
+            # Evicted moments ago and not flushed yet: the spill is the newest copy
+            self._insert(phone, self.spilled.pop(phone))
+            self.dirty.add(phone)
+        else:
+            # A spill may be mid-write in the current batch; read after it lands
+            async with self._flush_lock:
+                stored = await asyncio.to_thread(self.backend.load, phone)
+            self.spilled.pop(phone, None)
+            self._insert(phone, stored or self._new_session())
+        return self.cache[phone]
+
+    def release(self, phone):
+        # Call ended: keep the hot copy, but re-check ownership on the next call.
+        # Written now rather than at the next flush, so the caller's next call
+        # on another process or node loads this history, not an older one.
+        self.active.discard(phone)
+        if phone not in self.cache:
+            return
+        task = asyncio.create_task(self._persist(phone))
+        self._releases.add(task)
+        task.add_done_callback(self._release_done)
+
+    def _release_done(self, task):
+        self._releases.discard(task)
+        if not task.cancelled() and task.exception():
+            # _flush put it back in dirty; the sync worker retries
+            logging.error(f"Session write on release failed: {task.exception()}")
+
     def update_session(self, phone, data):
         if phone in self.cache:
             self.cache[phone].update(data)
+            self._touch(phone)
 
     def persist_later(self, phone):
-        self.queue.put_nowait(phone)
+        if phone in self.cache:
+            self.dirty.add(phone)
+
+    # ---------------------------------------------------------
+    # Eviction
+    # ---------------------------------------------------------
+
+    def _evict(self, phone):
+        session = self.cache.pop(phone)
+        self.last_used.pop(phone, None)
+        if phone in self.dirty:
+            self.dirty.discard(phone)
+            self.spilled[phone] = session
+
+    def _enforce_cap(self):
+        if len(self.cache) <= self.max_sessions:
+            return
+        # Oldest first, never a session with a live call on it
+        for phone in list(self.cache):
+            if len(self.cache) <= self.max_sessions:
+                break
+            if phone not in self.active:
+                self._evict(phone)
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        for phone in list(self.cache):
+            if self.last_used.get(phone, 0) > cutoff:
+                break  # LRU order: everything after this is newer
+            if phone not in self.active:
+                self._evict(phone)
+
+    # ---------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------
+
+    async def _flush(self, phones=None):
+        async with self._flush_lock:
+            if phones is None:
+                phones, self.dirty = self.dirty, set()
+            else:
+                self.dirty -= phones
+            batch = {p: copy.deepcopy(self.cache[p]) for p in phones if p in self.cache}
+            spilled, self.spilled = self.spilled, {}
+            batch.update(spilled)
+            if not batch:
+                return 0
+            try:
+                await asyncio.to_thread(self.backend.save_many, batch)
+            except Exception:
+                # Put everything back so the next flush retries it
+                self.dirty |= {p for p in batch if p in self.cache}
+                for p, s in spilled.items():
+                    self.spilled.setdefault(p, s)
+                raise
+            return len(batch)
 
-    # session/session_store.py (Update _sync_worker)
     async def _sync_worker(self):
         while True:
-            phone = await self.queue.get()
-            session = self.cache.get(phone)
-            
-            # Only sync if supabase client exists
-            if not session or not hasattr(self, 'supabase') or not self.supabase:
-                continue
-                
-            await asyncio.to_thread(
-                self.supabase.table("sessions").upsert({"phone": phone, **session}).execute
-            )
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self._evict_idle()
+                await self._flush()
+            except Exception as e:
+                logging.error(f"Session sync failed: {e}")
 
-    async def flush_all(self):
-        for phone in list(self.cache.keys()):
-            await self._persist(phone)
+    async def _persist(self, phone):
+        await self._flush({phone})
 
+    async def flush_all(self):
+        # Shutdown: only what changed here. A clean cached copy may be older
+        # than what another process has written since, so it is not rewritten.
+        if self._releases:
+            await asyncio.gather(*self._releases, return_exceptions=True)
+        return await self._flush()
@@ -0,0 +1,123 @@
+# telemetry/metrics.py
+# In-process metrics: counters, gauges and timing windows, plus recent
+# events (tier changes and the like). Cheap enough for the audio path;
+# render() gives Prometheus text for the optional /metrics listener.
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+import numpy as np
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _fmt(name, labels, extra=None):
+    pairs = list(labels) + list((extra or {}).items())
+    if not pairs:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Metrics:
+    def __init__(self, window=2048, events=200):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.timings = {}    # key -> deque of (monotonic time, value)
+        self.totals = {}     # key -> [count, sum]
+        self.window = window
+        self.events = deque(maxlen=events)
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def clear(self, name):
+        """Drops every gauge called name, e.g. before re-publishing a top-N list."""
+        with self._lock:
+            for key in [k for k in self.gauges if k[0] == name]:
+                del self.gauges[key]
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            if key not in self.timings:
+                self.timings[key] = deque(maxlen=self.window)
+                self.totals[key] = [0, 0.0]
+            self.timings[key].append((time.monotonic(), value))
+            self.totals[key][0] += 1
+            self.totals[key][1] += value
+
+    def recent(self, name, seconds, **labels):
+        """Values observed in the last `seconds`, oldest first."""
+        since = time.monotonic() - seconds
+        with self._lock:
+            values = self.timings.get(_key(name, labels), ())
+            return [v for t, v in values if t >= since]
+
+    def event(self, kind, **fields):
+        self.events.append({"time": time.time(), "kind": kind, **fields})
+        self.inc(f"{kind}_total")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": {_fmt(n, l): v for (n, l), v in self.counters.items()},
+                "gauges": {_fmt(n, l): v for (n, l), v in self.gauges.items()},
+                "timings": {
+                    _fmt(n, l): {"count": self.totals[(n, l)][0], "sum": self.totals[(n, l)][1]}
+                    for (n, l) in self.timings
+                },
+                "events": list(self.events),
+            }
+
+    def render(self, quantile_seconds=60):
+        """Prometheus text format; timing quantiles cover the last quantile_seconds."""
+        lines = []
+        with self._lock:
+            for (n, l), v in sorted(self.counters.items()):
+                lines.append(f"{_fmt(n, l)} {v}")
+            for (n, l), v in sorted(self.gauges.items()):
+                lines.append(f"{_fmt(n, l)} {v}")
+            since = time.monotonic() - quantile_seconds
+            for (n, l), values in sorted(self.timings.items()):
+                count, total = self.totals[(n, l)]
+                lines.append(f"{_fmt(n + '_count', l)} {count}")
+                lines.append(f"{_fmt(n + '_sum', l)} {total:.3f}")
+                recent = [v for t, v in values if t >= since]
+                if recent:
+                    for q in (0.5, 0.95, 0.99):
+                        lines.append(f"{_fmt(n, l, {'quantile': q})} {np.percentile(recent, q * 100):.3f}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+async def serve_metrics(port, host="0.0.0.0", reuse_port=False):
+    """Minimal HTTP listener: any GET returns metrics.render()."""
+    async def handle(reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = metrics.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port, reuse_port=reuse_port)
+    logging.info(f"📈 Metrics on :{port}/metrics")
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,96 @@
+# translate/backends.py
+# Inference runtimes for the IndicTrans2 models. Translator does the domain
+# mapping and IndicProcessor pre/post-processing; a backend only turns a
+# batch of pre-processed sentences into decoded target text.
+#
+#   torch - eager PyTorch generate (original path)
+#   ct2   - CTranslate2 int8, same runtime faster-whisper uses for STT;
+#           convert the models first with translate/convert_ct2.py
+import logging
+import os
+
+# direction -> (HF model, src_lang, tgt_lang)
+MODELS = {
+    "ml-en": ("ai4bharat/indictrans2-indic-en-dist-200M", "mal_Mlym", "eng_Latn"),
+    "en-ml": ("ai4bharat/indictrans2-en-indic-dist-200M", "eng_Latn", "mal_Mlym"),
+}
+
+CT2_DIR = os.getenv("ZENTRY_CT2_TRANSLATE_DIR", "models/ct2-indictrans2")
+
+def ct2_model_dir(direction, root=CT2_DIR):
+    return os.path.join(root, direction)
+
+
+class TorchBackend:
+    def __init__(self, direction, device="cpu"):
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+        model_name = MODELS[direction][0]
+        self.device = device
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_name,
+            trust_remote_code=True
+        ).to(device)
+
+    def generate(self, batch, max_new_tokens=128):
+        import torch
+        inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            output_ids = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                num_beams=1,        # Beam=1 for maximum speed in production
+                do_sample=False
+            )
+        return self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+
+class CT2Backend:
+    """
+    The HF tokenizer still does the SentencePiece split (it knows the language
+    tags); CTranslate2 runs the int8 encoder/decoder on the pieces.
+    """
+    def __init__(self, direction, model_dir=None, compute_type="int8",
+                 inter_threads=2, intra_threads=None):
+        import ctranslate2
+        from transformers import AutoTokenizer
+        model_dir = model_dir or ct2_model_dir(direction)
+        if not os.path.isdir(model_dir):
+            raise FileNotFoundError(
+                f"No CTranslate2 model at {model_dir}; run python -m translate.convert_ct2"
+            )
+        self.tokenizer = AutoTokenizer.from_pretrained(MODELS[direction][0], trust_remote_code=True)
+        # inter_threads: batches translated in parallel (cpu_scheduler runs several turns at once)
+        self.translator = ctranslate2.Translator(
+            model_dir,
+            device="cpu",
+            compute_type=compute_type,
+            inter_threads=inter_threads,
+            intra_threads=intra_threads or max(1, (os.cpu_count() or 2) // 2),
+        )
+
+    def generate(self, batch, max_new_tokens=128):
+        source = [
+            self.tokenizer.convert_ids_to_tokens(self.tokenizer(text, truncation=True)["input_ids"])
+            for text in batch
+        ]
+        results = self.translator.translate_batch(
+            source,
+            beam_size=1,
+            max_decoding_length=max_new_tokens,
+        )
+        return [
+            "".join(r.hypotheses[0]).replace("▁", " ").strip()
+            for r in results
+        ]
+
+
+BACKENDS = {"torch": TorchBackend, "ct2": CT2Backend}
+
+def backend_from_env():
+    """ZENTRY_TRANSLATE_BACKEND = torch (default) | ct2"""
+    kind = os.getenv("ZENTRY_TRANSLATE_BACKEND", "torch")
+    if kind not in BACKENDS:
+        logging.warning(f"Unknown translation backend '{kind}', using torch")
+        kind = "torch"
+    return kind
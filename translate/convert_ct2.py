@@ -0,0 +1,53 @@
+# translate/convert_ct2.py
+"""
+Converts the IndicTrans2 distilled 200M checkpoints to CTranslate2 for the
+ct2 translation backend (translate/backends.py).
+
+The HF ports use a custom architecture CTranslate2 cannot read, so this
+converts AI4Bharat's fairseq release of the same models
+(indictrans2-{indic-en,en-indic}-dist-200M: fairseq_model/model/checkpoint_best.pt
+plus the final_bin dictionaries). Their custom fairseq architectures live
+in the IndicTrans2 repo's model_configs folder, passed as --user-dir:
+
+    python -m translate.convert_ct2 --direction ml-en --fairseq-dir downloads/indic-en-dist-200M/fairseq_model --user-dir IndicTrans2/model_configs
+    python -m translate.convert_ct2 --direction en-ml --fairseq-dir downloads/en-indic-dist-200M/fairseq_model --user-dir IndicTrans2/model_configs
+
+Output goes to models/ct2-indictrans2/<direction> (ZENTRY_CT2_TRANSLATE_DIR),
+int8 weights by default. Select it with ZENTRY_TRANSLATE_BACKEND=ct2.
+"""
+import argparse
+import os
+from translate.backends import CT2_DIR, MODELS, ct2_model_dir
+
+def convert(direction, fairseq_dir, user_dir=None, output_root=CT2_DIR, quantization="int8", force=False):
+    from ctranslate2.converters import FairseqConverter
+
+    output_dir = ct2_model_dir(direction, output_root)
+    converter = FairseqConverter(
+        model_path=os.path.join(fairseq_dir, "model", "checkpoint_best.pt"),
+        data_dir=os.path.join(fairseq_dir, "final_bin"),
+        user_dir=user_dir,
+        source_lang="SRC",
+        target_lang="TGT",
+    )
+    print(f"🔄 Converting {direction} -> {output_dir} ({quantization})...")
+    converter.convert(output_dir, quantization=quantization, force=force)
+    print(f"✅ {direction} converted")
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--direction", choices=sorted(MODELS), required=True)
+    parser.add_argument("--fairseq-dir", required=True, help="folder with model/ and final_bin/")
+    parser.add_argument("--user-dir", help="IndicTrans2 model_configs (registers the fairseq architectures)")
+    parser.add_argument("--output-root", default=CT2_DIR)
+    parser.add_argument("--quantization", default="int8",
+                        help="int8, int8_float32, float32 ... (see ctranslate2 docs)")
+    parser.add_argument("--force", action="store_true", help="overwrite an existing output folder")
+    args = parser.parse_args()
+    convert(args.direction, args.fairseq_dir, args.user_dir, args.output_root, args.quantization, args.force)
+
+
+if __name__ == "__main__":
+    main()
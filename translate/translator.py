@@ -1,8 +1,8 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from IndicTransToolkit.processor import IndicProcessor
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
+from translate.backends import BACKENDS, MODELS, backend_from_env
 
 # 🔒 PRODUCTION TIP: We use CPU for translation to save 3080 Ti VRAM 
 # for the STT (Whisper) and LLM (Phi-4). On an i9, this is sub-200ms.
@@ -13,38 +13,37 @@ PRE_MAP = {"ബി.ടെക്ക്": "B.Tech", "എം.സിഎ": "MCA", "
 POST_MAP = {v: k for k, v in PRE_MAP.items()}
 
 class Translator:
-    def __init__(self, directions=("ml-en", "en-ml")):
+    def __init__(self, directions=("ml-en", "en-ml"), backend=None):
         """
         Loads distilled 200M models for high-concurrency translation.
+        backend: "torch" or "ct2" (see translate/backends.py); defaults to
+        ZENTRY_TRANSLATE_BACKEND.
         """
         self.models = {}
-        self.tokenizers = {}
         self.directions = directions
+        self.backend = backend or backend_from_env()
         self.ip = IndicProcessor(inference=True)
 
-        for direction in directions:
-            if direction == "ml-en":
-                model_name = "ai4bharat/indictrans2-indic-en-dist-200M"
-                src_lang, tgt_lang = "mal_Mlym", "eng_Latn"
-            elif direction == "en-ml":
-                model_name = "ai4bharat/indictrans2-en-indic-dist-200M"
-                src_lang, tgt_lang = "eng_Latn", "mal_Mlym"
-            else:
-                continue
-
-            print(f"🔄 Loading {direction} translation model: {model_name}...")
-            tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
-            model = AutoModelForSeq2SeqLM.from_pretrained(
-                model_name,
-                trust_remote_code=True
-            ).to(DEVICE)
-
-            self.models[direction] = model
-            self.tokenizers[direction] = tokenizer
-            setattr(self, f"{direction}_src_lang", src_lang)
-            setattr(self, f"{direction}_tgt_lang", tgt_lang)
-
-        print("✅ Translator initialized successfully on CPU.\n")
+        # The two directions are independent models: load them side by side
+        with ThreadPoolExecutor(max_workers=max(1, len(directions))) as pool:
+            list(pool.map(self.load_direction, directions))
+
+        print(f"✅ Translator initialized successfully on CPU ({self.backend}).\n")
+
+    def load_direction(self, direction):
+        if direction not in MODELS:
+            return
+        model_name, src_lang, tgt_lang = MODELS[direction]
+
+        print(f"🔄 Loading {direction} translation model: {model_name} ({self.backend})...")
+        if self.backend == "torch":
+            model = BACKENDS["torch"](direction, device=DEVICE)
+        else:
+            model = BACKENDS[self.backend](direction)
+
+        self.models[direction] = model
+        setattr(self, f"{direction}_src_lang", src_lang)
+        setattr(self, f"{direction}_tgt_lang", tgt_lang)
 
     def _pre_map(self, text: str, direction: str) -> str:
         # Protect specific academic terms from being distorted by translation
@@ -58,7 +57,7 @@ class Translator:
         if direction == "en-ml":
             for k, v in POST_MAP.items():
                 text = re.sub(re.escape(k), v, text)
-        return re.re.sub(r"<.*?>", "", text).strip()
+        return re.sub(r"<.*?>", "", text).strip()
 
     def translate(self, text: str, direction="ml-en") -> str:
         """
@@ -66,29 +65,25 @@ class Translator:
         """
         if direction not in self.models or not text.strip():
             return text
+        return self.translate_batch([text], direction)[0]
+
+    def translate_batch(self, texts, direction="ml-en"):
+        if direction not in self.models:
+            return list(texts)
 
         model = self.models[direction]
-        tokenizer = self.tokenizers[direction]
         src_lang = getattr(self, f"{direction}_src_lang")
         tgt_lang = getattr(self, f"{direction}_tgt_lang")
 
         # 1. Domain Mapping
-        text_pre = self._pre_map(text, direction)
-        
+        texts_pre = [self._pre_map(t, direction) for t in texts]
+
         # 2. IndicTrans Pre-processing
-        batch = self.ip.preprocess_batch([text_pre], src_lang=src_lang, tgt_lang=tgt_lang)
-        inputs = tokenizer(batch, padding=True, truncation=True, return_tensors="pt").to(DEVICE)
+        batch = self.ip.preprocess_batch(texts_pre, src_lang=src_lang, tgt_lang=tgt_lang)
 
         # 3. Inference
-        with torch.no_grad():
-            output_ids = model.generate(
-                **inputs,
-                max_new_tokens=128, # Increased for descriptive AI responses
-                num_beams=1,        # Beam=1 for maximum speed in production
-                do_sample=False
-            )
+        decoded = model.generate(batch, max_new_tokens=128)  # 128 for descriptive AI responses
 
         # 4. Post-processing
-        decoded = tokenizer.batch_decode(output_ids, skip_special_tokens=True)
-        translated = self.ip.postprocess_batch(decoded, lang=tgt_lang)[0]
-        return self._post_map(translated, direction)
\ No newline at end of file
+        translated = self.ip.postprocess_batch(decoded, lang=tgt_lang)
+        return [self._post_map(t, direction) for t in translated]
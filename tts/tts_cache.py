@@ -0,0 +1,172 @@
+# tts/tts_cache.py
+# Ready-to-send PCM16 for replies that keep coming back (guardrail
+# fallbacks, greetings, "please repeat"). Two tiers:
+#   - memory: byte-bounded LRU
+#   - disk:   append-only data file read through mmap + a small JSON index,
+#             so the cache survives restarts without re-running the model
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+def normalize_text(text):
+    # NFC + collapsed whitespace; ZWJ/ZWNJ are kept, they change Malayalam spelling
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class TTSCache:
+    def __init__(self, cache_dir="cache/tts", max_memory_bytes=64 * 1024 * 1024,
+                 max_disk_bytes=512 * 1024 * 1024, disk_after_hits=2):
+        """
+        Args:
+            disk_after_hits: a synthesized phrase goes to disk once it has been
+                requested this many times (pre-populated phrases always do),
+                so one-off replies don't fill the disk tier.
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_after_hits = disk_after_hits
+
+        self._mem = OrderedDict()
+        self._mem_bytes = 0
+        self._seen = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._data_path = os.path.join(cache_dir, "pcm.bin")
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._index = self._load_index()
+        self._data = open(self._data_path, "ab")
+        self._mmap = None
+        self._remap()
+
+    @staticmethod
+    def key(text, fmt):
+        return hashlib.sha1(f"{fmt}|{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    # ---------------------------------------------------------
+    # Disk tier
+    # ---------------------------------------------------------
+
+    def _load_index(self):
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        # Drop entries past the end of a data file cut short by a crash
+        size = os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0
+        return {k: v for k, v in index.items() if v[0] + v[1] <= size}
+
+    def _remap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if os.path.getsize(self._data_path) > 0:
+            with open(self._data_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _disk_get(self, k):
+        loc = self._index.get(k)
+        if loc is None:
+            return None
+        offset, length = loc
+        if self._mmap is None or offset + length > len(self._mmap):
+            self._remap()
+        return bytes(self._mmap[offset:offset + length])
+
+    def _disk_put(self, k, pcm):
+        offset = self._data.tell()
+        if offset + len(pcm) > self.max_disk_bytes:
+            return
+        self._data.write(pcm)
+        self._data.flush()
+        self._index[k] = (offset, len(pcm))
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+
+    # ---------------------------------------------------------
+    # Memory tier
+    # ---------------------------------------------------------
+
+    def _mem_put(self, k, pcm):
+        if k in self._mem:
+            self._mem.move_to_end(k)
+            return
+        self._mem[k] = pcm
+        self._mem_bytes += len(pcm)
+        while self._mem_bytes > self.max_memory_bytes and self._mem:
+            _, old = self._mem.popitem(last=False)
+            self._mem_bytes -= len(old)
+
+    # ---------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------
+
+    def get(self, text, fmt):
+        k = self.key(text, fmt)
+        with self._lock:
+            pcm = self._mem.get(k)
+            if pcm is not None:
+                self._mem.move_to_end(k)
+                if k not in self._index:
+                    self._promote(k, pcm)
+            else:
+                pcm = self._disk_get(k)
+                if pcm is not None:
+                    self._mem_put(k, pcm)
+            if pcm is None:
+                self.misses += 1
+                if len(self._seen) > 10000:
+                    self._seen.clear()  # repeat-counting only needs recent history
+                self._seen[k] = self._seen.get(k, 0) + 1
+            else:
+                self.hits += 1
+            return pcm
+
+    def _promote(self, k, pcm):
+        # Memory hits count towards the disk threshold too
+        self._seen[k] = self._seen.get(k, 0) + 1
+        if self._seen[k] >= self.disk_after_hits:
+            self._write_disk(k, pcm)
+
+    def _write_disk(self, k, pcm):
+        try:
+            self._disk_put(k, pcm)
+        except OSError as e:
+            logging.warning(f"TTS cache disk write failed: {e}")
+        self._seen.pop(k, None)
+
+    def put(self, text, fmt, pcm, persist=None):
+        """persist: True forces the disk tier, None applies the hit threshold."""
+        k = self.key(text, fmt)
+        with self._lock:
+            self._mem_put(k, pcm)
+            if persist is None:
+                persist = self._seen.get(k, 0) >= self.disk_after_hits
+            if persist and k not in self._index:
+                self._write_disk(k, pcm)
+
+    def __contains__(self, item):
+        text, fmt = item
+        k = self.key(text, fmt)
+        return k in self._mem or k in self._index
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._mem),
+            "memory_bytes": self._mem_bytes,
+            "disk_entries": len(self._index),
+        }
@@ -3,12 +3,20 @@ import numpy as np
 import onnxruntime as ort
 import sounddevice as sd
 from transformers import AutoTokenizer
+from backend.audio_payload import float_to_pcm16
+from backend.resample import resample
+from tts.tts_cache import TTSCache
+
+MODEL_SAMPLE_RATE = 16000  # MMS-TTS output
+# Cache format tag; bumped when the PCM encoding changed (clipping), so stale entries miss
+PCM_FORMAT = "pcm16c"
 
 class TTSModule:
-    def __init__(self, model_path, device="cpu"):
+    def __init__(self, model_path, device="cpu", cache_dir="cache/tts"):
         self.tokenizer = AutoTokenizer.from_pretrained("facebook/mms-tts-mal")
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if device == "cuda" else ["CPUExecutionProvider"]
         self.session = ort.InferenceSession(model_path, providers=providers)
+        self.cache = TTSCache(cache_dir) if cache_dir else None
 
     # tts/tts_module.py (Update the tell method)
     def tell(self, text, play=True, sr=16000):
@@ -26,3 +34,33 @@ class TTSModule:
                 pass # Silently fail on Colab/Server without speakers
                 
         return audio
+
+    def tell_pcm(self, text, sample_rate=MODEL_SAMPLE_RATE, persist=None):
+        """
+        Ready-to-send PCM16 bytes at sample_rate. Cache hits skip tokenizing,
+        ONNX inference and resampling entirely.
+        """
+        fmt = f"{PCM_FORMAT}@{sample_rate}"
+        if self.cache:
+            pcm = self.cache.get(text, fmt)
+            if pcm is not None:
+                return pcm
+
+        audio = self.tell(text, play=False)
+        if sample_rate != MODEL_SAMPLE_RATE:
+            audio = resample(audio, MODEL_SAMPLE_RATE, sample_rate)
+        pcm = float_to_pcm16(audio)
+
+        if self.cache:
+            self.cache.put(text, fmt, pcm, persist=persist)
+        return pcm
+
+    def prewarm(self, phrases, sample_rate=MODEL_SAMPLE_RATE):
+        """Synthesizes phrases missing from the cache; they go straight to disk."""
+        if not self.cache:
+            return 0
+        fmt = f"{PCM_FORMAT}@{sample_rate}"
+        missing = [p for p in phrases if p.strip() and (p, fmt) not in self.cache]
+        for phrase in missing:
+            self.tell_pcm(phrase, sample_rate, persist=True)
+        return len(missing)
@@ -0,0 +1,155 @@
+# workers/ipc.py
+# Client side of the model-serving workers. Front-end processes talk to one
+# worker per model over a unix socket; audio travels through a shared-memory
+# buffer owned by each connection instead of being pickled.
+import asyncio
+import logging
+import os
+import queue
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+WORKERS_ENV = "ZENTRY_MODEL_WORKERS"     # socket directory; set => remote mode
+AUTHKEY_ENV = "ZENTRY_WORKER_KEY"
+DEFAULT_BUFFER = 4 * 1024 * 1024         # ~2 min of 8k PCM16 / ~60s of 16k float32
+
+def workers_enabled():
+    return bool(os.getenv(WORKERS_ENV))
+
+
+def worker_address(name, socket_dir=None):
+    return os.path.join(socket_dir or os.environ[WORKERS_ENV], f"{name}.sock")
+
+
+def worker_authkey():
+    return bytes.fromhex(os.environ[AUTHKEY_ENV])
+
+
+def attach_shm(name):
+    # The attaching side must not let its resource tracker unlink the segment
+    shm = SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class _Channel:
+    """One socket + one shared audio buffer. Used by one thread at a time."""
+    def __init__(self, address, authkey):
+        self.conn = Client(address, family="AF_UNIX", authkey=authkey)
+        self.shm = None
+
+    def buffer(self, nbytes):
+        if self.shm is None or self.shm.size < nbytes:
+            self.release_buffer()
+            self.shm = SharedMemory(create=True, size=max(nbytes, DEFAULT_BUFFER))
+            self.conn.send(("__buffer__", (self.shm.name,), {}))
+            self._check(self.conn.recv())
+        return self.shm.buf
+
+    def release_buffer(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def call(self, method, args, kwargs):
+        self.conn.send((method, args, kwargs))
+        return self._check(self.conn.recv())
+
+    @staticmethod
+    def _check(reply):
+        status, value = reply
+        if status == "err":
+            raise RuntimeError(f"Model worker error: {value}")
+        return value
+
+    def close(self):
+        self.release_buffer()
+        self.conn.close()
+
+
+class WorkerClient:
+    """Thread-safe handle on a model worker; keeps a pool of channels."""
+    def __init__(self, name):
+        self.name = name
+        self._idle = queue.SimpleQueue()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _Channel(worker_address(self.name), worker_authkey())
+
+    def call(self, method, *args, audio=None, shm=False, **kwargs):
+        """`audio` is copied into the shared buffer; `shm` just makes sure one exists."""
+        ch = self._acquire()
+        try:
+            if audio is not None:
+                buf = ch.buffer(len(audio))
+                buf[:len(audio)] = audio
+                args = (len(audio),) + args
+            elif shm:
+                ch.buffer(DEFAULT_BUFFER)
+            result = ch.call(method, args, kwargs)
+            if isinstance(result, tuple) and result and result[0] == "__shm__":
+                _, count, dtype = result
+                result = np.frombuffer(ch.shm.buf, dtype=dtype, count=count).copy()
+        except (EOFError, OSError):
+            ch.close()
+            logging.error(f"⚠️ Lost connection to model worker '{self.name}'")
+            raise
+        except Exception:
+            self._idle.put(ch)
+            raise
+        self._idle.put(ch)
+        return result
+
+
+class RemoteModel:
+    """Forwards any method call to the named worker (blocking, like the local model)."""
+    def __init__(self, name):
+        self._client = WorkerClient(name)
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return lambda *args, **kwargs: self._client.call(method, *args, **kwargs)
+
+
+class RemoteIntentDetector:
+    """IntentDetector stand-in."""
+    def __init__(self):
+        self.model = RemoteModel("minilm")
+
+    def detect(self, text_en: str) -> str:
+        return self.model.detect(text_en)
+
+
+class RemoteSTT:
+    """Drop-in for MalayalamSTT; the audio goes through shared memory."""
+    def __init__(self):
+        self._client = WorkerClient("whisper")
+
+    async def transcribe(self, audio_bytes, sample_rate=16000, light=False):
+        return await asyncio.to_thread(self._sync_transcribe, audio_bytes, sample_rate, light)
+
+    def _sync_transcribe(self, audio_bytes, sample_rate, light=False):
+        return self._client.call("transcribe", sample_rate, light, audio=audio_bytes)
+
+
+class RemoteTTS:
+    """Drop-in for TTSModule; float32 audio comes back through shared memory."""
+    def __init__(self):
+        self._client = WorkerClient("tts")
+
+    def tell(self, text, play=False, sr=16000):
+        return self._client.call("tell", text, shm=True)
+
+    def tell_pcm(self, text, sample_rate=16000, persist=None):
+        # The cache lives in the worker, so every front-end shares it
+        return self._client.call("tell_pcm", text, sample_rate, persist, shm=True).tobytes()
+
+    def prewarm(self, phrases, sample_rate=16000):
+        return self._client.call("prewarm", phrases, sample_rate)
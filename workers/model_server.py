@@ -0,0 +1,208 @@
+# workers/model_server.py
+# One process per heavy model, so each model's weights are loaded once per
+# host no matter how many audio front-ends are running.
+import logging
+import multiprocessing as mp
+import os
+import secrets
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+import numpy as np
+from workers.ipc import AUTHKEY_ENV, WORKERS_ENV, attach_shm, worker_address, worker_authkey
+
+WHISPER_PATH = os.getenv("WHISPER_PATH", "models/ct2-whisper-medium")
+TTS_PATH = os.getenv("TTS_PATH", "models/mms-tts-mal.onnx")
+PHI_PATH = os.getenv("PHI_PATH", "models/phi-4-mini-instruct.Q4_K_M.gguf")  # llm.brain.PHI_PATH
+
+class WhisperHandler:
+    SHM_METHODS = {"transcribe"}
+    # GPU slots (MalayalamSTT.gpu_lock) plus the int8 CPU overflow workers
+    CONCURRENCY = 3 + int(os.getenv("ZENTRY_STT_CPU_WORKERS", "0"))
+
+    def __init__(self):
+        from backend.stt_worker import MalayalamSTT
+        self.stt = MalayalamSTT(WHISPER_PATH)
+
+    def transcribe(self, buf, nbytes, sample_rate, light=False):
+        return self.stt.transcribe_blocking(bytes(buf[:nbytes]), sample_rate, light)
+
+
+class TTSHandler:
+    SHM_METHODS = {"tell", "tell_pcm"}
+    CONCURRENCY = 2
+
+    def __init__(self):
+        from tts.tts_module import TTSModule
+        self.tts = TTSModule(TTS_PATH)
+
+    def tell(self, buf, text):
+        audio = self.tts.tell(text, play=False).astype(np.float32)
+        if audio.nbytes > len(buf):
+            return audio  # too long for the shared buffer, pickle it instead
+        np.frombuffer(buf, dtype=np.float32, count=len(audio))[:] = audio
+        return ("__shm__", len(audio), "float32")
+
+    def tell_pcm(self, buf, text, sample_rate, persist=None):
+        pcm = self.tts.tell_pcm(text, sample_rate, persist=persist)
+        if len(pcm) > len(buf):
+            return np.frombuffer(pcm, dtype=np.int16)
+        buf[:len(pcm)] = pcm
+        return ("__shm__", len(pcm) // 2, "int16")
+
+    def prewarm(self, phrases, sample_rate):
+        return self.tts.prewarm(phrases, sample_rate)
+
+
+class PhiHandler:
+    SHM_METHODS = set()
+    CONCURRENCY = 1  # same as gpu_scheduler
+
+    def __init__(self):
+        from llm.engine import PhiEngine
+        self.engine = PhiEngine(PHI_PATH)
+
+    def generate(self, prompt, *args, **kwargs):
+        return self.engine.generate(prompt, *args, **kwargs)
+
+    def stats(self):
+        return self.engine.stats()
+
+
+class IndicTransHandler:
+    SHM_METHODS = set()
+    CONCURRENCY = 4  # same as cpu_scheduler
+
+    def __init__(self):
+        from translate.translator import Translator
+        self.translator = Translator()
+
+    def translate(self, text, direction="ml-en"):
+        return self.translator.translate(text, direction)
+
+    def translate_batch(self, texts, direction="ml-en"):
+        return self.translator.translate_batch(texts, direction)
+
+
+class MiniLMHandler:
+    """Embedder and IntentDetector share the one MiniLM copy."""
+    SHM_METHODS = set()
+    CONCURRENCY = 4
+
+    def __init__(self):
+        from llm.rag.embedder import Embedder
+        from llm.intent import IntentDetector
+        self.embedder = Embedder()
+        self.detector = IntentDetector(model=self.embedder.model)
+
+    def embed(self, texts):
+        return self.embedder.embed(texts)
+
+    def detect(self, text_en):
+        return self.detector.detect(text_en)
+
+
+HANDLERS = {
+    "whisper": WhisperHandler,
+    "tts": TTSHandler,
+    "phi": PhiHandler,
+    "indictrans": IndicTransHandler,
+    "minilm": MiniLMHandler,
+}
+
+# ---------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------
+
+def _serve_connection(conn, handler, slots):
+    shm = None
+    try:
+        while True:
+            try:
+                method, args, kwargs = conn.recv()
+            except EOFError:
+                break
+
+            try:
+                if method == "__buffer__":
+                    if shm is not None:
+                        shm.close()
+                    shm = attach_shm(args[0])
+                    reply = ("ok", None)
+                else:
+                    if method.startswith("_"):
+                        raise AttributeError(method)
+                    fn = getattr(handler, method)
+                    if method in handler.SHM_METHODS:
+                        args = (shm.buf,) + tuple(args)
+                    with slots:
+                        reply = ("ok", fn(*args, **kwargs))
+            except Exception as e:
+                logging.error(f"Worker call {method} failed: {e}")
+                reply = ("err", repr(e))
+            conn.send(reply)
+    finally:
+        if shm is not None:
+            shm.close()
+        conn.close()
+
+
+def serve(name):
+    """Process entry point: load one model, then serve every front-end."""
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    handler_cls = HANDLERS[name]
+    handler = handler_cls()
+    slots = threading.BoundedSemaphore(handler_cls.CONCURRENCY)
+
+    address = worker_address(name)
+    if os.path.exists(address):
+        os.unlink(address)
+    listener = Listener(address, family="AF_UNIX", authkey=worker_authkey())
+    logging.info(f"✅ Model worker '{name}' ready in {time.perf_counter() - started:.1f}s")
+
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception as e:
+            # Failed auth handshakes land here; keep serving everyone else
+            logging.warning(f"Worker '{name}' rejected a connection: {e}")
+            continue
+        threading.Thread(target=_serve_connection, args=(conn, handler, slots), daemon=True).start()
+
+
+def wait_ready(names, timeout=600):
+    deadline = time.monotonic() + timeout
+    pending = set(names)
+    while pending:
+        for name in list(pending):
+            try:
+                Client(worker_address(name), family="AF_UNIX", authkey=worker_authkey()).close()
+                pending.discard(name)
+            except (FileNotFoundError, ConnectionRefusedError):
+                pass
+        if pending and time.monotonic() > deadline:
+            raise TimeoutError(f"Model workers not ready: {sorted(pending)}")
+        time.sleep(0.2)
+
+
+def start_workers(names=tuple(HANDLERS), timeout=600):
+    """
+    Spawns one worker per model and blocks until all of them accept connections.
+    Sets the env vars that switch the llm modules (and any child process) to
+    remote mode, so call this before any model is first used.
+    """
+    os.environ.setdefault(WORKERS_ENV, tempfile.mkdtemp(prefix="zentry-workers-"))
+    os.environ.setdefault(AUTHKEY_ENV, secrets.token_hex(16))
+
+    ctx = mp.get_context("spawn")  # never fork a process holding CUDA state
+    procs = []
+    for name in names:
+        p = ctx.Process(target=serve, args=(name,), name=f"model-{name}", daemon=True)
+        p.start()
+        procs.append(p)
+
+    print(f"⏳ Waiting for model workers: {', '.join(names)}")
+    wait_ready(names, timeout)
+    return procs